@@ -2,6 +2,10 @@
 from flask_cors import CORS
 from extensions import db, jwt
 from config import config
+from utils.json_provider import FastJSONProvider
+from utils.compression import init_compression
+from utils.metrics import init_metrics
+from utils.nplusone import init_nplusone
 import os
 
 def create_app(config_name='development'):
@@ -10,6 +14,7 @@ def create_app(config_name='development'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    app.json = FastJSONProvider(app)
     
     # Initialize extensions
     db.init_app(app)
@@ -21,7 +26,7 @@ def create_app(config_name='development'):
          resources={r"/*": {
              "origins": [frontend_url, "http://localhost:3000", "https://poetic-bonbon-5e8ac0.netlify.app"],
              "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-             "allow_headers": ["Content-Type", "Authorization"],
+             "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
              "supports_credentials": True
          }})
     
@@ -36,7 +41,7 @@ def create_app(config_name='development'):
             response = app.make_default_options_response()
             response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', frontend_url)
             response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Idempotency-Key'
             response.headers['Access-Control-Allow-Credentials'] = 'true'
             print(f"✅ Preflight response sent")
             return response
@@ -48,10 +53,19 @@ def create_app(config_name='development'):
         if origin in [frontend_url, "http://localhost:3000", "https://poetic-bonbon-5e8ac0.netlify.app"]:
             response.headers['Access-Control-Allow-Origin'] = origin
             response.headers['Access-Control-Allow-Credentials'] = 'true'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Idempotency-Key'
             response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
         return response
     
+    # gzip/brotli for JSON and text responses
+    init_compression(app)
+    
+    # Latency/query metrics, Server-Timing headers and /metrics
+    init_metrics(app)
+    
+    # Flag repeated queries (N+1) in development and testing
+    init_nplusone(app)
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.realtors import realtors_bp
@@ -60,6 +74,7 @@ def create_app(config_name='development'):
     from routes.notifications import notifications_bp
     from routes.grant_applications import grant_applications_bp
     from routes.admin import admin_bp
+    from routes.impact import impact_bp
     from setup_admin import setup_bp
     
     app.register_blueprint(auth_bp)
@@ -69,6 +84,7 @@ def create_app(config_name='development'):
     app.register_blueprint(notifications_bp)
     app.register_blueprint(grant_applications_bp, url_prefix='/api/grant-applications')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(impact_bp)
     app.register_blueprint(setup_bp)
     
     # Serve uploaded files
@@ -111,6 +127,14 @@ def create_app(config_name='development'):
     # Create database tables
     with app.app_context():
         db.create_all()
+        
+        from utils.search import init_search_index
+        init_search_index()
+    
+    # Start scheduled jobs (monthly reminders, overdue payments)
+    if app.config.get('SCHEDULER_ENABLED'):
+        from utils.scheduler import init_scheduler
+        init_scheduler(app)
     
     return app
 
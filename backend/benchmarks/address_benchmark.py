@@ -0,0 +1,78 @@
+"""
+Benchmark USPS address validation against the local stub.
+
+Validates --addresses distinct addresses (each repeated --repeats times, as
+when applicants retry the form) with simulated USPS latency, comparing:
+  - one fresh requests.get per address (the previous implementation)
+  - USPSClient cold: pooled session, five addresses per request
+  - USPSClient warm: the same inputs again, answered from the LRU
+  - a new USPSClient (empty LRU) warm from the address_cache table
+
+Usage (from backend/):
+    python -m benchmarks.address_benchmark --addresses 200 --latency 0.05
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///address_benchmark.db')
+
+import requests
+from app import create_app
+from extensions import db
+from models import AddressCache
+from benchmarks.usps_stub import StubServer
+from utils.address_validation import USPSClient, normalize_address
+
+
+def sample_addresses(count):
+    streets = ('Main St', 'Oak Ave', 'Pine St', 'Sunset Blvd', 'Ocean Ave')
+    return [(f'{100 + n} {streets[n % len(streets)]}', 'Los Angeles', 'CA', f'900{n % 90 + 10}') for n in range(count)]
+
+
+def legacy_validate(url, address):
+    """The old per-address path: new connection, one address per request"""
+    street, city, state, zip5 = normalize_address(*address)
+    xml_request = (f'<AddressValidateRequest USERID="bench"><Revision>1</Revision><Address ID="0">'
+                   f'<Address1></Address1><Address2>{street}</Address2><City>{city}</City>'
+                   f'<State>{state}</State><Zip5>{zip5}</Zip5><Zip4></Zip4></Address></AddressValidateRequest>')
+    return requests.get(url, params={'API': 'Verify', 'XML': xml_request}, timeout=10)
+
+
+def timed(label, stub, func):
+    stub.requests = stub.addresses = 0
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed * 1000:>9.1f} ms  {stub.requests:>5} USPS requests")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched, cached USPS validation')
+    parser.add_argument('--addresses', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=2, help='times each address is submitted')
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated USPS latency in seconds')
+    args = parser.parse_args()
+
+    addresses = sample_addresses(args.addresses) * args.repeats
+    app = create_app('production')
+
+    with app.app_context(), StubServer(latency=args.latency) as stub:
+        AddressCache.query.delete()
+        db.session.commit()
+        print(f"{len(addresses)} validations ({args.addresses} distinct), {args.latency * 1000:.0f} ms USPS latency\n")
+
+        legacy = timed('per-address requests.get', stub,
+                       lambda: [legacy_validate(stub.url, a) for a in addresses])
+
+        client = USPSClient('bench', url=stub.url)
+        cold = timed('USPSClient, cold cache', stub, lambda: client.validate_many(addresses))
+        timed('USPSClient, warm LRU', stub, lambda: client.validate_many(addresses))
+        timed('new USPSClient, address_cache', stub, lambda: USPSClient('bench', url=stub.url).validate_many(addresses))
+
+        print(f"\nCold batched client is {legacy / cold:.1f}x faster than per-address requests")
+
+
+if __name__ == '__main__':
+    main()
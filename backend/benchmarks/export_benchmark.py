@@ -0,0 +1,143 @@
+"""
+Benchmark the streaming admin exports against a large seeded dataset.
+
+Seeds realtors with five years of monthly transactions and a donation for each
+transaction (bulk inserts, skipped if the database already holds enough rows),
+then drains the CSV and XLSX export generators and reports time, output size
+and peak Python heap usage.
+
+Usage (from backend/):
+    python -m benchmarks.export_benchmark --rows 1000000
+    DATABASE_URL=postgresql://... python -m benchmarks.export_benchmark
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///export_benchmark.db')
+
+from sqlalchemy import insert
+from app import create_app
+from extensions import db
+from models import Realtor, Transaction, Donation
+from utils.exports import stream_export
+
+MONTHS_PER_REALTOR = 60
+BATCH_SIZE = 10000
+
+
+def seed(rows):
+    """Insert `rows` transactions and donations, plus the realtors that own them"""
+    existing = Donation.query.count()
+    if existing >= rows:
+        print(f"Using existing dataset ({existing:,} donations)")
+        return
+
+    realtor_count = -(-rows // MONTHS_PER_REALTOR)
+    print(f"Seeding {realtor_count:,} realtors, {rows:,} transactions and {rows:,} donations...")
+    started = time.perf_counter()
+    now = datetime.utcnow()
+
+    realtors = [
+        {
+            'email': f'bench{i}@example.com',
+            'password_hash': 'x',
+            'first_name': 'Bench',
+            'last_name': f'Realtor{i}',
+            'brokerage': f'Brokerage {i % 50}',
+            'donation_amount_per_transaction': 100,
+            'is_active': True,
+            'is_approved': True,
+            'is_admin': False,
+            'approval_status': 'approved',
+            'created_at': datetime(2019, 12, 1),
+            'updated_at': now
+        }
+        for i in range(realtor_count)
+    ]
+    db.session.execute(insert(Realtor), realtors)
+    db.session.commit()
+    realtor_ids = [r for (r,) in db.session.query(Realtor.id).filter(Realtor.email.like('bench%')).order_by(Realtor.id)]
+
+    transaction_id = (db.session.query(db.func.max(Transaction.id)).scalar() or 0) + 1
+    transactions, donations = [], []
+    for n in range(rows):
+        realtor_id = realtor_ids[n // MONTHS_PER_REALTOR]
+        period = n % MONTHS_PER_REALTOR
+        month, year = period % 12 + 1, 2020 + period // 12
+        count = n % 4 + 1
+        transactions.append({
+            'id': transaction_id,
+            'realtor_id': realtor_id,
+            'month': month,
+            'year': year,
+            'closed_transactions_count': count,
+            'calculated_donation_amount': count * 100,
+            'status': 'paid',
+            'submitted_at': datetime(year, month, 28)
+        })
+        donations.append({
+            'realtor_id': realtor_id,
+            'transaction_id': transaction_id,
+            'amount': count * 100,
+            'payment_method': 'credit_card',
+            'payment_reference': f'bench-{transaction_id}',
+            'payment_status': 'completed',
+            'paid_at': datetime(year, month, 28),
+            'created_at': datetime(year, month, 28)
+        })
+        transaction_id += 1
+
+        if len(transactions) >= BATCH_SIZE:
+            db.session.execute(insert(Transaction), transactions)
+            db.session.execute(insert(Donation), donations)
+            db.session.commit()
+            transactions, donations = [], []
+
+    if transactions:
+        db.session.execute(insert(Transaction), transactions)
+        db.session.execute(insert(Donation), donations)
+        db.session.commit()
+
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def run_export(dataset, export_format):
+    """Drain one export generator and report its cost"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    chunks = 0
+
+    for chunk in stream_export(dataset, export_format):
+        size += len(chunk)
+        chunks += 1
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+
+    print(f"{dataset:<13} {export_format:<5} {elapsed:8.1f}s {size / 1024 / 1024:10.1f} MB "
+          f"{chunks:8,} chunks   peak heap {peak / 1024 / 1024:6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming admin exports')
+    parser.add_argument('--rows', type=int, default=1000000, help='donations/transactions to seed')
+    parser.add_argument('--formats', default='csv,xlsx', help='comma-separated export formats')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.test_request_context():
+        seed(args.rows)
+        print("-" * 80)
+        for dataset in ('donations', 'transactions'):
+            for export_format in args.formats.split(','):
+                run_export(dataset, export_format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark the admin CSV transaction import.
+
+Seeds approved realtors (bulk, skipped if they exist), builds a CSV of --rows
+monthly closings for 2020-2021 with a share of bad rows (unknown emails,
+invalid months, negative counts), posts it to /api/admin/transactions/import
+and reports time and the import report. A second pass of the same file
+measures the all-conflicts case. Earlier runs' imported transactions are
+deleted first.
+
+Usage (from backend/):
+    python -m benchmarks.import_benchmark --rows 50000
+    DATABASE_URL=postgresql://... python -m benchmarks.import_benchmark
+"""
+import argparse
+import io
+import os
+import random
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///import_benchmark.db')
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from extensions import db
+from models import Realtor, Transaction
+from benchmarks.synthetic_data import generate
+
+EMAIL_TEMPLATE = 'import{}@benchmark.example.com'
+ADMIN_EMAIL = 'import.admin@benchmark.example.com'
+PERIODS = [(month, year) for year in (2020, 2021) for month in range(1, 13)]
+
+
+def seed(realtor_count):
+    if not Realtor.query.filter_by(email=EMAIL_TEMPLATE.format(realtor_count - 1)).first():
+        if Realtor.query.filter_by(email=EMAIL_TEMPLATE.format(0)).first():
+            raise SystemExit('Database holds fewer benchmark realtors than needed; use a fresh database')
+        print(f"Seeding {realtor_count:,} realtors...")
+        generate(realtor_count, history_months=1, applications=0, email_template=EMAIL_TEMPLATE,
+                 all_approved=True, progress=False)
+
+    admin = Realtor.query.filter_by(email=ADMIN_EMAIL).first()
+    if not admin:
+        admin = Realtor(email=ADMIN_EMAIL, first_name='Import', last_name='Admin', is_admin=True,
+                        is_approved=True, approval_status='approved', donation_amount_per_transaction=0)
+        admin.set_password('password123')
+        db.session.add(admin)
+        db.session.commit()
+    return admin
+
+
+def build_csv(rows, realtor_count, bad_rate, rng):
+    buffer = io.StringIO()
+    buffer.write('email,month,year,count\n')
+    for index in range(rows):
+        month, year = PERIODS[index % len(PERIODS)]
+        email = EMAIL_TEMPLATE.format(index // len(PERIODS) % realtor_count)
+        count = rng.randint(0, 6)
+        if rng.random() < bad_rate:
+            kind = rng.randrange(3)
+            if kind == 0:
+                email = f'nobody{index}@benchmark.example.com'
+            elif kind == 1:
+                month = 13
+            else:
+                count = -1
+        buffer.write(f'{email},{month},{year},{count}\n')
+    return buffer.getvalue().encode('utf-8')
+
+
+def run(client, token, body, label):
+    started = time.perf_counter()
+    response = client.post('/api/admin/transactions/import', data=body, content_type='text/csv',
+                           headers={'Authorization': f'Bearer {token}'})
+    elapsed = time.perf_counter() - started
+    report = response.get_json()
+    if response.status_code != 200:
+        raise SystemExit(f'{label}: HTTP {response.status_code} {report}')
+    print(f"{label:<20} {elapsed:>7.2f}s  {report['rows'] / elapsed:>9,.0f} rows/s  "
+          f"created {report['created']:,}  already submitted {report['already_submitted']:,}  "
+          f"failed {report['failed']:,}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the admin CSV transaction import')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--bad-rate', type=float, default=0.01, help='share of rows with errors')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        realtor_count = -(-args.rows // len(PERIODS))
+        admin = seed(realtor_count)
+        deleted = Transaction.query.filter(Transaction.year.in_([2020, 2021]))\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        if deleted:
+            print(f"Deleted {deleted:,} transactions from an earlier run")
+        token = create_access_token(identity=str(admin.id))
+
+    body = build_csv(args.rows, realtor_count, args.bad_rate, random.Random(args.seed))
+    print(f"CSV: {args.rows:,} rows, {len(body) / 1024 / 1024:.1f} MB")
+
+    client = app.test_client()
+    first = run(client, token, body, 'Import')
+    run(client, token, body, 'Re-import (no-op)')
+    for error in first['errors'][:5]:
+        print(f"  row {error['row']}: {error['email']}: {error['error']}")
+
+
+if __name__ == '__main__':
+    main()
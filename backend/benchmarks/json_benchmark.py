@@ -0,0 +1,117 @@
+"""
+Benchmark serializing a large transaction listing.
+
+Compares the previous path (ORM objects -> to_dict() -> stdlib JSON provider)
+with column serializers + FastJSONProvider, for one realtor with --rows
+transactions (half of them paid). Reports the median of --repeat runs for the
+full path and for encoding alone.
+
+Usage (from backend/):
+    python -m benchmarks.json_benchmark --rows 10000
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///json_benchmark.db')
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from app import create_app
+from extensions import db
+from models import Realtor, Transaction, Donation
+from utils import json_provider
+from utils.json_provider import FastJSONProvider
+from utils.serializers import serialize_transactions
+
+BENCH_EMAIL = 'json-bench@example.com'
+
+
+def seed(rows):
+    """Create one realtor with `rows` monthly transactions, every other one paid"""
+    realtor = Realtor.query.filter_by(email=BENCH_EMAIL).first()
+    if realtor and Transaction.query.filter_by(realtor_id=realtor.id).count() == rows:
+        return realtor.id
+
+    if realtor:
+        Donation.query.filter_by(realtor_id=realtor.id).delete()
+        Transaction.query.filter_by(realtor_id=realtor.id).delete()
+        db.session.delete(realtor)
+        db.session.commit()
+
+    realtor = Realtor(email=BENCH_EMAIL, first_name='Json', last_name='Bench', password_hash='x',
+                      donation_amount_per_transaction=100, is_approved=True, approval_status='approved')
+    db.session.add(realtor)
+    db.session.commit()
+
+    # One row per month going back from 2025, so (realtor, month, year) stays unique
+    periods = [(12 - n % 12, 2025 - n // 12) for n in range(rows)]
+    db.session.execute(insert(Transaction), [
+        {
+            'realtor_id': realtor.id, 'month': month, 'year': year,
+            'closed_transactions_count': n % 4 + 1, 'calculated_donation_amount': (n % 4 + 1) * 100,
+            'status': 'paid' if n % 2 == 0 else 'pending', 'submitted_at': datetime(2020, 1, 1, 12, 30, n % 60)
+        }
+        for n, (month, year) in enumerate(periods)
+    ])
+    paid = db.session.query(Transaction.id, Transaction.calculated_donation_amount)\
+        .filter(Transaction.realtor_id == realtor.id, Transaction.status == 'paid').all()
+    db.session.execute(insert(Donation), [
+        {'realtor_id': realtor.id, 'transaction_id': t_id, 'amount': amount, 'payment_method': 'credit_card',
+         'payment_status': 'completed', 'paid_at': datetime(2020, 2, 1), 'created_at': datetime(2020, 2, 1)}
+        for t_id, amount in paid
+    ])
+    db.session.commit()
+    return realtor.id
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transaction list serialization')
+    parser.add_argument('--rows', type=int, default=10000, help='transactions to serialize')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (median is reported)')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    app.debug = False
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    with app.test_request_context():
+        realtor_id = seed(args.rows)
+
+        def before():
+            transactions = Transaction.query.filter_by(realtor_id=realtor_id)\
+                .order_by(Transaction.year.desc(), Transaction.month.desc()).all()
+            return stdlib.response({'transactions': [t.to_dict() for t in transactions]})
+
+        def after():
+            return fast.response({'transactions': serialize_transactions(Transaction.realtor_id == realtor_id)})
+
+        old_payload = {'transactions': [t.to_dict() for t in Transaction.query.filter_by(realtor_id=realtor_id)
+                                        .order_by(Transaction.year.desc(), Transaction.month.desc()).all()]}
+        new_payload = {'transactions': serialize_transactions(Transaction.realtor_id == realtor_id)}
+        assert fast.loads(after().get_data()) == fast.loads(before().get_data()), 'payloads differ'
+
+        encoder = 'orjson' if json_provider.orjson else 'stdlib (orjson not installed)'
+        print(f"{args.rows:,} transactions, median of {args.repeat} runs, fast encoder: {encoder}")
+        print("-" * 72)
+        print(f"{'encode only, to_dict payload, stdlib':<48} {measure(lambda: stdlib.response(old_payload), args.repeat):8.1f} ms")
+        print(f"{'encode only, column payload, fast provider':<48} {measure(lambda: fast.response(new_payload), args.repeat):8.1f} ms")
+        print(f"{'before: query + to_dict + stdlib':<48} {measure(before, args.repeat):8.1f} ms")
+        print(f"{'after: column serializer + fast provider':<48} {measure(after, args.repeat):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
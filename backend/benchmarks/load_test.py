@@ -0,0 +1,312 @@
+"""
+Load test the API with scripted user journeys.
+
+Starts the app under gunicorn (or targets --url), runs concurrent virtual users
+through realtor and admin journeys for --duration seconds and reports
+p50/p95/p99 latency, throughput and errors per endpoint. Results can be saved
+as a baseline and later runs compared against it.
+
+Realtor journey: login, profile, dashboard stats, transaction/donation history,
+notifications, pending donations, submit a month's transactions, pay for it.
+Admin journey: login, admin stats, realtor/transaction/donation listings,
+grant applications.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///load_test.db python create_test_data.py --load-test 2000
+    DATABASE_URL=sqlite:///load_test.db python -m benchmarks.load_test --users 20 --duration 60 \\
+        --save-baseline benchmarks/baselines/local.json
+    DATABASE_URL=sqlite:///load_test.db python -m benchmarks.load_test --compare benchmarks/baselines/local.json
+
+Submissions use months before the seeded history, so reseed a fresh database
+before recording a baseline; reruns on the same data show up as conflicts.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from create_test_data import (LOAD_TEST_ADMIN_EMAIL, LOAD_TEST_EMAIL, LOAD_TEST_PASSWORD,
+                              load_test_history_periods)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder:
+    """Collects latencies per endpoint label from every virtual user"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.conflicts = 0
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+    def conflict(self):
+        with self._lock:
+            self.conflicts += 1
+
+
+class SubmissionSlots:
+    """Unused (realtor email, month, year) periods, handed out once each across threads"""
+
+    def __init__(self, realtors, seed):
+        self._lock = threading.Lock()
+        slots = [(LOAD_TEST_EMAIL.format(r), month, year) for month, year in free_periods() for r in range(realtors)]
+        random.Random(seed).shuffle(slots)
+        self._slots = iter(slots)
+
+    def take(self):
+        with self._lock:
+            return next(self._slots, None)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Client:
+    """A requests.Session that times every call under a fixed endpoint label"""
+
+    def __init__(self, base_url, recorder):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.session = requests.Session()
+
+    def call(self, method, path, label=None, expected=(200,), **kwargs):
+        label = label or f'{method} {path.split("?")[0]}'
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=60, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(label, time.perf_counter() - started, False)
+            return None
+        self.recorder.record(label, time.perf_counter() - started, response.status_code in expected)
+        return response
+
+    def login(self, email):
+        response = self.call('POST', '/api/auth/login', json={'email': email, 'password': LOAD_TEST_PASSWORD})
+        if response is None or response.status_code != 200:
+            return False
+        self.session.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+        return True
+
+
+def free_periods():
+    """Months before the seeded history that are still open for submission (the API accepts 2020 onwards)"""
+    first_month, first_year = load_test_history_periods()[0]
+    periods = []
+    for index in range(2020 * 12, first_year * 12 + first_month - 1):
+        periods.append((index % 12 + 1, index // 12))
+    return periods
+
+
+def realtor_journey(client, email, slot):
+    """Dashboard reads, then submit and pay for `slot` (month, year) if one is given"""
+    if not client.login(email):
+        return
+    client.call('GET', '/api/realtors/profile')
+    client.call('GET', '/api/realtors/stats')
+    client.call('GET', '/api/donations/stats')
+    client.call('GET', '/api/transactions/history')
+    client.call('GET', '/api/donations/history')
+    client.call('GET', '/api/notifications/?limit=50')
+    client.call('GET', '/api/donations/pending')
+
+    if slot is None:
+        return
+    month, year = slot
+
+    # 409 means the period was taken by an earlier run on the same data; it is counted separately
+    response = client.call('POST', '/api/transactions/submit', expected=(201, 409),
+                           json={'closed_transactions_count': random.randint(1, 4), 'month': month, 'year': year})
+    if response is not None and response.status_code == 201:
+        transaction_id = response.json()['transaction']['id']
+        client.call('POST', '/api/donations/payment', expected=(201,),
+                    json={'transaction_id': transaction_id, 'payment_method': 'bank_transfer'})
+    elif response is not None and response.status_code == 409:
+        client.recorder.conflict()
+
+
+def admin_journey(client):
+    if not client.login(LOAD_TEST_ADMIN_EMAIL):
+        return
+    client.call('GET', '/api/admin/stats')
+    client.call('GET', '/api/admin/realtors?page=1&per_page=20')
+    client.call('GET', '/api/admin/transactions')
+    client.call('GET', '/api/admin/donations')
+    client.call('GET', '/api/grant-applications/?page=1&per_page=20')
+
+
+def virtual_user(user_index, args, recorder, deadline, submission_slots):
+    rng = random.Random(args.seed + user_index)
+    while time.monotonic() < deadline:
+        client = Client(args.url, recorder)
+        if rng.random() < args.admin_ratio:
+            admin_journey(client)
+        else:
+            slot = submission_slots.take()
+            if slot:
+                realtor_journey(client, slot[0], slot[1:])
+            else:
+                # Every open period has been submitted; keep running the read path
+                realtor_journey(client, LOAD_TEST_EMAIL.format(rng.randrange(args.realtors)), None)
+        client.session.close()
+
+
+def start_gunicorn(args):
+    """Run the app under gunicorn and wait until it answers"""
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers), '--threads', str(args.threads),
+        '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning',
+        f"app:create_app('{args.config}')"
+    ]
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=log)
+    for _ in range(100):
+        try:
+            requests.get(f'{args.url}/api/health', timeout=1)
+            return server
+        except requests.RequestException:
+            if server.poll() is not None:
+                log.seek(0)
+                raise RuntimeError(f'gunicorn exited: {log.read().decode()[-2000:]}')
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start within 20s')
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for label, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        endpoints[label] = {
+            'requests': len(values),
+            'errors': recorder.errors[label],
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'mean_ms': round(sum(values) / len(values) * 1000, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+        }
+    total = sum(e['requests'] for e in endpoints.values())
+    return {
+        'total_requests': total,
+        'total_errors': sum(e['errors'] for e in endpoints.values()),
+        'throughput_rps': round(total / elapsed, 2),
+        'submission_conflicts': recorder.conflicts,
+        'endpoints': endpoints,
+    }
+
+
+def print_report(summary, baseline=None):
+    print(f"{'endpoint':<42} {'reqs':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}"
+          + (f" {'p95 vs base':>12}" if baseline else ''))
+    print('-' * (90 + (13 if baseline else 0)))
+    for label, e in summary['endpoints'].items():
+        line = (f"{label:<42} {e['requests']:>6} {e['errors']:>4} {e['throughput_rps']:>7.1f} "
+                f"{e['p50_ms']:>7.1f}ms {e['p95_ms']:>6.1f}ms {e['p99_ms']:>6.1f}ms")
+        if baseline:
+            base = baseline['endpoints'].get(label)
+            line += f" {(e['p95_ms'] / base['p95_ms'] - 1) * 100:>+11.1f}%" if base and base['p95_ms'] else f" {'new':>12}"
+        print(line)
+    print('-' * (90 + (13 if baseline else 0)))
+    print(f"{summary['total_requests']:,} requests, {summary['total_errors']:,} errors, "
+          f"{summary['throughput_rps']:.1f} req/s overall, {summary['submission_conflicts']:,} submission conflicts")
+
+
+def regressions(summary, baseline, tolerance):
+    """Endpoints whose p95 grew by more than `tolerance` percent"""
+    found = []
+    for label, e in summary['endpoints'].items():
+        base = baseline['endpoints'].get(label)
+        if base and base['p95_ms'] and e['p95_ms'] > base['p95_ms'] * (1 + tolerance / 100):
+            found.append(label)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the API with scripted journeys')
+    parser.add_argument('--url', help='target an already running server instead of starting gunicorn')
+    parser.add_argument('--users', type=int, default=10, help='concurrent virtual users')
+    parser.add_argument('--duration', type=int, default=30, help='seconds to run')
+    parser.add_argument('--realtors', type=int, default=1000, help='seeded load-test realtors to draw from')
+    parser.add_argument('--admin-ratio', type=float, default=0.1, help='share of journeys run as the admin')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for journey selection')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=2, help='gunicorn threads per worker')
+    parser.add_argument('--port', type=int, default=8765, help='gunicorn port')
+    parser.add_argument('--config', default='production', help='create_app config name for gunicorn')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=20.0, help='allowed p95 regression in percent')
+    args = parser.parse_args()
+
+    server = None
+    if not args.url:
+        args.url = f'http://127.0.0.1:{args.port}'
+        server = start_gunicorn(args)
+
+    submission_slots = SubmissionSlots(args.realtors, args.seed)
+    recorder = Recorder()
+    print(f"Running {args.users} users for {args.duration}s against {args.url}...")
+    started = time.monotonic()
+    deadline = started + args.duration
+    try:
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            for user_index in range(args.users):
+                pool.submit(virtual_user, user_index, args, recorder, deadline, submission_slots)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(recorder, time.monotonic() - started)
+    summary['meta'] = {
+        'recorded_at': datetime.utcnow().isoformat(),
+        'users': args.users, 'duration': args.duration, 'workers': args.workers, 'threads': args.threads,
+        'database': os.environ.get('DATABASE_URL', 'default'),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_report(summary, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline:
+        regressed = regressions(summary, baseline, args.tolerance)
+        if regressed:
+            print(f"p95 regressed more than {args.tolerance:.0f}% on: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
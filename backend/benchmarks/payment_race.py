@@ -0,0 +1,134 @@
+"""
+Check that concurrent payments for one transaction are recorded exactly once.
+
+Seeds a realtor with --transactions pending transactions, starts the app under
+gunicorn (or targets --url) and, for each transaction, releases --attempts
+payment requests at the same instant from separate threads. Every transaction
+must end up with exactly one 201 and 409s for the rest, no 5xx responses and
+exactly one donation row.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///payment_race.db python -m benchmarks.payment_race --transactions 50 --attempts 8
+"""
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmarks.load_test import start_gunicorn
+
+RACE_EMAIL = 'payment.race{}@example.com'
+RACE_PASSWORD = 'password123'
+
+
+def seed(transaction_count):
+    """Create an approved realtor with pending transactions; returns (email, transaction ids)"""
+    from app import create_app
+    from extensions import db
+    from models import Realtor, Transaction
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        email = RACE_EMAIL.format(datetime.utcnow().strftime('%Y%m%d%H%M%S%f'))
+        realtor = Realtor(email=email, first_name='Payment', last_name='Race', is_approved=True,
+                          approval_status='approved', donation_amount_per_transaction=100)
+        realtor.set_password(RACE_PASSWORD)
+        db.session.add(realtor)
+        db.session.flush()
+
+        transactions = [
+            Transaction(realtor_id=realtor.id, month=index % 12 + 1, year=2000 + index // 12,
+                        closed_transactions_count=2, calculated_donation_amount=200, status='pending')
+            for index in range(transaction_count)
+        ]
+        db.session.add_all(transactions)
+        db.session.commit()
+        return email, [transaction.id for transaction in transactions]
+
+
+def donation_counts(transaction_ids):
+    from app import create_app
+    from extensions import db
+    from models import Donation
+
+    with create_app('production').app_context():
+        rows = db.session.query(Donation.transaction_id, db.func.count())\
+            .filter(Donation.transaction_id.in_(transaction_ids))\
+            .group_by(Donation.transaction_id).all()
+        return dict(rows)
+
+
+def race(url, token, transaction_id, attempts):
+    """Fire `attempts` payments for one transaction at once; returns their status codes"""
+    barrier = threading.Barrier(attempts)
+
+    def pay(_):
+        session = requests.Session()
+        barrier.wait()
+        try:
+            return session.post(f'{url}/api/donations/payment', timeout=60,
+                                headers={'Authorization': f'Bearer {token}'},
+                                json={'transaction_id': transaction_id, 'payment_method': 'bank_transfer'}).status_code
+        except requests.RequestException:
+            return 'connection error'
+
+    with ThreadPoolExecutor(max_workers=attempts) as pool:
+        return list(pool.map(pay, range(attempts)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Race concurrent payments for the same transactions')
+    parser.add_argument('--url', help='target an already running server instead of starting gunicorn')
+    parser.add_argument('--transactions', type=int, default=50, help='transactions to race on')
+    parser.add_argument('--attempts', type=int, default=8, help='simultaneous payments per transaction')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--port', type=int, default=8766, help='gunicorn port')
+    parser.add_argument('--config', default='production', help='create_app config name for gunicorn')
+    args = parser.parse_args()
+
+    email, transaction_ids = seed(args.transactions)
+
+    server = None
+    if not args.url:
+        args.url = f'http://127.0.0.1:{args.port}'
+        server = start_gunicorn(args)
+
+    try:
+        login = requests.post(f'{args.url}/api/auth/login', json={'email': email, 'password': RACE_PASSWORD}, timeout=30)
+        login.raise_for_status()
+        token = login.json()['access_token']
+
+        totals = Counter()
+        bad = []
+        for transaction_id in transaction_ids:
+            statuses = Counter(race(args.url, token, transaction_id, args.attempts))
+            totals.update(statuses)
+            if statuses[201] != 1 or statuses[409] != args.attempts - 1:
+                bad.append((transaction_id, dict(statuses)))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    donations = donation_counts(transaction_ids)
+    wrong_rows = {tid: donations.get(tid, 0) for tid in transaction_ids if donations.get(tid, 0) != 1}
+
+    print(f"{args.transactions} transactions x {args.attempts} simultaneous payments")
+    print(f"Responses: {dict(sorted(totals.items(), key=str))}")
+    for transaction_id, statuses in bad[:10]:
+        print(f"  transaction {transaction_id}: {statuses}")
+    if wrong_rows:
+        print(f"  transactions without exactly one donation: {wrong_rows}")
+
+    if bad or wrong_rows:
+        raise SystemExit(1)
+    print("✅ Every transaction was paid exactly once")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the Stripe API and its webhooks.
+Answers POST /v1/payment_intents the way Stripe does (form-encoded request,
+secret key as basic auth, Idempotency-Key replays the first intent) and can
+settle intents by sending signed payment_intent.succeeded/payment_failed
+events to a webhook URL. POST /v1/payment_intents/<id>/confirm settles an
+intent as paid and, when --webhook-url is given, sends its event. Used by
+benchmarks/stripe_webhook_check.py and for local development:
+    python -m benchmarks.stripe_stub --port 12111 \
+        --webhook-url http://127.0.0.1:5000/api/donations/stripe-webhook --webhook-secret whsec_stub
+    STRIPE_API_URL=http://127.0.0.1:12111 STRIPE_SECRET_KEY=sk_test_stub STRIPE_WEBHOOK_SECRET=whsec_stub flask run
+"""
+import argparse
+import base64
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import requests
+
+from utils.stripe_payments import sign_payload
+
+
+def _unflatten(fields):
+    """Stripe form fields (metadata[transaction_id]=5) back into nested dicts"""
+    params = {}
+    for name, value in fields:
+        if '[' in name and name.endswith(']'):
+            outer, inner = name[:-1].split('[', 1)
+            params.setdefault(outer, {})[inner] = value
+        else:
+            params[name] = value
+    return params
+
+
+class StubServer:
+    """Threaded HTTP server for PaymentIntents; usable as a context manager"""
+
+    def __init__(self, port=0, latency=0.0, webhook_url=None, webhook_secret=None):
+        stub = self
+        self.latency = latency
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.intents = {}
+        self.requests = 0
+        self._idempotency = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                fields = parse_qsl(self.rfile.read(length).decode('utf-8'))
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                auth = self.headers.get('Authorization', '')
+                key = base64.b64decode(auth[6:]).decode('utf-8').split(':')[0] if auth.startswith('Basic ') else ''
+                if not key.startswith('sk_'):
+                    return self._send(401, {'error': {'type': 'invalid_request_error',
+                                                      'message': 'Invalid API Key provided'}})
+                if self.path.startswith('/v1/payment_intents/') and self.path.endswith('/confirm'):
+                    intent_id = self.path.split('/')[3]
+                    if intent_id not in stub.intents:
+                        return self._send(404, {'error': {'type': 'invalid_request_error',
+                                                          'message': f"No such payment_intent: '{intent_id}'"}})
+                    return self._send(200, stub.confirm(intent_id))
+                if self.path != '/v1/payment_intents':
+                    return self._send(404, {'error': {'type': 'invalid_request_error',
+                                                      'message': f'Unrecognized request URL (POST: {self.path})'}})
+
+                params = _unflatten(fields)
+                try:
+                    amount = int(params.get('amount', ''))
+                except ValueError:
+                    return self._send(400, {'error': {'type': 'invalid_request_error',
+                                                      'message': 'Invalid integer: amount'}})
+                status, body = stub.create_intent(amount, params.get('currency', 'usd'), params.get('metadata', {}),
+                                                  self.headers.get('Idempotency-Key'))
+                return self._send(status, body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def create_intent(self, amount, currency, metadata, idempotency_key=None):
+        with self._lock:
+            self.requests += 1
+            if idempotency_key and idempotency_key in self._idempotency:
+                return 200, self.intents[self._idempotency[idempotency_key]]
+            if amount < 50:
+                return 400, {'error': {'type': 'invalid_request_error', 'code': 'amount_too_small',
+                                       'message': 'Amount must be at least $0.50 usd'}}
+            intent_id = f'pi_stub{next(self._ids):06d}'
+            intent = {
+                'id': intent_id, 'object': 'payment_intent', 'amount': amount, 'amount_received': 0,
+                'currency': currency, 'metadata': metadata, 'status': 'requires_payment_method',
+                'client_secret': f'{intent_id}_secret_stub', 'created': int(time.time()),
+            }
+            self.intents[intent_id] = intent
+            if idempotency_key:
+                self._idempotency[idempotency_key] = intent_id
+            return 200, intent
+
+    def event(self, intent_id, succeeded=True):
+        """The event Stripe would send when the intent's payment succeeds or fails"""
+        with self._lock:
+            intent = dict(self.intents[intent_id])
+            event_number = next(self._ids)
+        if succeeded:
+            intent.update(status='succeeded', amount_received=intent['amount'])
+        else:
+            intent.update(status='requires_payment_method',
+                          last_payment_error={'code': 'card_declined', 'message': 'Your card was declined.'})
+        return {
+            'id': f'evt_stub{event_number:06d}', 'object': 'event', 'created': int(time.time()),
+            'type': 'payment_intent.succeeded' if succeeded else 'payment_intent.payment_failed',
+            'data': {'object': intent},
+        }
+
+    def confirm(self, intent_id):
+        """Settle an intent as paid and send its event to the webhook in the background, like Stripe"""
+        event = self.event(intent_id)
+        if self.webhook_url:
+            threading.Thread(target=self.deliver, args=(event, self.webhook_url, self.webhook_secret),
+                             daemon=True).start()
+        return event['data']['object']
+
+    @staticmethod
+    def deliver(event, webhook_url, secret, session=None, timestamp=None):
+        """POST an event to a webhook with a valid Stripe-Signature; returns the response"""
+        payload = json.dumps(event).encode('utf-8')
+        return (session or requests).post(webhook_url, data=payload, timeout=30, headers={
+            'Content-Type': 'application/json',
+            'Stripe-Signature': sign_payload(payload, secret, timestamp),
+        })
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local Stripe API stub')
+    parser.add_argument('--port', type=int, default=12111)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to delay each response')
+    parser.add_argument('--webhook-url', help='where confirmed intents send their events')
+    parser.add_argument('--webhook-secret', default='whsec_stub', help='webhook signing secret')
+    args = parser.parse_args()
+
+    with StubServer(args.port, args.latency, args.webhook_url, args.webhook_secret) as stub:
+        print(f"Stripe stub listening on {stub.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+End-to-end check of Stripe payments against the local Stripe stub.
+
+Seeds a realtor with --transactions pending transactions, starts the app under
+gunicorn pointed at benchmarks/stripe_stub.py, creates a PaymentIntent for
+each transaction through the API, then delivers every intent's
+payment_intent.succeeded event --redeliveries times at once (Stripe retries
+in bursts) along with forged and stale events. Reports webhook latency, then
+runs the event worker twice and checks that:
+  - every genuine delivery got a 200 and every forged/stale one a 400
+  - the inbox holds each event id once
+  - every transaction is paid with exactly one donation referencing its intent
+
+Usage (from backend/):
+    python -m benchmarks.stripe_webhook_check --transactions 100 --redeliveries 5
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+WEBHOOK_SECRET = 'whsec_stub'
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check Stripe payments and webhooks against the local stub')
+    parser.add_argument('--transactions', type=int, default=100)
+    parser.add_argument('--redeliveries', type=int, default=5, help='simultaneous deliveries of each event')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads delivering webhooks')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--port', type=int, default=8767, help='gunicorn port')
+    parser.add_argument('--config', default='production', help='create_app config name for gunicorn')
+    args = parser.parse_args()
+
+    from benchmarks.stripe_stub import StubServer
+
+    with StubServer() as stub:
+        # Config reads the environment at import time, and gunicorn inherits it
+        os.environ.setdefault('DATABASE_URL', 'sqlite:///stripe_check.db')
+        os.environ.update(STRIPE_SECRET_KEY='sk_test_stub', STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+                          STRIPE_API_URL=stub.url)
+
+        from app import create_app
+        from extensions import db
+        from models import Donation, StripeEvent, Transaction
+        from benchmarks.load_test import start_gunicorn
+        from benchmarks.payment_race import RACE_PASSWORD, seed
+        from utils.stripe_payments import process_stripe_events
+
+        email, transaction_ids = seed(args.transactions)
+        args.url = f'http://127.0.0.1:{args.port}'
+        webhook_url = f'{args.url}/api/donations/stripe-webhook'
+        server = start_gunicorn(args)
+
+        try:
+            login = requests.post(f'{args.url}/api/auth/login', json={'email': email, 'password': RACE_PASSWORD},
+                                  timeout=30)
+            login.raise_for_status()
+            session = requests.Session()
+            session.headers['Authorization'] = f"Bearer {login.json()['access_token']}"
+
+            intents = {}
+            for transaction_id in transaction_ids:
+                response = session.post(f'{args.url}/api/donations/payment-intent', json={'transaction_id': transaction_id},
+                                        timeout=30)
+                if response.status_code != 201:
+                    raise SystemExit(f'payment-intent for {transaction_id}: HTTP {response.status_code} {response.text}')
+                intents[transaction_id] = response.json()['payment_intent']['id']
+
+            # Asking again returns the same intent instead of a second charge
+            again = session.post(f'{args.url}/api/donations/payment-intent', json={'transaction_id': transaction_ids[0]},
+                                 timeout=30).json()['payment_intent']['id']
+            if again != intents[transaction_ids[0]]:
+                raise SystemExit('a repeated payment-intent request opened a second intent')
+
+            # Manual card payments are refused now that Stripe is configured
+            manual = session.post(f'{args.url}/api/donations/payment', json={'transaction_id': transaction_ids[0]},
+                                  timeout=30)
+
+            events = [stub.event(intent_id) for intent_id in intents.values()]
+            deliveries = [(event, 'genuine') for event in events for _ in range(args.redeliveries)]
+            forged = events[0] | {'id': 'evt_forged'}
+            deliveries += [(forged, 'forged'), (events[1], 'stale')]
+
+            latencies, statuses = [], {'genuine': [], 'forged': [], 'stale': []}
+            lock = threading.Lock()
+            local = threading.local()
+
+            def deliver(item):
+                event, kind = item
+                local.session = getattr(local, 'session', None) or requests.Session()
+                started = time.perf_counter()
+                if kind == 'forged':
+                    payload = json.dumps(event).encode('utf-8')
+                    response = local.session.post(webhook_url, data=payload, timeout=30, headers={
+                        'Stripe-Signature': f't={int(time.time())},v1={"0" * 64}'})
+                else:
+                    timestamp = time.time() - 3600 if kind == 'stale' else None
+                    response = StubServer.deliver(event, webhook_url, WEBHOOK_SECRET, local.session, timestamp)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                    statuses[kind].append(response.status_code)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(deliver, deliveries))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    latencies.sort()
+    print(f"Webhook: {len(deliveries):,} deliveries in {elapsed:.2f}s ({len(deliveries) / elapsed:,.0f}/s), "
+          f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"Manual card payment with Stripe configured: HTTP {manual.status_code}")
+
+    app = create_app('production')
+    with app.app_context():
+        started = time.perf_counter()
+        first = process_stripe_events()
+        worker_elapsed = time.perf_counter() - started
+
+        # Apply everything again: a replayed event must not record a second donation
+        StripeEvent.query.filter(StripeEvent.id.in_([event['id'] for event in events]))\
+            .update({'status': 'pending'}, synchronize_session=False)
+        db.session.commit()
+        second = process_stripe_events()
+
+        stored = StripeEvent.query.filter(StripeEvent.id.in_([event['id'] for event in events] + ['evt_forged'])).count()
+        donations = {
+            donation.transaction_id: donation.payment_reference
+            for donation in Donation.query.filter(Donation.transaction_id.in_(transaction_ids))
+        }
+        donation_rows = Donation.query.filter(Donation.transaction_id.in_(transaction_ids)).count()
+        unpaid = Transaction.query.filter(Transaction.id.in_(transaction_ids), Transaction.status != 'paid').count()
+
+    print(f"Worker: {first} in {worker_elapsed:.2f}s; replayed: {second}")
+
+    problems = []
+    if any(status != 200 for status in statuses['genuine']):
+        problems.append(f"genuine deliveries not 200: {sorted(set(statuses['genuine']))}")
+    if statuses['forged'] != [400] or statuses['stale'] != [400]:
+        problems.append(f"forged/stale deliveries: {statuses['forged']} {statuses['stale']}")
+    if manual.status_code != 400:
+        problems.append(f'manual card payment answered {manual.status_code}')
+    if stored != len(events):
+        problems.append(f'{stored} inbox rows for {len(events)} events')
+    if donation_rows != len(transaction_ids) or unpaid:
+        problems.append(f'{donation_rows} donations for {len(transaction_ids)} transactions, {unpaid} unpaid')
+    if any(donations.get(transaction_id) != intent_id for transaction_id, intent_id in intents.items()):
+        problems.append('donation payment_reference does not match the PaymentIntent')
+
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if problems:
+        raise SystemExit(1)
+    print("✅ Every transaction was paid once, from its own PaymentIntent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+"""
+Deterministic synthetic dataset generator for capacity planning.
+
+Produces realtors with monthly transaction history, donations, notifications
+and grant applications with realistic shapes:
+  - closings follow a seasonal curve (spring/summer peak) around a per-realtor
+    productivity drawn from a long-tailed distribution
+  - donations are closings x the realtor's donation_amount_per_transaction,
+    mostly paid within a few weeks, with overdue and still-pending tails
+  - realtors join over time, skip the odd month, and older notifications are
+    mostly read while recent ones are mostly unread
+
+Every realtor is generated from its own seeded RNG, so the same arguments
+always produce the same rows. Rows are written with COPY on PostgreSQL and
+DB-API executemany elsewhere; all accounts share one precomputed bcrypt hash.
+About 70,000 realtors make a ~10M-row dataset. Donation rollups are rebuilt
+afterwards unless --skip-rollups is given.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic_data --realtors 60000 --seed 42
+    DATABASE_URL=postgresql://... python -m benchmarks.synthetic_data --realtors 60000
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+
+# Relative closing volume per calendar month (January first)
+SEASONALITY = (0.65, 0.75, 0.95, 1.1, 1.25, 1.35, 1.3, 1.2, 1.0, 0.9, 0.75, 0.8)
+
+# (donation per closed transaction, weight)
+DONATION_LEVELS = ((25, 12), (50, 30), (75, 14), (100, 26), (150, 9), (200, 6), (250, 3))
+
+FIRST_NAMES = ('James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+               'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Carlos', 'Maria', 'Wei', 'Mei', 'Ahmed', 'Fatima', 'Raj', 'Priya', 'Kenji', 'Yuki')
+LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Chen',
+              'Nguyen', 'Kim', 'Patel', 'Singh', 'Tanaka', 'Cohen', 'Rossi', 'Muller')
+BROKERAGE_NAMES = ('Premier', 'Coastal', 'Summit', 'Keystone', 'Harbor', 'Golden State', 'Pacific', 'Valley',
+                   'Heritage', 'Crown', 'Landmark', 'Pinnacle', 'Evergreen', 'Sunset', 'Bayside', 'Cornerstone')
+STREETS = ('Main St', 'Oak Ave', 'Pine St', 'Maple Ct', 'Elm Dr', 'Cedar Ln', 'Sunset Blvd', 'Ocean Ave')
+CITIES = (('Los Angeles', 'CA', '900'), ('Long Beach', 'CA', '908'), ('Pasadena', 'CA', '911'),
+          ('Santa Monica', 'CA', '904'), ('Torrance', 'CA', '905'), ('Glendale', 'CA', '912'))
+APPLICATION_STATUSES = (('pending', 25), ('under_review', 15), ('approved', 40), ('denied', 20))
+
+COLUMNS = {
+    'realtors': ('id', 'email', 'password_hash', 'first_name', 'last_name', 'phone', 'brokerage',
+                 'license_number', 'donation_amount_per_transaction', 'is_active', 'email_verified',
+                 'is_approved', 'is_admin', 'approval_status', 'created_at', 'updated_at', 'approved_at'),
+    'transactions': ('id', 'realtor_id', 'month', 'year', 'closed_transactions_count',
+                     'calculated_donation_amount', 'status', 'submitted_at', 'updated_at'),
+    'donations': ('id', 'realtor_id', 'transaction_id', 'amount', 'payment_method', 'payment_reference',
+                  'payment_status', 'thank_you_image_generated', 'social_media_shared', 'paid_at', 'created_at',
+                  'updated_at'),
+    'notifications': ('id', 'realtor_id', 'type', 'subject', 'message', 'action_url', 'is_read',
+                      'email_sent', 'sent_at', 'read_at'),
+    'grant_applications': ('id', 'application_type', 'applicant_first_name', 'applicant_last_name',
+                           'applicant_address', 'applicant_email', 'applicant_phone', 'applicant_birthday',
+                           'applicant_story', 'submitter_first_name', 'submitter_last_name', 'submitter_email',
+                           'submitter_phone', 'submitter_relationship', 'status', 'created_at', 'updated_at'),
+}
+
+# Parents before children so foreign keys hold at every flush
+TABLE_ORDER = ('realtors', 'transactions', 'donations', 'notifications', 'grant_applications')
+
+
+def history_periods(months, as_of=None):
+    """The `months` (month, year) periods before as_of's month, oldest first"""
+    as_of = as_of or datetime.utcnow()
+    index = as_of.year * 12 + as_of.month - 1
+    return [((i % 12) + 1, i // 12) for i in range(index - months, index)]
+
+
+def _poisson(rng, lam):
+    """Knuth's method; fine for the small rates used here"""
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class BulkLoader:
+    """Buffers rows per table and writes them with COPY (PostgreSQL) or executemany"""
+
+    def __init__(self, engine, batch_size):
+        self.connection = engine.raw_connection()
+        self.postgres = engine.dialect.name == 'postgresql'
+        self.placeholder = '%s' if engine.dialect.paramstyle in ('format', 'pyformat') else '?'
+        self.batch_size = batch_size
+        self.buffers = {table: [] for table in TABLE_ORDER}
+        self.counts = {table: 0 for table in TABLE_ORDER}
+        if engine.dialect.name == 'sqlite':
+            self.connection.cursor().execute('PRAGMA synchronous = OFF')
+
+    def add(self, table, row):
+        self.buffers[table].append(row)
+
+    def full(self):
+        return any(len(rows) >= self.batch_size for rows in self.buffers.values())
+
+    def flush(self):
+        cursor = self.connection.cursor()
+        for table in TABLE_ORDER:
+            rows = self.buffers[table]
+            if not rows:
+                continue
+            columns = COLUMNS[table]
+            if self.postgres:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                placeholders = ', '.join([self.placeholder] * len(columns))
+                cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                                   [tuple(self._adapt(v) for v in row) for row in rows])
+            self.counts[table] += len(rows)
+            rows.clear()
+        self.connection.commit()
+
+    def _adapt(self, value):
+        # Match how SQLAlchemy stores these types on SQLite
+        if isinstance(value, datetime):
+            return value.isoformat(sep=' ')
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def next_ids(self):
+        cursor = self.connection.cursor()
+        ids = {}
+        for table in TABLE_ORDER:
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+            ids[table] = cursor.fetchone()[0] + 1
+        return ids
+
+    def reset_sequences(self):
+        """Explicit ids bypass PostgreSQL sequences; move them past the new rows"""
+        if not self.postgres:
+            return
+        cursor = self.connection.cursor()
+        for table in TABLE_ORDER:
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                           f"(SELECT COALESCE(MAX(id), 1) FROM {table}))")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class Generator:
+    """Emits rows for one dataset; each realtor/application uses its own seeded RNG"""
+
+    def __init__(self, loader, seed, periods, password_hash, email_template, all_approved):
+        self.loader = loader
+        self.seed = seed
+        self.periods = periods
+        self.password_hash = password_hash
+        self.email_template = email_template
+        self.all_approved = all_approved
+        self.ids = loader.next_ids()
+        first_month, first_year = periods[0]
+        self.history_start = datetime(first_year, first_month, 1)
+        last_month, last_year = periods[-1]
+        self.as_of = datetime(last_year + last_month // 12, last_month % 12 + 1, 1)
+
+    def _next_id(self, table):
+        value = self.ids[table]
+        self.ids[table] += 1
+        return value
+
+    def realtor(self, index):
+        rng = random.Random(f'{self.seed}:realtor:{index}')
+        realtor_id = self._next_id('realtors')
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+        # 40% were members before the history window; the rest joined during it
+        if self.all_approved or rng.random() < 0.4:
+            joined_index = -1
+        else:
+            joined_index = rng.randrange(len(self.periods))
+        if joined_index < 0:
+            joined = self.history_start - timedelta(days=rng.randint(1, 365))
+        else:
+            month, year = self.periods[joined_index]
+            joined = datetime(year, month, rng.randint(1, 28), rng.randint(8, 20), rng.randint(0, 59))
+
+        status = 'approved' if self.all_approved else _weighted(rng, (('approved', 90), ('pending', 6), ('denied', 4)))
+        active = self.all_approved or rng.random() < 0.95
+        level = _weighted(rng, DONATION_LEVELS)
+
+        self.loader.add('realtors', (
+            realtor_id, self.email_template.format(index), self.password_hash, first, last,
+            f'(555) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            f'{rng.choice(BROKERAGE_NAMES)} Realty {rng.randint(1, 40)}',
+            f'CA-DRE-{rng.randint(10000000, 99999999)}', level, active, rng.random() < 0.8,
+            status == 'approved', False, status, joined, joined,
+            joined + timedelta(days=rng.randint(1, 5)) if status == 'approved' else None
+        ))
+
+        if status == 'approved':
+            self._history(rng, realtor_id, level, max(joined_index + 1, 0))
+
+    def _history(self, rng, realtor_id, level, first_period):
+        # Long-tailed productivity: most realtors close one or two deals a month, a few close many
+        productivity = min(rng.lognormvariate(0.2, 0.6), 8.0)
+        last = len(self.periods) - 1
+
+        for p in range(first_period, len(self.periods)):
+            month, year = self.periods[p]
+            report_month = datetime(year + month // 12, month % 12 + 1, 1)
+            months_ago = last - p
+
+            self._notify(rng, realtor_id, 'transaction_reminder', f'Time to report {month}/{year}',
+                         'Please report your closed transactions for last month.', '/transactions/submit',
+                         report_month + timedelta(hours=9), months_ago)
+
+            # Some months are never reported; the latest month is often still outstanding
+            if rng.random() > (0.7 if months_ago == 0 else 0.97):
+                continue
+
+            count = _poisson(rng, productivity * SEASONALITY[month - 1])
+            amount = count * level
+            submitted = report_month + timedelta(days=rng.randint(0, 9), hours=rng.randint(8, 21), minutes=rng.randint(0, 59))
+            transaction_id = self._next_id('transactions')
+
+            if amount == 0:
+                status = 'paid'
+            elif months_ago >= 2:
+                status = 'paid' if rng.random() < 0.96 else 'overdue'
+            else:
+                status = 'paid' if rng.random() < 0.6 else 'pending'
+
+            self.loader.add('transactions', (transaction_id, realtor_id, month, year, count, amount, status, submitted,
+                                             submitted))
+
+            if amount == 0:
+                continue
+
+            self._notify(rng, realtor_id, 'payment_request', 'Payment Requested for Monthly Donation',
+                         f'Your donation amount for {month}/{year} is ${amount:.2f}. Please submit your payment.',
+                         '/donations/payment', submitted, months_ago)
+
+            if status == 'paid':
+                paid_at = min(submitted + timedelta(hours=rng.expovariate(1 / 96)), self.as_of - timedelta(minutes=1))
+                shared = rng.random() < 0.25
+                self.loader.add('donations', (
+                    self._next_id('donations'), realtor_id, transaction_id, amount,
+                    _weighted(rng, (('credit_card', 70), ('bank_transfer', 25), ('check', 5))),
+                    f'syn-{transaction_id}', 'completed', shared or rng.random() < 0.2, shared, paid_at, paid_at,
+                    paid_at
+                ))
+                self._notify(rng, realtor_id, 'thank_you', 'Thank You for Your Donation!',
+                             f'Thank you for your ${amount:.2f} donation for {month}/{year}!',
+                             '/donations/share', paid_at, months_ago)
+
+    def _notify(self, rng, realtor_id, kind, subject, message, action_url, sent_at, months_ago):
+        if sent_at >= self.as_of:
+            return
+        # Old notifications are nearly all read; recent ones mostly are not
+        read = rng.random() < (0.92 if months_ago >= 2 else 0.35)
+        read_at = min(sent_at + timedelta(hours=rng.expovariate(1 / 30)), self.as_of) if read else None
+        self.loader.add('notifications', (
+            self._next_id('notifications'), realtor_id, kind, subject, message, action_url,
+            read, rng.random() < 0.9, sent_at, read_at
+        ))
+
+    def application(self, index):
+        rng = random.Random(f'{self.seed}:application:{index}')
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state, zip_prefix = rng.choice(CITIES)
+        created = self.history_start + timedelta(seconds=rng.randrange(int((self.as_of - self.history_start).total_seconds())))
+        for_someone_else = rng.random() < 0.3
+        submitter = (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) if for_someone_else else (None, None)
+
+        self.loader.add('grant_applications', (
+            self._next_id('grant_applications'), 'someone_else' if for_someone_else else 'self', first, last,
+            f'{rng.randint(100, 9999)} {rng.choice(STREETS)}, {city}, {state} {zip_prefix}{rng.randint(10, 99)}',
+            f'{first.lower()}.{last.lower()}{index}@example.com',
+            f'(555) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            datetime(rng.randint(1950, 2003), rng.randint(1, 12), rng.randint(1, 28)).date(),
+            rng.choice((
+                'I lost hours at work and need help covering rent this month.',
+                'Unexpected medical bills have left us short on utilities and groceries.',
+                'A car repair wiped out our savings and we are behind on rent.',
+                'After a family emergency we need help bridging the gap until next payday.',
+            )),
+            submitter[0], submitter[1],
+            f'{submitter[0].lower()}.{submitter[1].lower()}@example.com' if for_someone_else else None,
+            f'(555) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}' if for_someone_else else None,
+            'Realtor helping a community member' if for_someone_else else None,
+            _weighted(rng, APPLICATION_STATUSES), created, created
+        ))
+
+
+def generate(realtors, seed=42, history_months=60, as_of=None, applications=None,
+             email_template='realtor{}@synthetic.example.com', password='password123',
+             all_approved=False, batch_size=50000, progress=True):
+    """
+    Generate and bulk-load a synthetic dataset into the current app's database.
+
+    Args:
+        realtors: Number of realtors
+        seed: RNG seed; identical arguments produce identical rows
+        history_months: Months of history before as_of's month
+        as_of: datetime the dataset ends at (default now; pass one for reproducibility across days)
+        applications: Grant applications to create (default realtors / 10)
+        email_template: str.format template for realtor emails
+        password: Password for every generated account (hashed once)
+        all_approved: Make every realtor approved, active and a member for the whole history
+
+    Returns:
+        dict: rows written per table
+    """
+    from extensions import db
+
+    loader = BulkLoader(db.engine, batch_size)
+    try:
+        cursor = loader.connection.cursor()
+        cursor.execute(f"SELECT 1 FROM realtors WHERE email = {loader.placeholder}", (email_template.format(0),))
+        if cursor.fetchone():
+            raise RuntimeError(f'{email_template.format(0)} already exists; use a fresh database or another template')
+
+        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        generator = Generator(loader, seed, history_periods(history_months, as_of), password_hash,
+                              email_template, all_approved)
+
+        started = time.perf_counter()
+        for index in range(realtors):
+            generator.realtor(index)
+            if loader.full():
+                loader.flush()
+                if progress:
+                    total = sum(loader.counts.values())
+                    print(f"  {index + 1:,}/{realtors:,} realtors, {total:,} rows, "
+                          f"{total / (time.perf_counter() - started):,.0f} rows/s", end='\r')
+
+        for index in range(realtors // 10 if applications is None else applications):
+            generator.application(index)
+            if loader.full():
+                loader.flush()
+
+        loader.flush()
+        loader.reset_sequences()
+        if progress:
+            print()
+        return dict(loader.counts)
+    finally:
+        loader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic dataset')
+    parser.add_argument('--realtors', type=int, default=1000, help='realtors to generate (~140 rows each)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--months', type=int, default=60, help='months of history')
+    parser.add_argument('--as-of', help='YYYY-MM-DD the history ends at (default today)')
+    parser.add_argument('--applications', type=int, help='grant applications (default realtors / 10)')
+    parser.add_argument('--batch-size', type=int, default=50000, help='rows buffered per table before writing')
+    parser.add_argument('--skip-rollups', action='store_true', help='do not rebuild donation rollups afterwards')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///synthetic.db')
+    from app import create_app
+    from utils.rollups import refresh_rollups
+
+    app = create_app('production')
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate(
+            args.realtors, seed=args.seed, history_months=args.months,
+            as_of=datetime.strptime(args.as_of, '%Y-%m-%d') if args.as_of else None,
+            applications=args.applications, batch_size=args.batch_size
+        )
+        elapsed = time.perf_counter() - started
+        if not args.skip_rollups:
+            rollup_started = time.perf_counter()
+            refresh_rollups(full=True)
+            print(f"Rebuilt donation rollups in {time.perf_counter() - rollup_started:.1f}s")
+
+    for table in TABLE_ORDER:
+        print(f"{table:<20} {counts[table]:>12,}")
+    total = sum(counts.values())
+    print(f"{'total':<20} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Local stand-in for the USPS Verify API.
+
+Answers AddressValidateRequest batches the way USPS does: each <Address ID>
+comes back upper-cased with a made-up ZIP+4, or with a per-address <Error>
+when the street line contains "NOWHERE". An optional delay simulates USPS
+latency. Used by benchmarks/address_benchmark.py and for local development:
+
+    python -m benchmarks.usps_stub --port 8766 --latency 0.3
+    USPS_API_URL=http://127.0.0.1:8766/ShippingAPI.dll USPS_USER_ID=stub flask run
+"""
+import argparse
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+def verify_response(xml_request):
+    """USPS-style response XML for an AddressValidateRequest document"""
+    try:
+        root = ET.fromstring(xml_request)
+    except ET.ParseError:
+        return '<Error><Number>80040B19</Number><Description>XML Syntax Error</Description></Error>'
+
+    if not root.get('USERID'):
+        return '<Error><Number>80040B1A</Number><Description>Authorization failure.</Description></Error>'
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><AddressValidateResponse>']
+    for address in root.iter('Address'):
+        address_id = escape(address.get('ID', '0'), {'"': '&quot;'})
+        street = (address.findtext('Address2') or '').upper()
+        if 'NOWHERE' in street or not street:
+            parts.append(f'<Address ID="{address_id}"><Error><Number>-2147219401</Number>'
+                         f'<Description>Address Not Found.  </Description></Error></Address>')
+            continue
+        zip5 = (address.findtext('Zip5') or '00000')[:5]
+        zip4 = f'{sum(map(ord, street)) % 10000:04d}'
+        parts.append(
+            f'<Address ID="{address_id}"><Address2>{escape(street)}</Address2>'
+            f'<City>{escape((address.findtext("City") or "").upper())}</City>'
+            f'<State>{escape((address.findtext("State") or "").upper())}</State>'
+            f'<Zip5>{escape(zip5)}</Zip5><Zip4>{zip4}</Zip4></Address>'
+        )
+    parts.append('</AddressValidateResponse>')
+    return ''.join(parts)
+
+
+class StubServer:
+    """Threaded HTTP server answering Verify requests; usable as a context manager"""
+
+    def __init__(self, port=0, latency=0.0):
+        stub = self
+        self.latency = latency
+        self.requests = 0
+        self.addresses = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                xml_request = query.get('XML', [''])[0]
+                with stub._lock:
+                    stub.requests += 1
+                    stub.addresses += xml_request.count('<Address ID=')
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = verify_response(xml_request).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/ShippingAPI.dll'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local USPS Verify API stub')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to delay each response')
+    args = parser.parse_args()
+
+    with StubServer(args.port, args.latency) as stub:
+        print(f"USPS stub listening on {stub.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
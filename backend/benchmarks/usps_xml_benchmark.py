@@ -0,0 +1,165 @@
+"""
+Fuzz and benchmark the USPS XML request builder and response parser.
+
+Fuzzing (no network):
+  - random addresses full of markup, quotes, entities, control characters and
+    non-ASCII text are built into requests, answered by the stub's response
+    generator and parsed back; every field must round-trip
+  - truncated, corrupted and DTD-bearing responses must fail with ParseError
+    (or USPSResponseError), never anything else
+
+Benchmark: parses a synthetic response with --addresses <Address> elements
+streamed from a generator, reporting time and tracemalloc peak for
+iter_verify_response against ET.fromstring on the same document.
+
+Usage (from backend/):
+    python -m benchmarks.usps_xml_benchmark --fuzz 2000 --addresses 200000
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from benchmarks.usps_stub import verify_response
+from utils.address_validation import (USPS_BATCH_SIZE, USPSResponseError, build_verify_request,
+                                      iter_verify_response, normalize_address)
+
+FUZZ_ALPHABET = list('abcXYZ019 ,.#-/') + ['<', '>', '&', '"', "'", ']]>', '&amp;', '<!--', '<![CDATA[',
+                                            '\x00', '\x07', '\x1f', '\t', '\n', '\r', 'é', 'ñ', '中', '😀', '￾']
+
+HOSTILE_RESPONSES = (
+    b'<?xml version="1.0"?><!DOCTYPE lolz [<!ENTITY lol "lol"><!ENTITY lol2 "&lol;&lol;&lol;&lol;">]>'
+    b'<AddressValidateResponse><Address ID="0"><Address2>&lol2;</Address2></Address></AddressValidateResponse>',
+    b'<?xml version="1.0"?><!DOCTYPE r [<!ENTITY x SYSTEM "file:///etc/passwd">]>'
+    b'<AddressValidateResponse><Address ID="0"><Address2>&x;</Address2></Address></AddressValidateResponse>',
+)
+
+
+class ChunkedStream:
+    """Binary stream over an iterable of byte chunks (like a socket read)"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def synthetic_response(count):
+    """Chunks of a Verify response with `count` addresses, generated lazily"""
+    yield b'<?xml version="1.0" encoding="UTF-8"?><AddressValidateResponse>'
+    for n in range(count):
+        yield (f'<Address ID="{n}"><Address2>{n} MAIN ST &amp; 1ST AVE</Address2><City>LOS ANGELES</City>'
+               f'<State>CA</State><Zip5>90012</Zip5><Zip4>{n % 10000:04d}</Zip4>'
+               f'<DeliveryPoint>01</DeliveryPoint><CarrierRoute>C001</CarrierRoute></Address>').encode()
+    yield b'</AddressValidateResponse>'
+
+
+def random_text(rng, length):
+    return ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(length))
+
+
+def fuzz_roundtrip(rng, iterations):
+    failures = 0
+    for _ in range(iterations):
+        batch = [normalize_address(random_text(rng, rng.randint(1, 40)), random_text(rng, rng.randint(1, 15)),
+                                   random_text(rng, 2), str(rng.randint(0, 99999)).zfill(5))
+                 for _ in range(rng.randint(1, USPS_BATCH_SIZE))]
+        request = build_verify_request(random_text(rng, 8), batch)
+        response = verify_response(request).encode('utf-8')
+        parsed = dict(iter_verify_response(io.BytesIO(response)))
+
+        # What USPS should have received: the normalized values minus characters XML cannot carry
+        sent = ET.fromstring(request)
+        for index, element in enumerate(sent.iter('Address')):
+            result = parsed.get(str(index))
+            street = element.findtext('Address2') or ''
+            if result is None or (result['success'] and result['address'] != street.upper()):
+                failures += 1
+                print(f"  round-trip mismatch: {batch[index]!r} -> {result!r}")
+    return failures
+
+
+def fuzz_malformed(rng, iterations):
+    """Corrupted responses may only raise ParseError or USPSResponseError"""
+    unexpected = 0
+    good = b''.join(synthetic_response(20))
+    cases = list(HOSTILE_RESPONSES) + [b'<Error><Number>1</Number><Description>Authorization failure.</Description></Error>']
+    for _ in range(iterations):
+        data = bytearray(good)
+        if rng.random() < 0.5:
+            data = data[:rng.randrange(1, len(data))]
+        for _ in range(rng.randint(1, 5)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        cases.append(bytes(data))
+
+    rejected = 0
+    for data in cases:
+        # Feed in small uneven chunks so markers split across reads are exercised
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+        try:
+            for _ in iter_verify_response(ChunkedStream(chunks)):
+                pass
+        except (ET.ParseError, USPSResponseError):
+            rejected += 1
+        except Exception as e:
+            unexpected += 1
+            print(f"  unexpected {type(e).__name__}: {e}")
+
+    for data in HOSTILE_RESPONSES:
+        try:
+            list(iter_verify_response(ChunkedStream([data[i:i + 5] for i in range(0, len(data), 5)])))
+            unexpected += 1
+            print("  DTD response was not rejected")
+        except ET.ParseError:
+            pass
+    return len(cases), rejected, unexpected
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {count:>9,} addresses {elapsed * 1000:>9.1f} ms  peak {peak / 1024 / 1024:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzz and benchmark USPS XML handling')
+    parser.add_argument('--fuzz', type=int, default=2000, help='fuzz iterations')
+    parser.add_argument('--addresses', type=int, default=200000, help='addresses in the benchmark response')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = fuzz_roundtrip(rng, args.fuzz)
+    print(f"Round-trip fuzz: {args.fuzz:,} batches, {failures} failures")
+    cases, rejected, unexpected = fuzz_malformed(rng, args.fuzz)
+    print(f"Malformed fuzz: {cases:,} documents, {rejected:,} rejected cleanly, {unexpected} unexpected errors\n")
+
+    document = b''.join(synthetic_response(args.addresses))
+    print(f"Response document: {len(document) / 1024 / 1024:.1f} MB")
+    measure('ET.fromstring (whole document)', lambda: len(ET.fromstring(document).findall('Address')))
+    measure('iter_verify_response (streamed)',
+            lambda: sum(1 for _ in iter_verify_response(ChunkedStream(synthetic_response(args.addresses)))))
+
+    if failures or unexpected:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+Flag likely duplicate grant applications across all historical data.
+Fingerprints any applications that predate duplicate detection, then
+rebuilds every duplicate cluster:
+    python cluster_duplicates.py
+"""
+from app import create_app
+from utils.dedup import cluster_duplicates
+
+if __name__ == '__main__':
+    app = create_app()
+    
+    with app.app_context():
+        stats = cluster_duplicates()
+        
+        print("Duplicate clustering complete")
+        print("-" * 60)
+        print(f"Applications fingerprinted: {stats['fingerprinted']:,}")
+        print(f"Duplicate clusters:         {stats['clusters']:,}")
+        print(f"Applications flagged:       {stats['flagged']:,}")
+        print(f"Placeholder blocks skipped: {stats['skipped_blocks']:,}")
@@ -41,18 +41,76 @@ class Config:
     # Payment
     STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
     STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY')
+    STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
+    STRIPE_API_URL = os.getenv('STRIPE_API_URL', 'https://api.stripe.com')
+    STRIPE_CURRENCY = os.getenv('STRIPE_CURRENCY', 'usd')
+    STRIPE_TIMEOUT = float(os.getenv('STRIPE_TIMEOUT', 10))
+    STRIPE_WEBHOOK_TOLERANCE = int(os.getenv('STRIPE_WEBHOOK_TOLERANCE', 300))  # seconds
+    STRIPE_EVENT_BATCH_SIZE = int(os.getenv('STRIPE_EVENT_BATCH_SIZE', 500))
     
     # USPS Address Validation
     USPS_USER_ID = os.getenv('USPS_USER_ID', 'dchapman@localmortgage.com')
+    USPS_API_URL = os.getenv('USPS_API_URL', 'https://secure.shippingapis.com/ShippingAPI.dll')
+    ADDRESS_VALIDATION_ENABLED = os.getenv('ADDRESS_VALIDATION_ENABLED', 'True').lower() == 'true'
+    USPS_TIMEOUT = float(os.getenv('USPS_TIMEOUT', 5))
+    USPS_POOL_SIZE = int(os.getenv('USPS_POOL_SIZE', 10))
+    USPS_CACHE_SECONDS = int(os.getenv('USPS_CACHE_SECONDS', 30 * 86400))  # validated addresses are reused for 30 days
+    USPS_LRU_SIZE = int(os.getenv('USPS_LRU_SIZE', 10000))
+    ADDRESS_REVALIDATION_CHUNK_SIZE = int(os.getenv('ADDRESS_REVALIDATION_CHUNK_SIZE', 500))
+    ADDRESS_REVALIDATION_CONCURRENCY = int(os.getenv('ADDRESS_REVALIDATION_CONCURRENCY', 4))
+    ADDRESS_REVALIDATION_RATE = float(os.getenv('ADDRESS_REVALIDATION_RATE', 5))  # USPS requests per second
     
     # SendGrid Email Configuration
     SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
     FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@localmortgage.com')
+    
+    # Scheduled Jobs (cron expressions are evaluated in UTC)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'False').lower() == 'true'
+    REMINDER_CRON = os.getenv('REMINDER_CRON', '0 9 1 * *')  # 9am on the 1st of each month
+    OVERDUE_CRON = os.getenv('OVERDUE_CRON', '0 6 * * *')  # 6am daily
+    ROLLUP_CRON = os.getenv('ROLLUP_CRON', '*/15 * * * *')  # every 15 minutes
+    ADDRESS_REVALIDATION_CRON = os.getenv('ADDRESS_REVALIDATION_CRON', '30 3 * * *')  # 3:30am daily
+    PURGE_CRON = os.getenv('PURGE_CRON', '15 * * * *')  # hourly
+    STRIPE_EVENTS_CRON = os.getenv('STRIPE_EVENTS_CRON', '* * * * *')  # every minute
+    PAYMENT_DUE_DAYS = int(os.getenv('PAYMENT_DUE_DAYS', 30))
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 100))
+    SCHEDULER_LOCK_MINUTES = int(os.getenv('SCHEDULER_LOCK_MINUTES', 30))
+    
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    
+    # Instrumentation (/metrics answers 404 without METRICS_TOKEN unless METRICS_PUBLIC)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'False').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'False').lower() == 'true'
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 200))
+    
+    # N+1 detection: 'log' or 'raise' when one SELECT shape runs NPLUSONE_THRESHOLD times in a request
+    NPLUSONE_MODE = os.getenv('NPLUSONE_MODE')
+    NPLUSONE_THRESHOLD = int(os.getenv('NPLUSONE_THRESHOLD', 5))
+    
+    # Idempotency-Key responses are replayed for this long; a request still in progress holds its key for LOCK seconds
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 60))
+    
+    # Public impact counters cache
+    IMPACT_CACHE_SECONDS = int(os.getenv('IMPACT_CACHE_SECONDS', 60))
+    
+    # Donation leaderboards are rebuilt from scratch after this many seconds
+    LEADERBOARD_REBUILD_SECONDS = int(os.getenv('LEADERBOARD_REBUILD_SECONDS', 3600))
+    
+    # Analytics (Parquet) export
+    ANALYTICS_EXPORT_DIR = os.getenv('ANALYTICS_EXPORT_DIR', 'analytics')
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
+    NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', 'log')
+    METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'True').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -64,6 +122,8 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    SCHEDULER_ENABLED = False
+    NPLUSONE_MODE = 'raise'
 
 # Configuration dictionary
 config = {
@@ -1,13 +1,25 @@
 """
 Create sample test data for demo purposes.
 This script creates test realtors and grant applications.
+
+With --load-test N it instead bulk-seeds N approved realtors with five years of
+monthly transactions, donations, notifications and grant applications for the
+load-test harness (benchmarks/load_test.py).
 """
+import argparse
 from app import create_app
+from benchmarks.synthetic_data import generate, history_periods
 from extensions import db
 from models.realtor import Realtor
 from models.grant_application import GrantApplication
 from datetime import datetime, timedelta
 
+# Load-test accounts all share this password (hashed once, not per user)
+LOAD_TEST_PASSWORD = 'password123'
+LOAD_TEST_ADMIN_EMAIL = 'loadtest.admin@example.com'
+LOAD_TEST_EMAIL = 'loadtest{}@example.com'
+LOAD_TEST_HISTORY_MONTHS = 60
+
 def create_test_data():
     app = create_app()
     
@@ -200,5 +212,51 @@ def create_test_data():
         print("You can now demo with realistic test data!")
         print("=" * 60)
 
+def load_test_history_periods(now=None):
+    """The (month, year) periods seeded for every load-test realtor, oldest first"""
+    return history_periods(LOAD_TEST_HISTORY_MONTHS, now)
+
+def create_load_test_data(realtor_count, seed=42):
+    """Bulk-seed the load-test dataset (skips if it already exists)"""
+    app = create_app()
+    
+    with app.app_context():
+        if Realtor.query.filter_by(email=LOAD_TEST_ADMIN_EMAIL).first():
+            print(f"⚠️  Load-test data already exists ({LOAD_TEST_ADMIN_EMAIL})")
+            return
+        
+        print(f"Seeding {realtor_count:,} load-test realtors with {LOAD_TEST_HISTORY_MONTHS} months of history...")
+        started = datetime.utcnow()
+        
+        admin = Realtor(
+            email=LOAD_TEST_ADMIN_EMAIL, first_name='Load', last_name='Admin',
+            donation_amount_per_transaction=0, is_active=True, is_approved=True, is_admin=True,
+            approval_status='approved', approved_at=started
+        )
+        admin.set_password(LOAD_TEST_PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+        
+        # Every realtor is approved, active and a member for the whole history so any of them can log in
+        counts = generate(
+            realtor_count, seed=seed, history_months=LOAD_TEST_HISTORY_MONTHS,
+            applications=max(realtor_count // 2, 1), email_template=LOAD_TEST_EMAIL,
+            password=LOAD_TEST_PASSWORD, all_approved=True
+        )
+        
+        print(f"✅ Seeded {counts['transactions']:,} transactions, {counts['donations']:,} donations, "
+              f"{counts['notifications']:,} notifications and {counts['grant_applications']:,} applications "
+              f"in {(datetime.utcnow() - started).total_seconds():.1f}s")
+        print(f"   Admin: {LOAD_TEST_ADMIN_EMAIL} / {LOAD_TEST_PASSWORD}")
+        print(f"   Realtors: {LOAD_TEST_EMAIL.format('N')} (N = 0..{realtor_count - 1}) / {LOAD_TEST_PASSWORD}")
+
 if __name__ == '__main__':
-    create_test_data()
+    parser = argparse.ArgumentParser(description='Create demo or load-test data')
+    parser.add_argument('--load-test', type=int, metavar='REALTORS', help='bulk-seed REALTORS load-test realtors instead of the demo data')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the load-test dataset')
+    args = parser.parse_args()
+    
+    if args.load_test:
+        create_load_test_data(args.load_test, seed=args.seed)
+    else:
+        create_test_data()
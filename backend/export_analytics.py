@@ -0,0 +1,31 @@
+"""
+Export donations, transactions and realtors to Parquet for board reporting.
+Only the year/month partitions changed since the last run are rewritten; run
+it from cron or by hand:
+    python export_analytics.py [output_dir] [--full]
+"""
+import argparse
+from app import create_app
+from utils.analytics_export import run_analytics_export
+
+def export_analytics(output_dir=None, full=False):
+    app = create_app()
+    
+    with app.app_context():
+        summary = run_analytics_export(output_dir, full=full)
+        
+        print("Analytics export complete")
+        print("-" * 60)
+        for dataset, stats in summary.items():
+            line = f"{dataset:<15} {stats['rows']:>10,} rows"
+            if 'partitions' in stats:
+                line += f"   ({stats['partitions']} partitions rewritten)"
+            print(line)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export analytics datasets to Parquet')
+    parser.add_argument('output_dir', nargs='?', help='defaults to ANALYTICS_EXPORT_DIR')
+    parser.add_argument('--full', action='store_true', help='rewrite every partition, not only changed ones')
+    args = parser.parse_args()
+    
+    export_analytics(args.output_dir, full=args.full)
@@ -1,6 +1,8 @@
 """
 Database migration script to add new columns to existing database.
-This script adds the new approval and admin columns to the realtors table.
+This script adds the new approval and admin columns to the realtors table,
+the standardized address and duplicate columns to grant_applications and
+updated_at to transactions and donations.
 """
 from app import create_app
 from extensions import db
@@ -50,6 +52,39 @@ def migrate_database():
             else:
                 print("✓ approved_at column already exists")
             
+            # Standardized address columns on grant applications
+            application_columns = [col['name'] for col in inspector.get_columns('grant_applications')]
+            new_application_columns = [
+                ('applicant_street', 'VARCHAR(200)'), ('applicant_city', 'VARCHAR(100)'),
+                ('applicant_state', 'VARCHAR(2)'), ('applicant_zip5', 'VARCHAR(5)'), ('applicant_zip4', 'VARCHAR(4)'),
+                ('submitter_street', 'VARCHAR(200)'), ('submitter_city', 'VARCHAR(100)'),
+                ('submitter_state', 'VARCHAR(2)'), ('submitter_zip5', 'VARCHAR(5)'), ('submitter_zip4', 'VARCHAR(4)'),
+                ('address_validation_status', 'VARCHAR(20)'), ('address_validation_error', 'VARCHAR(200)'),
+                ('address_validated_at', 'TIMESTAMP'),
+                ('duplicate_of_id', 'INTEGER REFERENCES grant_applications(id)'),
+                ('duplicate_reasons', 'VARCHAR(100)'),
+            ]
+            for name, column_type in new_application_columns:
+                if name not in application_columns:
+                    print(f"Adding grant_applications.{name} column...")
+                    db.session.execute(text(f'ALTER TABLE grant_applications ADD COLUMN {name} {column_type}'))
+                    print(f"✓ Added {name} column")
+            for column in ('address_validation_status', 'duplicate_of_id'):
+                db.session.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS ix_grant_applications_{column} ON grant_applications ({column})'
+                ))
+            print("✓ Grant application address and duplicate columns are up to date")
+            
+            # Change timestamps the analytics export uses to find rewritten partitions
+            for table, created_column in (('transactions', 'submitted_at'), ('donations', 'created_at')):
+                if 'updated_at' not in [col['name'] for col in inspector.get_columns(table)]:
+                    print(f"Adding {table}.updated_at column...")
+                    db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP'))
+                    db.session.execute(text(f'UPDATE {table} SET updated_at = {created_column}'))
+                    print(f"✓ Added {table}.updated_at column")
+                db.session.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)'))
+            print("✓ Transaction and donation change timestamps are up to date")
+            
             db.session.commit()
             
             print("\n✅ Database migration completed successfully!")
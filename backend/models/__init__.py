@@ -3,5 +3,12 @@ from .transaction import Transaction
 from .donation import Donation
 from .notification import Notification
 from .grant_application import GrantApplication
+from .job_lock import JobLock
+from .export_watermark import ExportWatermark
+from .donation_rollup import DonationRollup
+from .address_cache import AddressCache
+from .application_fingerprint import ApplicationFingerprint
+from .idempotency_key import IdempotencyKey
+from .stripe_event import StripeEvent
 
-__all__ = ['Realtor', 'Transaction', 'Donation', 'Notification', 'GrantApplication']
+__all__ = ['Realtor', 'Transaction', 'Donation', 'Notification', 'GrantApplication', 'JobLock', 'ExportWatermark', 'DonationRollup', 'AddressCache', 'ApplicationFingerprint', 'IdempotencyKey', 'StripeEvent']
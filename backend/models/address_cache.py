@@ -0,0 +1,14 @@
+from datetime import datetime
+from extensions import db
+
+class AddressCache(db.Model):
+    """USPS validation result for a normalized address, shared by every worker until it expires"""
+    __tablename__ = 'address_cache'
+    
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the normalized address
+    result = db.Column(db.Text, nullable=False)  # JSON validation result
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<AddressCache {self.key[:12]} until {self.expires_at}>'
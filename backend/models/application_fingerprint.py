@@ -0,0 +1,13 @@
+from extensions import db
+
+class ApplicationFingerprint(db.Model):
+    """Normalized identity/contact key of a grant application, indexed for duplicate lookups"""
+    __tablename__ = 'application_fingerprints'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('grant_applications.id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # identity, email, phone, household
+    fingerprint = db.Column(db.String(64), nullable=False, index=True)  # sha256 of kind + normalized value
+    
+    def __repr__(self):
+        return f'<ApplicationFingerprint {self.kind} {self.fingerprint[:12]} -> {self.application_id}>'
@@ -23,6 +23,7 @@ class Donation(db.Model):
     # Timestamps
     paid_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     def to_dict(self):
         """Convert to dictionary"""
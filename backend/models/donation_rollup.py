@@ -0,0 +1,40 @@
+from datetime import datetime
+from extensions import db
+
+class DonationRollup(db.Model):
+    """Pre-aggregated donation totals per day or month, overall and by dimension"""
+    __tablename__ = 'donation_rollups'
+    
+    grain = db.Column(db.String(10), primary_key=True)  # day, month
+    period_start = db.Column(db.Date, primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)  # all, brokerage, cohort
+    dimension_value = db.Column(db.String(200), primary_key=True, default='')  # brokerage name, signup month (YYYY-MM)
+    
+    # Aggregates
+    donation_count = db.Column(db.Integer, nullable=False, default=0)
+    donation_total = db.Column(db.Numeric(12, 2), nullable=False, default=0.00)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)  # Closed transactions behind the donations
+    
+    # Timestamps
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_donation_rollups_range', 'grain', 'dimension', 'period_start'),
+    )
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        total = float(self.donation_total)
+        return {
+            'grain': self.grain,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'dimension': self.dimension,
+            'dimension_value': self.dimension_value,
+            'donation_count': self.donation_count,
+            'donation_total': total,
+            'transaction_count': self.transaction_count,
+            'average_per_transaction': round(total / self.transaction_count, 2) if self.transaction_count else 0.0
+        }
+    
+    def __repr__(self):
+        return f'<DonationRollup {self.grain} {self.period_start} {self.dimension}={self.dimension_value}>'
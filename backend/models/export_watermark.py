@@ -0,0 +1,23 @@
+from datetime import datetime
+from extensions import db
+
+class ExportWatermark(db.Model):
+    """High-water mark of the last analytics export or rollup refresh for each dataset"""
+    __tablename__ = 'export_watermarks'
+    
+    dataset = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)  # Highest row id already exported
+    rows_exported = db.Column(db.Integer, nullable=False, default=0)
+    exported_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'dataset': self.dataset,
+            'last_id': self.last_id,
+            'rows_exported': self.rows_exported,
+            'exported_at': self.exported_at.isoformat() if self.exported_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ExportWatermark {self.dataset} {self.last_id}>'
@@ -1,5 +1,5 @@
 from extensions import db
-from datetime import datetime
+from datetime import date, datetime
 
 class GrantApplication(db.Model):
     __tablename__ = 'grant_applications'
@@ -26,6 +26,25 @@ class GrantApplication(db.Model):
     submitter_phone = db.Column(db.String(20))
     submitter_relationship = db.Column(db.String(200))
     
+    # USPS-standardized addresses, filled in by utils/address_revalidation.py
+    applicant_street = db.Column(db.String(200))
+    applicant_city = db.Column(db.String(100))
+    applicant_state = db.Column(db.String(2))
+    applicant_zip5 = db.Column(db.String(5))
+    applicant_zip4 = db.Column(db.String(4))
+    submitter_street = db.Column(db.String(200))
+    submitter_city = db.Column(db.String(100))
+    submitter_state = db.Column(db.String(2))
+    submitter_zip5 = db.Column(db.String(5))
+    submitter_zip4 = db.Column(db.String(4))
+    address_validation_status = db.Column(db.String(20), index=True)  # NULL until checked; valid, invalid, unparseable
+    address_validation_error = db.Column(db.String(200))
+    address_validated_at = db.Column(db.DateTime)
+    
+    # Likely duplicate of an earlier application (see utils/dedup.py)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('grant_applications.id'), index=True)
+    duplicate_reasons = db.Column(db.String(100))  # comma-separated fingerprint kinds that matched
+    
     # Application Status
     status = db.Column(db.String(50), default='pending')  # pending, under_review, approved, denied
     
@@ -38,7 +57,69 @@ class GrantApplication(db.Model):
     reviewed_by = db.Column(db.Integer, db.ForeignKey('realtors.id'))
     reviewed_at = db.Column(db.DateTime)
     
-    def to_dict(self):
+    # Fields selectable with ?fields= on list endpoints, keyed by their path in to_dict()
+    FIELD_COLUMNS = {
+        'id': 'id',
+        'application_type': 'application_type',
+        'applicant.first_name': 'applicant_first_name',
+        'applicant.last_name': 'applicant_last_name',
+        'applicant.address': 'applicant_address',
+        'applicant.email': 'applicant_email',
+        'applicant.phone': 'applicant_phone',
+        'applicant.birthday': 'applicant_birthday',
+        'applicant.story': 'applicant_story',
+        'submitter.first_name': 'submitter_first_name',
+        'submitter.last_name': 'submitter_last_name',
+        'submitter.address': 'submitter_address',
+        'submitter.email': 'submitter_email',
+        'submitter.phone': 'submitter_phone',
+        'submitter.relationship': 'submitter_relationship',
+        'status': 'status',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'admin_notes': 'admin_notes',
+        'reviewed_by': 'reviewed_by',
+        'reviewed_at': 'reviewed_at',
+        'address_validation_status': 'address_validation_status',
+        'duplicate_of_id': 'duplicate_of_id',
+        'duplicate_reasons': 'duplicate_reasons'
+    }
+    
+    # Default projection for list pages (no story, addresses or admin notes)
+    SUMMARY_FIELDS = [
+        'id', 'application_type', 'applicant.first_name', 'applicant.last_name',
+        'applicant.email', 'status', 'created_at'
+    ]
+    
+    @classmethod
+    def resolve_fields(cls, requested):
+        """Expand requested fields ('applicant' means every applicant.* field) into field paths"""
+        fields = []
+        for name in requested:
+            name = name.strip()
+            if not name:
+                continue
+            matches = [f for f in cls.FIELD_COLUMNS if f == name or f.startswith(name + '.')]
+            if not matches:
+                raise ValueError(f'Unknown field: {name}')
+            fields.extend(f for f in matches if f not in fields)
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+        return fields
+    
+    @classmethod
+    def columns_for(cls, fields):
+        """Column attributes to load for a projection"""
+        names = {cls.FIELD_COLUMNS[f] for f in fields}
+        # The submitter block is only shown for 'someone_else' applications
+        if any(f.startswith('submitter.') for f in fields):
+            names.add('application_type')
+        return [getattr(cls, name) for name in sorted(names)]
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return self._to_projection_dict(fields)
+        
         return {
             'id': self.id,
             'application_type': self.application_type,
@@ -64,5 +145,33 @@ class GrantApplication(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'admin_notes': self.admin_notes,
             'reviewed_by': self.reviewed_by,
-            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None
+            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'address_validation': {
+                'status': self.address_validation_status,
+                'error': self.address_validation_error,
+                'applicant_zip4': self.applicant_zip4,
+                'submitter_zip4': self.submitter_zip4,
+                'validated_at': self.address_validated_at.isoformat() if self.address_validated_at else None
+            },
+            'duplicate_of_id': self.duplicate_of_id,
+            'duplicate_reasons': self.duplicate_reasons
         }
+    
+    def _to_projection_dict(self, fields):
+        """Serialize only the given field paths, touching only their columns"""
+        data = {}
+        for field in fields:
+            if field.startswith('submitter.') and self.application_type != 'someone_else':
+                data['submitter'] = None
+                continue
+            
+            value = getattr(self, self.FIELD_COLUMNS[field])
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            
+            if '.' in field:
+                block, key = field.split('.', 1)
+                data.setdefault(block, {})[key] = value
+            else:
+                data[field] = value
+        return data
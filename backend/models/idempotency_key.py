@@ -0,0 +1,19 @@
+from datetime import datetime
+from extensions import db
+
+class IdempotencyKey(db.Model):
+    """Outcome of a POST made with an Idempotency-Key header, replayed for retries until it expires"""
+    __tablename__ = 'idempotency_keys'
+    
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of endpoint, caller and the client's key
+    request_fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of method, path and body
+    status = db.Column(db.String(20), nullable=False, default='in_progress')  # in_progress, completed
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    response_mimetype = db.Column(db.String(100))
+    locked_until = db.Column(db.DateTime, nullable=False)  # an in_progress row past this is abandoned
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key[:12]} {self.status}>'
@@ -0,0 +1,14 @@
+from datetime import datetime
+from extensions import db
+
+class JobLock(db.Model):
+    """Lease row used to make sure only one worker runs a scheduled job"""
+    __tablename__ = 'job_locks'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    locked_by = db.Column(db.String(200))  # hostname:pid of the worker holding the lease
+    locked_until = db.Column(db.DateTime, nullable=False)
+    last_run_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<JobLock {self.name} until {self.locked_until}>'
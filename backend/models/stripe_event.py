@@ -0,0 +1,30 @@
+from datetime import datetime
+from extensions import db
+
+class StripeEvent(db.Model):
+    """Stripe webhook event, stored on receipt and applied later by the event worker"""
+    __tablename__ = 'stripe_events'
+    
+    id = db.Column(db.String(255), primary_key=True)  # Stripe event id (evt_...), so redeliveries are dropped
+    type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # event JSON as received
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, processed, ignored, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
+    
+    def __repr__(self):
+        return f'<StripeEvent {self.id} {self.type} {self.status}>'
@@ -21,9 +21,11 @@ class Transaction(db.Model):
     
     # Timestamps
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
-    donation = db.relationship('Donation', backref='transaction', uselist=False, cascade='all, delete-orphan')
+    # selectin: listings call to_dict() (has_donation) on every row, so load donations in one IN query
+    donation = db.relationship('Donation', backref='transaction', uselist=False, lazy='selectin', cascade='all, delete-orphan')
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -0,0 +1,21 @@
+"""
+Apply received Stripe webhook events now instead of waiting for the scheduled job:
+    python process_stripe_events.py [--limit N]
+"""
+import argparse
+from app import create_app
+from utils.stripe_payments import process_stripe_events
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply pending Stripe webhook events')
+    parser.add_argument('--limit', type=int, help='events to apply (default STRIPE_EVENT_BATCH_SIZE)')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        stats = process_stripe_events(limit=args.limit)
+        
+        print("Stripe events applied")
+        print("-" * 60)
+        for status, count in sorted(stats.items()):
+            print(f"{status:<15} {count:>10,}")
@@ -0,0 +1,27 @@
+"""
+Validate and standardize stored grant application addresses through USPS.
+Resumes from the last finished chunk if a previous run was interrupted:
+    python revalidate_addresses.py [--restart] [--max-rows N] [--concurrency N] [--rate N]
+"""
+import argparse
+from app import create_app
+from utils.address_revalidation import revalidate_addresses
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Re-validate grant application addresses')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and start from the first application')
+    parser.add_argument('--max-rows', type=int, help='stop after this many applications')
+    parser.add_argument('--chunk-size', type=int, help='applications per chunk')
+    parser.add_argument('--concurrency', type=int, help='threads calling USPS')
+    parser.add_argument('--rate', type=float, help='USPS requests per second')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        stats = revalidate_addresses(chunk_size=args.chunk_size, concurrency=args.concurrency, rate=args.rate,
+                                     max_rows=args.max_rows, restart=args.restart)
+        
+        print("Address re-validation complete")
+        print("-" * 60)
+        for status, count in sorted(stats.items()):
+            print(f"{status:<15} {count:>10,}")
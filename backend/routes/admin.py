@@ -1,9 +1,22 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import Realtor, Notification
+from models import Realtor, Notification, StripeEvent
 from datetime import datetime
+from sqlalchemy.orm import joinedload
+from routes.impact import invalidate_impact
 from utils.email_service import send_realtor_approval_email
+from utils.periods import get_pending_periods, group_periods_by_realtor
+from utils.analytics_export import run_analytics_export
+from utils.leaderboard import leaderboards
+from utils.metrics import metrics
+from utils.payments import PaymentError, confirm_payment, reject_payment
+from utils.serializers import serialize_transactions
+from utils.rollups import DIMENSIONS, GRAINS, query_rollups, refresh_rollup_days, refresh_rollups
+from utils.transaction_import import import_transactions
+from utils.exports import EXPORT_DATASETS, EXPORT_FORMATS, parse_export_filters, stream_export
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -166,8 +179,9 @@ def get_admin_stats():
         
         from models import GrantApplication, Transaction, Donation
         
-        # Get total donations and convert to float
-        total_donations_sum = db.session.query(db.func.sum(Donation.amount)).scalar()
+        # Get total donations and convert to float (self-reported payments count once confirmed)
+        total_donations_sum = db.session.query(db.func.sum(Donation.amount))\
+            .filter(Donation.payment_status == 'completed').scalar()
         total_donations = float(total_donations_sum) if total_donations_sum else 0.0
         
         stats = {
@@ -195,31 +209,92 @@ def get_all_transactions():
         if not admin or not admin.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
-        from models.transaction import Transaction
+        # Include realtor info in each transaction
+        return jsonify({'transactions': serialize_transactions(with_realtor=True)}), 200
         
-        transactions = Transaction.query\
-            .order_by(Transaction.year.desc(), Transaction.month.desc())\
-            .all()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/transactions/missing', methods=['GET'])
+@jwt_required()
+def get_missing_transactions():
+    """Get every unreported month for all active realtors (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
         
-        # Include realtor info in each transaction
-        transactions_with_realtor = []
-        for t in transactions:
-            t_dict = t.to_dict()
-            realtor = Realtor.query.get(t.realtor_id)
-            if realtor:
-                t_dict['realtor_name'] = f"{realtor.first_name} {realtor.last_name}"
-                t_dict['realtor_email'] = realtor.email
-            transactions_with_realtor.append(t_dict)
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        pending = group_periods_by_realtor(get_pending_periods())
+        
+        realtors = Realtor.query.filter(Realtor.id.in_(list(pending.keys()))).all() if pending else []
+        
+        missing = []
+        for realtor in realtors:
+            periods = pending[realtor.id]
+            missing.append({
+                'realtor_id': realtor.id,
+                'realtor_name': f"{realtor.first_name} {realtor.last_name}",
+                'realtor_email': realtor.email,
+                'missing_count': len(periods),
+                'periods': [{'month': p['month'], 'year': p['year'], 'display': p['display']} for p in periods]
+            })
+        
+        missing.sort(key=lambda m: m['missing_count'], reverse=True)
+        
+        return jsonify({
+            'missing': missing,
+            'total_realtors': len(missing),
+            'total_periods': sum(m['missing_count'] for m in missing)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/transactions/import', methods=['POST'])
+@jwt_required()
+def import_transactions_csv():
+    """
+    Import a brokerage's monthly closings from CSV (admin only).
+    Accepts a multipart 'file' upload or a text/csv body with email, month,
+    year and count columns. Rows that fail are listed in the response; the
+    rest are imported.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
         
-        return jsonify({'transactions': transactions_with_realtor}), 200
+        if 'file' in request.files:
+            stream = request.files['file'].stream
+        elif request.mimetype in ('text/csv', 'text/plain'):
+            stream = io.BufferedReader(request.stream)
+        else:
+            return jsonify({'error': 'Upload a CSV file or send a text/csv body'}), 400
+        
+        # Read as a stream; utf-8-sig drops the BOM spreadsheet exports add
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            report = import_transactions(lines)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            return jsonify({'error': f'Could not read CSV: {e}'}), 400
+        finally:
+            lines.detach()
+        
+        return jsonify(report), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/donations', methods=['GET'])
 @jwt_required()
 def get_all_donations():
-    """Get all donations across all realtors (admin only)"""
+    """Get all donations across all realtors (admin only); ?status=pending lists payments awaiting confirmation"""
     try:
         current_user_id = int(get_jwt_identity())
         admin = Realtor.query.get(current_user_id)
@@ -229,15 +304,16 @@ def get_all_donations():
         
         from models.donation import Donation
         
-        donations = Donation.query\
-            .order_by(Donation.paid_at.desc())\
-            .all()
+        query = Donation.query.options(joinedload(Donation.realtor))
+        if request.args.get('status'):
+            query = query.filter(Donation.payment_status == request.args['status'])
+        donations = query.order_by(Donation.paid_at.desc()).all()
         
         # Include realtor info in each donation
         donations_with_realtor = []
         for d in donations:
             d_dict = d.to_dict()
-            realtor = Realtor.query.get(d.realtor_id)
+            realtor = d.realtor
             if realtor:
                 d_dict['realtor_name'] = f"{realtor.first_name} {realtor.last_name}"
                 d_dict['realtor_email'] = realtor.email
@@ -248,6 +324,217 @@ def get_all_donations():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/donations/<int:donation_id>/confirm', methods=['POST'])
+@jwt_required()
+def confirm_donation(donation_id):
+    """Confirm a self-reported bank transfer/check payment arrived (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        try:
+            donation = confirm_payment(donation_id)
+        except PaymentError as e:
+            db.session.rollback()
+            return jsonify({'error': e.message}), e.status_code
+        
+        db.session.commit()
+        
+        # The donation now counts; its id is already behind the incremental
+        # rollup and leaderboard watermarks, so recompute what it touches
+        refresh_rollup_days({donation.paid_at.date()})
+        leaderboards.reset()
+        invalidate_impact()
+        
+        return jsonify({
+            'message': 'Payment confirmed',
+            'donation': donation.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/donations/<int:donation_id>/reject', methods=['POST'])
+@jwt_required()
+def reject_donation(donation_id):
+    """Reject a self-reported payment that never arrived; the transaction is payable again (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            reject_payment(donation_id, reason=data.get('reason', ''))
+        except PaymentError as e:
+            db.session.rollback()
+            return jsonify({'error': e.message}), e.status_code
+        
+        db.session.commit()
+        
+        return jsonify({'message': 'Payment rejected'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/export/<dataset>', methods=['GET'])
+@jwt_required()
+def export_data(dataset):
+    """Stream donations, transactions or applications as CSV/XLSX (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        if dataset not in EXPORT_DATASETS:
+            return jsonify({'error': f'Unknown export: {dataset}'}), 404
+        
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'format must be csv or xlsx'}), 400
+        
+        try:
+            filters = parse_export_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        filename = f"{dataset}_{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+        
+        return Response(
+            stream_with_context(stream_export(dataset, export_format, **filters)),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/stripe-events', methods=['GET'])
+@jwt_required()
+def get_stripe_events():
+    """Recent Stripe webhook events, e.g. ?status=failed for payments that need attention (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        query = StripeEvent.query
+        if request.args.get('status'):
+            query = query.filter(StripeEvent.status == request.args['status'])
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        events = query.order_by(StripeEvent.received_at.desc()).limit(limit).all()
+        
+        return jsonify({'events': [event.to_dict() for event in events]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@jwt_required()
+def get_slow_queries():
+    """Recent slow SQL statements recorded by this worker (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        return jsonify({'slow_queries': metrics.slow_queries()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/analytics-export', methods=['POST'])
+@jwt_required()
+def analytics_export():
+    """Rewrite changed donation/transaction partitions and the realtor table in Parquet (admin only); ?full=true rewrites all"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        summary = run_analytics_export(full=request.args.get('full', 'false').lower() == 'true')
+        
+        return jsonify({
+            'message': 'Analytics export completed',
+            'datasets': summary
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/rollups', methods=['GET'])
+@jwt_required()
+def get_rollups():
+    """Donation totals for a date range from the rollup tables (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        grain = request.args.get('grain', 'month')
+        dimension = request.args.get('dimension', 'all')
+        
+        if grain not in GRAINS:
+            return jsonify({'error': f"grain must be one of: {', '.join(GRAINS)}"}), 400
+        if dimension not in DIMENSIONS:
+            return jsonify({'error': f"dimension must be one of: {', '.join(DIMENSIONS)}"}), 400
+        
+        try:
+            today = datetime.utcnow().date()
+            start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else today.replace(month=1, day=1)
+            end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else today
+        except ValueError:
+            return jsonify({'error': 'Invalid date. Use YYYY-MM-DD'}), 400
+        
+        result = query_rollups(grain, dimension, start, end, value=request.args.get('value'))
+        result.update({'grain': grain, 'dimension': dimension, 'start': start.isoformat(), 'end': end.isoformat()})
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/rollups/refresh', methods=['POST'])
+@jwt_required()
+def refresh_donation_rollups():
+    """Refresh donation rollups now; ?full=true rebuilds from scratch (admin only)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        admin = Realtor.query.get(current_user_id)
+        
+        if not admin or not admin.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        full = request.args.get('full', 'false').lower() == 'true'
+        days = refresh_rollups(full=full)
+        
+        return jsonify({
+            'message': 'Rollups refreshed',
+            'days_recomputed': days
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/realtors/<int:realtor_id>/delete', methods=['DELETE'])
 @jwt_required()
 def delete_realtor(realtor_id):
@@ -290,6 +577,9 @@ def delete_realtor(realtor_id):
         db.session.delete(realtor)
         db.session.commit()
         
+        # Their donations are gone; rebuild standings on next read
+        leaderboards.reset()
+        
         return jsonify({'message': 'Realtor deleted successfully'}), 200
         
     except Exception as e:
@@ -1,17 +1,37 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.realtor import Realtor
 from models.transaction import Transaction
 from models.donation import Donation
-from models.notification import Notification
 from datetime import datetime
 from sqlalchemy import func, extract
+from sqlalchemy.orm import joinedload
+from routes.transactions import transaction_signals
+from utils.conditional import conditional
+from utils.leaderboard import PERIODS, leaderboards
+from utils.idempotency import idempotent
+from utils.payments import PaymentError, record_payment
+from utils import stripe_payments
 
 donations_bp = Blueprint('donations', __name__, url_prefix='/api/donations')
 
+def history_version(realtor_id):
+    """
+    Donation history embeds each donation's transaction, so both count.
+    updated_at catches in-place changes such as an admin confirming a payment.
+    """
+    donations = db.session.query(
+        func.count(Donation.id),
+        func.max(Donation.id),
+        func.max(Donation.updated_at)
+    ).filter(Donation.realtor_id == realtor_id).one()
+    return tuple(donations) + tuple(transaction_signals(realtor_id)), None
+
 @donations_bp.route('/payment', methods=['POST'])
 @jwt_required()
+@idempotent
 def submit_payment():
     """Submit payment for a transaction"""
     try:
@@ -27,59 +47,139 @@ def submit_payment():
         if 'transaction_id' not in data:
             return jsonify({'error': 'transaction_id is required'}), 400
         
-        transaction_id = data['transaction_id']
+        # Card payments are recorded from Stripe's webhook once the charge succeeds
+        if current_app.config.get('STRIPE_SECRET_KEY') and data.get('payment_method', 'credit_card') == 'credit_card':
+            return jsonify({'error': 'Card payments are confirmed by Stripe; create one with /api/donations/payment-intent'}), 400
+        
+        # Claims the transaction and inserts the donation atomically, so
+        # concurrent payments for one transaction cannot both succeed.
+        # These payments are self-reported: the donation stays pending (and out
+        # of public totals) until an admin confirms the money arrived.
+        try:
+            donation = record_payment(
+                data['transaction_id'],
+                realtor_id=realtor_id,
+                payment_method=data.get('payment_method', 'credit_card'),
+                payment_reference=data.get('payment_reference', ''),
+                confirmed=False
+            )
+        except PaymentError as e:
+            db.session.rollback()
+            return jsonify({'error': e.message}), e.status_code
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Payment submitted; it will be confirmed once received',
+            'donation': donation.to_dict()
+        }), 201
         
-        # Get transaction
-        transaction = Transaction.query.get(transaction_id)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@donations_bp.route('/payment-config', methods=['GET'])
+@jwt_required()
+def get_payment_config():
+    """Which payment methods the client should offer, and the Stripe.js key for cards"""
+    card_payments = bool(current_app.config.get('STRIPE_SECRET_KEY') and current_app.config.get('STRIPE_PUBLISHABLE_KEY'))
+    return jsonify({
+        'card_payments': card_payments,
+        'publishable_key': current_app.config.get('STRIPE_PUBLISHABLE_KEY') if card_payments else None
+    }), 200
+
+@donations_bp.route('/payment-status/<int:transaction_id>', methods=['GET'])
+@jwt_required()
+def get_payment_status(transaction_id):
+    """
+    Poll a transaction after confirming a card payment; it turns paid once the
+    stripe_events job has applied Stripe's payment_intent.succeeded event.
+    """
+    try:
+        realtor_id = int(get_jwt_identity())
+        transaction = Transaction.query.filter_by(id=transaction_id, realtor_id=realtor_id).first()
         
         if not transaction:
             return jsonify({'error': 'Transaction not found'}), 404
         
-        if transaction.realtor_id != realtor_id:
-            return jsonify({'error': 'Unauthorized'}), 403
+        return jsonify({
+            'transaction_id': transaction.id,
+            'status': transaction.status,
+            'paid': transaction.status == 'paid'
+        }), 200
         
-        if transaction.status == 'paid':
-            return jsonify({'error': 'Transaction already paid'}), 409
-        
-        # Check if donation already exists
-        existing_donation = Donation.query.filter_by(transaction_id=transaction_id).first()
-        if existing_donation:
-            return jsonify({'error': 'Payment already recorded'}), 409
-        
-        # In production, integrate with payment gateway (Stripe, PayPal, etc.)
-        # For now, we'll just record the payment
-        
-        donation = Donation(
-            realtor_id=realtor_id,
-            transaction_id=transaction_id,
-            amount=transaction.calculated_donation_amount,
-            payment_method=data.get('payment_method', 'credit_card'),
-            payment_reference=data.get('payment_reference', ''),
-            payment_status='completed'
-        )
-        
-        # Update transaction status
-        transaction.status = 'paid'
-        
-        db.session.add(donation)
-        
-        # Create thank you notification
-        notification = Notification(
-            realtor_id=realtor_id,
-            type='thank_you',
-            subject='Thank You for Your Donation!',
-            message=f'Thank you for your ${donation.amount:.2f} donation for {transaction.get_period_display()}! Your contribution helps families achieve homeownership.',
-            action_url='/donations/share'
-        )
-        db.session.add(notification)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@donations_bp.route('/payment-intent', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_payment_intent():
+    """Start a card payment for a transaction; the client confirms it with Stripe.js"""
+    try:
+        realtor_id = int(get_jwt_identity())
+        realtor = Realtor.query.get(realtor_id)
         
-        db.session.commit()
+        if not realtor:
+            return jsonify({'error': 'Realtor not found'}), 404
+        
+        if not current_app.config.get('STRIPE_SECRET_KEY'):
+            return jsonify({'error': 'Card payments are not configured'}), 503
+        
+        data = request.get_json() or {}
+        
+        if 'transaction_id' not in data:
+            return jsonify({'error': 'transaction_id is required'}), 400
+        
+        try:
+            intent = stripe_payments.create_payment_intent(int(data['transaction_id']), realtor_id)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid transaction_id'}), 400
+        except PaymentError as e:
+            return jsonify({'error': e.message}), e.status_code
+        except stripe_payments.StripeError as e:
+            return jsonify({'error': f'Payment provider error: {e.message}'}), 502
         
         return jsonify({
-            'message': 'Payment submitted successfully',
-            'donation': donation.to_dict()
+            'payment_intent': intent,
+            'publishable_key': current_app.config.get('STRIPE_PUBLISHABLE_KEY')
         }), 201
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@donations_bp.route('/stripe-webhook', methods=['POST'])
+def stripe_webhook():
+    """
+    Receive Stripe events (no JWT; authenticated by the Stripe-Signature header).
+    Verified events are only stored here; the stripe_events job applies them.
+    """
+    try:
+        secret = current_app.config.get('STRIPE_WEBHOOK_SECRET')
+        if not secret:
+            return jsonify({'error': 'Stripe webhooks are not configured'}), 503
+        
+        payload = request.get_data()
+        try:
+            stripe_payments.verify_signature(
+                payload, request.headers.get('Stripe-Signature'), secret,
+                tolerance=current_app.config.get('STRIPE_WEBHOOK_TOLERANCE', stripe_payments.SIGNATURE_TOLERANCE)
+            )
+        except stripe_payments.SignatureError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            event = None
+        if not isinstance(event, dict) or not event.get('id') or not event.get('type'):
+            return jsonify({'error': 'Invalid event'}), 400
+        
+        new = stripe_payments.enqueue_event(event, payload)
+        db.session.commit()
+        
+        return jsonify({'received': True, 'duplicate': not new}), 200
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -137,14 +237,68 @@ def get_stats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@donations_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard():
+    """Get top donors and the current realtor's rank for a month, quarter or year"""
+    try:
+        realtor_id = int(get_jwt_identity())
+        
+        period = request.args.get('period', 'month')
+        if period not in PERIODS:
+            return jsonify({'error': f"period must be one of: {', '.join(PERIODS)}"}), 400
+        
+        now = datetime.utcnow()
+        year = request.args.get('year', now.year, type=int)
+        month = request.args.get('month', now.month, type=int)
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        
+        if not 1 <= month <= 12 or limit < 1:
+            return jsonify({'error': 'Invalid month or limit'}), 400
+        
+        standings = leaderboards.standings(period, year, month, limit=limit, realtor_id=realtor_id)
+        
+        realtors = {
+            r.id: r for r in Realtor.query.filter(Realtor.id.in_([leader[1] for leader in standings['leaders']])).all()
+        }
+        
+        leaders = []
+        for rank, leader_id, total in standings['leaders']:
+            realtor = realtors.get(leader_id)
+            leaders.append({
+                'rank': rank,
+                'realtor_id': leader_id,
+                'name': f"{realtor.first_name} {realtor.last_name}" if realtor else None,
+                'brokerage': realtor.brokerage if realtor else None,
+                'total': float(total)
+            })
+        
+        me = standings['me']
+        
+        return jsonify({
+            'period': period,
+            'key': standings['key'],
+            'label': standings['label'],
+            'start': standings['start'].isoformat(),
+            'end': standings['end'].isoformat(),
+            'participants': standings['participants'],
+            'leaders': leaders,
+            'my_rank': {'rank': me[0], 'total': float(me[1])} if me else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @donations_bp.route('/history', methods=['GET'])
 @jwt_required()
+@conditional(history_version)
 def get_history():
     """Get donation history"""
     try:
         realtor_id = int(get_jwt_identity())
         
         donations = Donation.query\
+            .options(joinedload(Donation.transaction).joinedload(Transaction.donation))\
             .filter_by(realtor_id=realtor_id)\
             .order_by(Donation.paid_at.desc())\
             .all()
@@ -167,12 +321,12 @@ def get_history():
 @donations_bp.route('/pending', methods=['GET'])
 @jwt_required()
 def get_pending():
-    """Get pending donations (transactions not yet paid)"""
+    """Get pending donations (transactions not yet paid, including overdue)"""
     try:
         realtor_id = int(get_jwt_identity())
         
         pending_transactions = Transaction.query\
-            .filter_by(realtor_id=realtor_id, status='pending')\
+            .filter(Transaction.realtor_id == realtor_id, Transaction.status.in_(['pending', 'overdue']))\
             .order_by(Transaction.year.desc(), Transaction.month.desc())\
             .all()
         
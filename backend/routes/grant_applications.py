@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models import GrantApplication, Realtor, Notification
 from datetime import datetime
+from sqlalchemy.orm import load_only
 from utils.address_validation import validate_address
+from utils.dedup import flag_duplicate
+from utils.search import search_applications
 from utils.email_service import send_application_confirmation_email, send_new_application_notification
+from utils.idempotency import idempotent
 
 grant_applications_bp = Blueprint('grant_applications', __name__)
 
@@ -21,21 +25,32 @@ def validate_address_route():
     if not all([address, city, state, zip_code]):
         return jsonify({'error': 'All address fields are required'}), 400
     
-    # For demo purposes, skip actual USPS validation and return the address as-is
-    # In production, you would call validate_address(address, city, state, zip_code)
-    result = {
-        'success': True,
-        'address': address,
-        'city': city,
-        'state': state,
-        'zip5': zip_code,
-        'zip4': '',
-        'full_address': f"{address}, {city}, {state} {zip_code}"
-    }
+    result = None
+    if current_app.config.get('ADDRESS_VALIDATION_ENABLED', True):
+        result = validate_address(address, city, state, zip_code)
+        
+        if not result['success'] and not result.get('service_error'):
+            return jsonify({'error': result['error']}), 400
+    
+    if result is None or not result['success']:
+        # Validation is disabled or USPS is unreachable; accept the address as entered
+        if result is not None:
+            print(f"⚠️ Address validation unavailable: {result['error']}")
+        result = {
+            'success': True,
+            'validated': False,
+            'address': address,
+            'city': city,
+            'state': state,
+            'zip5': zip_code,
+            'zip4': '',
+            'full_address': f"{address}, {city}, {state} {zip_code}"
+        }
     
     return jsonify(result), 200
 
 @grant_applications_bp.route('/', methods=['POST'])
+@idempotent
 def submit_application():
     """Submit a new grant application"""
     try:
@@ -92,8 +107,16 @@ def submit_application():
         )
         
         db.session.add(application)
+        db.session.flush()
+        
+        # Fingerprint the applicant and flag it if an earlier application matches
+        duplicate_of_id = flag_duplicate(application)
         db.session.commit()
         
+        message = f'A new grant application has been submitted by {application.applicant_first_name} {application.applicant_last_name}.'
+        if duplicate_of_id:
+            message += f' It may be a duplicate of application #{duplicate_of_id} ({application.duplicate_reasons}).'
+        
         # Send notification to all admins
         admins = Realtor.query.filter_by(is_admin=True, is_approved=True).all()
         for admin in admins:
@@ -101,7 +124,7 @@ def submit_application():
                 realtor_id=admin.id,
                 type='grant_application',
                 subject='New Grant Application Received',
-                message=f'A new grant application has been submitted by {application.applicant_first_name} {application.applicant_last_name}.',
+                message=message,
                 is_read=False
             )
             db.session.add(notification)
@@ -141,18 +164,40 @@ def get_applications():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        # Field projection: ?fields=id,status,applicant or ?view=full, summary by default
+        if request.args.get('fields'):
+            try:
+                fields = GrantApplication.resolve_fields(request.args.get('fields').split(','))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        elif request.args.get('view') == 'full':
+            fields = None
+        else:
+            fields = GrantApplication.SUMMARY_FIELDS
+        
         query = GrantApplication.query
         
+        # Only SELECT the projected columns (defers applicant_story, admin_notes, ...)
+        if fields is not None:
+            query = query.options(load_only(*GrantApplication.columns_for(fields)))
+        
         if status:
             query = query.filter_by(status=status)
         
+        # ?duplicates=true lists flagged applications; ?duplicate_of=<id> lists one cluster
+        if request.args.get('duplicates', '').lower() == 'true':
+            query = query.filter(GrantApplication.duplicate_of_id.is_not(None))
+        duplicate_of = request.args.get('duplicate_of', type=int)
+        if duplicate_of:
+            query = query.filter(db.or_(GrantApplication.id == duplicate_of, GrantApplication.duplicate_of_id == duplicate_of))
+        
         # Order by newest first
         query = query.order_by(GrantApplication.created_at.desc())
         
         # Paginate
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
-        applications = [app.to_dict() for app in pagination.items]
+        applications = [app.to_dict(fields=fields) for app in pagination.items]
         
         return jsonify({
             'applications': applications,
@@ -164,6 +209,37 @@ def get_applications():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@grant_applications_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """Full-text search over grant applications (requires authentication)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        realtor = Realtor.query.get(current_user_id)
+        
+        if not realtor or not realtor.is_approved:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': 'q is required'}), 400
+        
+        # Comma-separated, e.g. ?status=pending,under_review
+        status = request.args.get('status')
+        statuses = [s.strip() for s in status.split(',') if s.strip()] if status else None
+        
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        
+        try:
+            results = search_applications(q, statuses=statuses, limit=limit, cursor=request.args.get('cursor'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(results), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @grant_applications_bp.route('/<int:application_id>', methods=['GET'])
 @jwt_required()
 def get_application(application_id):
@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify, request, current_app
+from extensions import db
+from models.realtor import Realtor
+from models.transaction import Transaction
+from models.donation import Donation
+from models.grant_application import GrantApplication
+from utils.cache import cache
+
+impact_bp = Blueprint('impact', __name__, url_prefix='/api/impact')
+
+IMPACT_CACHE_KEY = 'impact'
+
+def compute_impact():
+    """Foundation-wide totals in a single round trip"""
+    total_donations, donation_count, realtors, transactions, families = db.session.query(
+        db.session.query(db.func.coalesce(db.func.sum(Donation.amount), 0))
+            .filter(Donation.payment_status == 'completed').scalar_subquery(),
+        db.session.query(db.func.count(Donation.id))
+            .filter(Donation.payment_status == 'completed').scalar_subquery(),
+        db.session.query(db.func.count(Realtor.id))
+            .filter(Realtor.approval_status == 'approved').scalar_subquery(),
+        db.session.query(db.func.coalesce(db.func.sum(Transaction.closed_transactions_count), 0)).scalar_subquery(),
+        db.session.query(db.func.count(GrantApplication.id))
+            .filter(GrantApplication.status == 'approved').scalar_subquery()
+    ).one()
+    
+    return {
+        'total_donations': float(total_donations or 0),
+        'donation_count': donation_count,
+        'participating_realtors': realtors,
+        'transactions_reported': int(transactions or 0),
+        'families_helped': families
+    }
+
+def invalidate_impact():
+    """Drop cached totals (call after a donation is committed)"""
+    cache.invalidate(IMPACT_CACHE_KEY)
+
+@impact_bp.route('', methods=['GET'])
+def get_impact():
+    """Public foundation impact counters (no authentication)"""
+    try:
+        ttl = current_app.config.get('IMPACT_CACHE_SECONDS', 60)
+        impact = cache.get_or_compute(IMPACT_CACHE_KEY, ttl, compute_impact)
+        
+        response = jsonify(impact)
+        response.cache_control.public = True
+        response.cache_control.max_age = ttl
+        response.headers['Vary'] = 'Origin'
+        response.add_etag()
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,12 +2,24 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.notification import Notification
+from utils.conditional import conditional
 from datetime import datetime
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
+def notifications_version(realtor_id):
+    """New, deleted and read notifications all move one of these"""
+    signals = db.session.query(
+        db.func.count(Notification.id),
+        db.func.max(Notification.id),
+        db.func.sum(db.case((Notification.is_read == False, 1), else_=0)),
+        db.func.max(Notification.read_at)
+    ).filter(Notification.realtor_id == realtor_id).one()
+    return tuple(signals), None
+
 @notifications_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional(notifications_version)
 def get_notifications():
     """Get all notifications for realtor"""
     try:
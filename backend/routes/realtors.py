@@ -5,6 +5,7 @@ from extensions import db
 from models.realtor import Realtor
 from models.donation import Donation
 from models.transaction import Transaction
+from utils.conditional import conditional
 import os
 from datetime import datetime
 
@@ -14,8 +15,14 @@ def allowed_file(filename, allowed_extensions):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def profile_version(realtor_id):
+    """Version signals for the profile: every change bumps updated_at"""
+    updated_at = db.session.query(Realtor.updated_at).filter(Realtor.id == realtor_id).scalar()
+    return (updated_at,), updated_at
+
 @realtors_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional(profile_version)
 def get_profile():
     """Get current realtor profile"""
     try:
@@ -156,7 +163,7 @@ def get_stats():
         pending_donations = db.session.query(db.func.sum(Transaction.calculated_donation_amount))\
             .filter(
                 Transaction.realtor_id == realtor_id,
-                Transaction.status == 'pending'
+                Transaction.status.in_(['pending', 'overdue'])
             )\
             .scalar() or 0
         
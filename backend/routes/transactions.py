@@ -3,13 +3,35 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.realtor import Realtor
 from models.transaction import Transaction
-from models.notification import Notification
+from utils.periods import get_pending_periods
+from utils.conditional import conditional
+from utils.serializers import serialize_transactions
+from utils.idempotency import idempotent
+from utils.submissions import parse_submission, submit_transactions, transaction_row
 from datetime import datetime
 
 transactions_bp = Blueprint('transactions', __name__, url_prefix='/api/transactions')
 
+# Ten years of months per request
+BULK_SUBMIT_LIMIT = 120
+
+def transaction_signals(realtor_id):
+    """
+    Aggregates that change whenever a realtor's transactions do: the count
+    catches inserts and deletes, and updated_at (set on every UPDATE, including
+    payments claiming a transaction and overdue marking) catches the rest.
+    """
+    return db.session.query(
+        db.func.count(Transaction.id),
+        db.func.max(Transaction.updated_at)
+    ).filter(Transaction.realtor_id == realtor_id).one()
+
+def history_version(realtor_id):
+    return tuple(transaction_signals(realtor_id)), None
+
 @transactions_bp.route('/submit', methods=['POST'])
 @jwt_required()
+@idempotent
 def submit_transaction():
     """Submit monthly closed transactions"""
     try:
@@ -21,99 +43,101 @@ def submit_transaction():
         
         data = request.get_json()
         
-        # Validate required fields
-        if 'closed_transactions_count' not in data:
-            return jsonify({'error': 'closed_transactions_count is required'}), 400
-        
-        # Get month and year (default to previous month)
-        month = data.get('month')
-        year = data.get('year')
-        
-        if not month or not year:
-            now = datetime.utcnow()
-            if now.month == 1:
-                month = 12
-                year = now.year - 1
-            else:
-                month = now.month - 1
-                year = now.year
-        
-        # Validate month and year
-        if not (1 <= month <= 12):
-            return jsonify({'error': 'Month must be between 1 and 12'}), 400
-        
-        if year < 2020 or year > datetime.utcnow().year:
-            return jsonify({'error': 'Invalid year'}), 400
-        
-        # Validate transaction count
         try:
-            closed_count = int(data['closed_transactions_count'])
-            if closed_count < 0:
-                return jsonify({'error': 'Transaction count must be non-negative'}), 400
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Invalid transaction count'}), 400
-        
-        # Check if transaction already exists for this period
-        existing = Transaction.query.filter_by(
-            realtor_id=realtor_id,
-            month=month,
-            year=year
-        ).first()
+            month, year, closed_count = parse_submission(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Inserts unless the period was already submitted; no separate existence check
+        created, existing = submit_transactions([
+            transaction_row(realtor_id, month, year, closed_count, realtor.donation_amount_per_transaction)
+        ])
         
         if existing:
+            db.session.rollback()
             return jsonify({'error': f'Transactions for {month}/{year} already submitted'}), 409
         
-        # Calculate donation amount
-        calculated_amount = closed_count * realtor.donation_amount_per_transaction
-        
-        # Create transaction record
-        transaction = Transaction(
-            realtor_id=realtor_id,
-            month=month,
-            year=year,
-            closed_transactions_count=closed_count,
-            calculated_donation_amount=calculated_amount,
-            status='pending' if calculated_amount > 0 else 'paid'
-        )
-        
-        db.session.add(transaction)
-        
-        # Create payment request notification if donation is due
-        if calculated_amount > 0:
-            notification = Notification(
-                realtor_id=realtor_id,
-                type='payment_request',
-                subject='Payment Requested for Monthly Donation',
-                message=f'Thank you for submitting your transactions! Your donation amount for {transaction.get_period_display()} is ${calculated_amount:.2f}. Please submit your payment.',
-                action_url='/donations/payment'
-            )
-            db.session.add(notification)
-        
         db.session.commit()
         
         return jsonify({
             'message': 'Transactions submitted successfully',
-            'transaction': transaction.to_dict()
+            'transaction': created[0]
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@transactions_bp.route('/submit-bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def submit_transactions_bulk():
+    """
+    Submit several months at once.
+    Admins may submit on behalf of a realtor by passing realtor_id. Months
+    that were already submitted are reported back and left unchanged.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        current_user = Realtor.query.get(current_user_id)
+        
+        if not current_user:
+            return jsonify({'error': 'Realtor not found'}), 404
+        
+        data = request.get_json() or {}
+        
+        realtor = current_user
+        if data.get('realtor_id') is not None and data['realtor_id'] != current_user_id:
+            if not current_user.is_admin:
+                return jsonify({'error': 'Admin access required'}), 403
+            realtor = Realtor.query.get(data['realtor_id'])
+            if not realtor:
+                return jsonify({'error': 'Realtor not found'}), 404
+        
+        periods = data.get('transactions')
+        if not isinstance(periods, list) or not periods:
+            return jsonify({'error': 'transactions must be a non-empty list'}), 400
+        
+        if len(periods) > BULK_SUBMIT_LIMIT:
+            return jsonify({'error': f'At most {BULK_SUBMIT_LIMIT} months can be submitted at once'}), 400
+        
+        rows = []
+        seen = set()
+        for index, period in enumerate(periods):
+            try:
+                if not isinstance(period, dict):
+                    raise ValueError('Each entry must be an object')
+                month, year, closed_count = parse_submission(period)
+            except ValueError as e:
+                return jsonify({'error': f'transactions[{index}]: {e}'}), 400
+            if (month, year) in seen:
+                return jsonify({'error': f'transactions[{index}]: {month}/{year} is listed twice'}), 400
+            seen.add((month, year))
+            rows.append(transaction_row(realtor.id, month, year, closed_count, realtor.donation_amount_per_transaction))
+        
+        created, existing = submit_transactions(rows)
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'{len(created)} months submitted',
+            'transactions': created,
+            'already_submitted': [{'month': month, 'year': year} for _, month, year in existing]
+        }), 201 if created else 409
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @transactions_bp.route('/history', methods=['GET'])
 @jwt_required()
+@conditional(history_version)
 def get_history():
     """Get transaction history"""
     try:
         realtor_id = int(get_jwt_identity())
         
-        transactions = Transaction.query\
-            .filter_by(realtor_id=realtor_id)\
-            .order_by(Transaction.year.desc(), Transaction.month.desc())\
-            .all()
-        
         return jsonify({
-            'transactions': [t.to_dict() for t in transactions]
+            'transactions': serialize_transactions(Transaction.realtor_id == realtor_id)
         }), 200
         
     except Exception as e:
@@ -162,31 +186,11 @@ def get_pending():
         if not realtor:
             return jsonify({'error': 'Realtor not found'}), 404
         
-        # Find months that haven't been submitted
-        # For now, just return the previous month if not submitted
-        now = datetime.utcnow()
-        if now.month == 1:
-            month = 12
-            year = now.year - 1
-        else:
-            month = now.month - 1
-            year = now.year
-        
-        transaction = Transaction.query.filter_by(
-            realtor_id=realtor_id,
-            month=month,
-            year=year
-        ).first()
-        
-        pending = []
-        if not transaction and realtor.created_at < datetime(year, month, 1):
-            months = ['January', 'February', 'March', 'April', 'May', 'June',
-                      'July', 'August', 'September', 'October', 'November', 'December']
-            pending.append({
-                'month': month,
-                'year': year,
-                'display': f"{months[month - 1]} {year}"
-            })
+        # Every month since the realtor joined that hasn't been submitted
+        pending = [
+            {'month': p['month'], 'year': p['year'], 'display': p['display']}
+            for p in get_pending_periods(realtor_id=realtor_id)
+        ]
         
         return jsonify({
             'pending': pending
@@ -0,0 +1,56 @@
+"""
+Shared fixtures. Each test gets an app built by create_app('testing') on its
+own SQLite file, so N+1 detection runs in 'raise' mode. Run from backend/:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from config import config
+from extensions import db
+from models import Realtor
+from utils.nplusone import assert_max_queries
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(config['testing'], 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_realtor(app):
+    """Create an approved realtor; returns (realtor, auth headers)"""
+    def make(email, **fields):
+        realtor = Realtor(email=email, first_name=fields.pop('first_name', 'Test'),
+                          last_name=fields.pop('last_name', 'Realtor'), is_approved=True,
+                          approval_status='approved', **fields)
+        realtor.set_password('password123')
+        db.session.add(realtor)
+        db.session.commit()
+        return realtor, {'Authorization': f'Bearer {create_access_token(identity=str(realtor.id))}'}
+    return make
+
+
+@pytest.fixture
+def max_queries(app):
+    """
+    Fail the test if a block runs more SQL statements than allowed:
+        with max_queries(3):
+            client.get('/api/donations/history', headers=headers)
+    """
+    return assert_max_queries
@@ -0,0 +1,38 @@
+"""
+Concurrent payments for one transaction: record_payment's claiming UPDATE and
+ON CONFLICT insert must let exactly one through.
+"""
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from extensions import db
+from models import Donation, Transaction
+
+ATTEMPTS = 8
+
+
+def test_concurrent_payments_record_one_donation(app, make_realtor):
+    realtor, headers = make_realtor('payer@example.com', donation_amount_per_transaction=100)
+    transaction = Transaction(realtor_id=realtor.id, month=1, year=2025, closed_transactions_count=2,
+                              calculated_donation_amount=200, status='pending')
+    db.session.add(transaction)
+    db.session.commit()
+    transaction_id = transaction.id
+    db.session.remove()
+
+    barrier = threading.Barrier(ATTEMPTS)
+
+    def pay(_):
+        # Each thread gets its own client, app context and database connection
+        client = app.test_client()
+        barrier.wait()
+        return client.post('/api/donations/payment', headers=headers,
+                           json={'transaction_id': transaction_id, 'payment_method': 'bank_transfer'}).status_code
+
+    with ThreadPoolExecutor(max_workers=ATTEMPTS) as pool:
+        statuses = Counter(pool.map(pay, range(ATTEMPTS)))
+
+    assert statuses == {201: 1, 409: ATTEMPTS - 1}
+    assert Donation.query.filter_by(transaction_id=transaction_id).count() == 1
+    assert db.session.get(Transaction, transaction_id).status == 'paid'
@@ -0,0 +1,65 @@
+"""
+Listing endpoints must run a fixed number of queries however many rows they
+return; an N+1 would grow with the seeded rows below.
+"""
+import pytest
+
+from extensions import db
+from models import Donation, Transaction
+
+REALTORS = 3
+MONTHS = 8
+PAID_MONTHS = 5
+
+
+@pytest.fixture
+def seeded(make_realtor):
+    """Realtors with MONTHS transactions each, the first PAID_MONTHS paid; returns (admin headers, realtor headers)"""
+    _, admin_headers = make_realtor('admin@example.com', is_admin=True)
+    realtor_headers = []
+    for index in range(REALTORS):
+        realtor, headers = make_realtor(f'realtor{index}@example.com', donation_amount_per_transaction=100)
+        realtor_headers.append(headers)
+        for month in range(1, MONTHS + 1):
+            paid = month <= PAID_MONTHS
+            transaction = Transaction(realtor_id=realtor.id, month=month, year=2025, closed_transactions_count=1,
+                                      calculated_donation_amount=100, status='paid' if paid else 'pending')
+            db.session.add(transaction)
+            if paid:
+                db.session.flush()
+                db.session.add(Donation(realtor_id=realtor.id, transaction_id=transaction.id, amount=100,
+                                        payment_method='check'))
+    db.session.commit()
+    db.session.expunge_all()
+    return admin_headers, realtor_headers
+
+
+def test_admin_donations_query_count(client, seeded, max_queries):
+    admin_headers, _ = seeded
+    # The admin lookup, then donations joined to their realtors
+    with max_queries(2):
+        response = client.get('/api/admin/donations', headers=admin_headers)
+    assert response.status_code == 200
+    donations = response.get_json()['donations']
+    assert len(donations) == REALTORS * PAID_MONTHS
+    assert all(donation['realtor_email'] for donation in donations)
+
+
+def test_donation_history_query_count(client, seeded, max_queries):
+    _, realtor_headers = seeded
+    # Two version queries for the ETag, then the donations with their transactions
+    with max_queries(3):
+        response = client.get('/api/donations/history', headers=realtor_headers[0])
+    assert response.status_code == 200
+    donations = response.get_json()['donations']
+    assert len(donations) == PAID_MONTHS
+    assert all(donation['transaction']['has_donation'] for donation in donations)
+
+
+def test_pending_donations_query_count(client, seeded, max_queries):
+    _, realtor_headers = seeded
+    # Transactions, then their donations in one selectin query
+    with max_queries(2):
+        response = client.get('/api/donations/pending', headers=realtor_headers[0])
+    assert response.status_code == 200
+    assert len(response.get_json()['pending']) == MONTHS - PAID_MONTHS
@@ -0,0 +1,170 @@
+"""
+Bulk re-validation of grant application addresses.
+Walks applications whose addresses were never standardized in id order,
+validates them through a rate-limited USPSClient on a few threads and stores
+the standardized components and ZIP+4. Progress is checkpointed per chunk in
+export_watermarks, so an interrupted run resumes after the last finished chunk.
+"""
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, update
+from extensions import db
+from models import GrantApplication, ExportWatermark
+from utils.address_validation import USPS_BATCH_SIZE, RateLimiter, USPSClient, USPS_API_URL, parse_address
+
+CHECKPOINT = 'address_validation'
+
+
+def _checkpoint():
+    watermark = db.session.get(ExportWatermark, CHECKPOINT)
+    if not watermark:
+        watermark = ExportWatermark(dataset=CHECKPOINT, last_id=0, rows_exported=0)
+        db.session.add(watermark)
+    return watermark
+
+
+def _client(config, rate):
+    return USPSClient(
+        config.get('USPS_USER_ID', ''),
+        url=config.get('USPS_API_URL', USPS_API_URL),
+        timeout=config.get('USPS_TIMEOUT', 5),
+        cache_seconds=config.get('USPS_CACHE_SECONDS', 30 * 86400),
+        rate_limiter=RateLimiter(rate)
+    )
+
+
+def _validate_batch(app, client, batch):
+    # Worker threads need their own app context for the persistent address cache
+    with app.app_context():
+        return client.validate_many(batch)
+
+
+def _addresses_of(row):
+    """(role, free-text address) pairs that need validating for an application row"""
+    yield 'applicant', row.applicant_address
+    if row.application_type == 'someone_else' and row.submitter_address:
+        yield 'submitter', row.submitter_address
+
+
+def _application_update(row, results):
+    """Column values for one application from its parsed addresses' results, or None to retry later"""
+    values = {'id': row.id, 'address_validated_at': datetime.utcnow()}
+    status, error = 'valid', None
+
+    for role, text in _addresses_of(row):
+        parsed = parse_address(text)
+        if parsed is None:
+            status, error = 'unparseable', f'{role.capitalize()} address could not be split into street, city, state and ZIP'
+            continue
+
+        result = results[parsed]
+        if result.get('service_error'):
+            return None
+        if not result['success']:
+            if status == 'valid':
+                status, error = 'invalid', f"{role.capitalize()}: {result['error']}"[:200]
+            continue
+
+        values.update({
+            f'{role}_street': result['address'], f'{role}_city': result['city'], f'{role}_state': result['state'],
+            f'{role}_zip5': result['zip5'], f'{role}_zip4': result['zip4'] or None
+        })
+
+    values['address_validation_status'] = status
+    values['address_validation_error'] = error
+    return values
+
+
+def revalidate_addresses(chunk_size=None, concurrency=None, rate=None, max_rows=None, restart=False):
+    """
+    Validate and standardize unvalidated grant application addresses.
+
+    Applications are read in chunks of ADDRESS_REVALIDATION_CHUNK_SIZE past the
+    checkpoint. Each chunk's distinct addresses go to USPS in batches of five on
+    ADDRESS_REVALIDATION_CONCURRENCY threads, at most ADDRESS_REVALIDATION_RATE
+    requests per second in total. Applications whose lookups failed because
+    USPS was unreachable stay unvalidated; when a pass reaches the end the
+    checkpoint goes back to zero, so the next run retries them.
+
+    Args:
+        chunk_size: Applications per chunk
+        concurrency: Threads calling USPS
+        rate: USPS requests per second across all threads
+        max_rows: Stop after this many applications (None for no limit)
+        restart: Start from the first application instead of the checkpoint
+
+    Returns:
+        dict: counts of applications by resulting status, plus 'retry_later'
+    """
+    app = current_app._get_current_object()
+    config = app.config
+    chunk_size = chunk_size or config.get('ADDRESS_REVALIDATION_CHUNK_SIZE', 500)
+    concurrency = concurrency or config.get('ADDRESS_REVALIDATION_CONCURRENCY', 4)
+    client = _client(config, rate or config.get('ADDRESS_REVALIDATION_RATE', 5))
+
+    checkpoint = _checkpoint()
+    if restart:
+        checkpoint.last_id = 0
+    db.session.commit()
+
+    stats = Counter()
+    processed = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while max_rows is None or processed < max_rows:
+            limit = chunk_size if max_rows is None else min(chunk_size, max_rows - processed)
+            rows = db.session.execute(
+                select(GrantApplication.id, GrantApplication.application_type,
+                       GrantApplication.applicant_address, GrantApplication.submitter_address)
+                .where(GrantApplication.id > checkpoint.last_id, GrantApplication.address_validation_status.is_(None))
+                .order_by(GrantApplication.id)
+                .limit(limit)
+            ).all()
+
+            if not rows:
+                # Pass complete; the next run starts over to retry anything left unvalidated
+                checkpoint.last_id = 0
+                db.session.commit()
+                break
+
+            addresses = list(dict.fromkeys(
+                parsed for row in rows for _, text in _addresses_of(row)
+                if (parsed := parse_address(text)) is not None
+            ))
+            batches = [addresses[i:i + USPS_BATCH_SIZE] for i in range(0, len(addresses), USPS_BATCH_SIZE)]
+
+            started = time.perf_counter()
+            results = {}
+            for batch, batch_results in zip(batches, pool.map(lambda b: _validate_batch(app, client, b), batches)):
+                results.update(zip(batch, batch_results))
+
+            updates = []
+            for row in rows:
+                values = _application_update(row, results)
+                if values is not None:
+                    updates.append(values)
+
+            if batches and not updates:
+                # Nothing in the chunk could be checked: USPS is down, keep the checkpoint where it was
+                db.session.rollback()
+                print(f"⚠️ Address re-validation stopped at id {checkpoint.last_id}: USPS unavailable")
+                break
+
+            stats['retry_later'] += len(rows) - len(updates)
+            stats.update(values['address_validation_status'] for values in updates)
+            if updates:
+                db.session.execute(update(GrantApplication), updates)
+            checkpoint.last_id = rows[-1].id
+            checkpoint.rows_exported += len(rows)
+            checkpoint.exported_at = datetime.utcnow()
+            db.session.commit()
+
+            processed += len(rows)
+            print(f"📫 Re-validated {processed:,} applications through id {rows[-1].id} "
+                  f"({len(addresses)} addresses in {time.perf_counter() - started:.1f}s)")
+
+    client.session.close()
+    return dict(stats)
@@ -1,116 +1,426 @@
-import requests
+"""
+USPS address validation.
+Addresses go through a shared USPSClient that keeps a pooled HTTP session,
+packs up to USPS_BATCH_SIZE addresses into each Verify request and caches
+results by normalized input: first in a per-process LRU, then in the
+address_cache table so every worker (and later requests) reuse them.
+Requests are built with ElementTree and responses are parsed incrementally.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import requests
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+USPS_API_URL = 'https://secure.shippingapis.com/ShippingAPI.dll'
+
+# The Verify API accepts at most five addresses per request
+USPS_BATCH_SIZE = 5
+
+_PUNCTUATION = re.compile(r'[.,]')
+# Characters XML 1.0 cannot carry, even escaped
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class USPSResponseError(Exception):
+    """USPS rejected the whole request (top-level <Error> document)"""
+
+
+def _xml_text(value):
+    return _INVALID_XML_CHARS.sub('', str(value or ''))
+
+
+def normalize_address(address, city, state, zip_code):
+    """
+    Canonical form of an address used as the cache key and sent to USPS.
+
+    Returns:
+        tuple: (address, city, state, zip5), upper-cased with punctuation and
+        repeated whitespace removed
+    """
+    def clean(value):
+        return _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', str(value or ''))).strip().upper()
+
+    zip5 = re.sub(r'\D', '', str(zip_code or ''))[:5]
+    return (clean(address), clean(city), clean(state), zip5)
+
+
+def cache_key(normalized):
+    """Persistent cache key for a normalized address tuple"""
+    return hashlib.sha256('|'.join(normalized).encode('utf-8')).hexdigest()
+
+
+def format_full_address(result):
+    """'123 MAIN ST, CITY, ST 12345-6789' from a successful validation result"""
+    full_address = result['address']
+    if result['city']:
+        full_address += f", {result['city']}"
+    if result['state']:
+        full_address += f", {result['state']}"
+    if result['zip5']:
+        zip_full = result['zip5']
+        if result['zip4']:
+            zip_full += f"-{result['zip4']}"
+        full_address += f" {zip_full}"
+    return full_address
+
+
+_FREE_TEXT_ADDRESS = re.compile(
+    r'^\s*(?P<street>.+?)\s*,\s*(?P<city>[^,]+?)\s*,?\s+(?P<state>[A-Za-z]{2})\.?,?\s+(?P<zip>\d{5})(?:-?\d{4})?\s*$'
+)
+
+
+def parse_address(text):
+    """
+    Split a free-text address ('123 Main St, Los Angeles, CA 90012') into parts.
+
+    Returns:
+        tuple: (address, city, state, zip_code), or None if it does not parse
+    """
+    match = _FREE_TEXT_ADDRESS.match(text or '')
+    if not match:
+        return None
+    return match.group('street'), match.group('city'), match.group('state'), match.group('zip')
+
+
+def build_verify_request(user_id, batch):
+    """
+    AddressValidateRequest XML for up to USPS_BATCH_SIZE addresses.
+
+    Built with ElementTree, so markup in user input is always escaped;
+    characters XML 1.0 cannot represent at all are dropped.
+
+    Args:
+        user_id: USPS Web Tools USERID
+        batch: list of (address, city, state, zip5)
+
+    Returns:
+        str: the request document
+    """
+    root = ET.Element('AddressValidateRequest', USERID=_xml_text(user_id))
+    ET.SubElement(root, 'Revision').text = '1'
+    for index, (address, city, state, zip5) in enumerate(batch):
+        element = ET.SubElement(root, 'Address', ID=str(index))
+        # USPS validates element order: Address1, Address2, City, State, Zip5, Zip4
+        for tag, value in (('Address1', ''), ('Address2', address), ('City', city),
+                           ('State', state), ('Zip5', zip5), ('Zip4', '')):
+            ET.SubElement(element, tag).text = _xml_text(value)
+    return ET.tostring(root, encoding='unicode')
+
+
+class _NoDoctypeStream:
+    """Binary file-like wrapper that rejects DTDs, so entity declarations never reach the parser"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._tail = b''
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        # Keep the end of the previous chunk so a marker split across reads is still caught
+        window = self._tail + chunk
+        if b'<!DOCTYPE' in window or b'<!ENTITY' in window:
+            raise ET.ParseError('DTDs are not allowed in USPS responses')
+        self._tail = window[-8:]
+        return chunk
+
+
+def _address_result(element):
+    error = element.find('Error')
+    if error is not None:
+        return {'success': False, 'error': (error.findtext('Description') or 'Unknown error').strip()}
+
+    result = {
+        'success': True,
+        'address': element.findtext('Address2', ''),
+        'city': element.findtext('City', ''),
+        'state': element.findtext('State', ''),
+        'zip5': element.findtext('Zip5', ''),
+        'zip4': element.findtext('Zip4', '')
+    }
+    result['full_address'] = format_full_address(result)
+    return result
+
+
+def iter_verify_response(stream):
+    """
+    Incrementally parse a Verify response from a binary stream.
+
+    Each <Address> is discarded as soon as it has been read, so memory stays
+    flat however many addresses the response carries.
+
+    Yields:
+        tuple: (Address ID attribute, result dict)
+
+    Raises:
+        USPSResponseError: the response is a top-level <Error> document
+        ET.ParseError: malformed XML, or a DTD
+    """
+    root = None
+    depth = 0
+    events = ET.iterparse(_NoDoctypeStream(stream), events=('start', 'end'))
+    while True:
+        try:
+            event, element = next(events)
+        except StopIteration:
+            return
+        except LookupError as e:
+            # An unknown encoding in the XML declaration
+            raise ET.ParseError(str(e)) from e
+
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 0 and element.tag == 'Error':
+            raise USPSResponseError((element.findtext('Description') or 'Unknown error').strip())
+        if depth == 1 and element.tag == 'Address':
+            yield element.get('ID', ''), _address_result(element)
+            root.clear()
+
+
+def _service_error(message):
+    # Transport/configuration failures are never cached and let callers fall back
+    return {'success': False, 'error': message, 'service_error': True}
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU whose entries expire after a TTL"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RateLimiter:
+    """Token bucket shared by threads: at most `rate` acquisitions per second, bursting to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class USPSClient:
+    """
+    Batched, cached client for the USPS Verify API.
+
+    One instance is shared per app (see get_client); its requests.Session keeps
+    connections to USPS alive across requests and threads.
+    """
+
+    def __init__(self, user_id, url=USPS_API_URL, timeout=5, pool_size=10,
+                 cache_seconds=30 * 86400, lru_size=10000, persistent=True, rate_limiter=None):
+        self.user_id = user_id
+        self.url = url
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self.persistent = persistent
+        self.rate_limiter = rate_limiter
+        self.memory = LRUCache(lru_size)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def validate(self, address, city, state, zip_code):
+        """Validate one address; see validate_many"""
+        return self.validate_many([(address, city, state, zip_code)])[0]
+
+    def validate_many(self, addresses):
+        """
+        Validate addresses, answering from cache where possible.
+
+        Args:
+            addresses: iterable of (address, city, state, zip_code)
+
+        Returns:
+            list: one result dict per input, in order. Successful results carry
+            address, city, state, zip5, zip4 and full_address; failures carry
+            error, plus service_error when USPS could not be reached.
+        """
+        keys = [normalize_address(*a) for a in addresses]
+        results = {}
+        missing = []
+
+        for key in dict.fromkeys(keys):
+            cached = self.memory.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                missing.append(key)
+
+        if missing and self.persistent:
+            for key, result in self._load(missing).items():
+                results[key] = result
+                self.memory.set(key, result, self.cache_seconds)
+            missing = [key for key in missing if key not in results]
+
+        fetched = {}
+        for start in range(0, len(missing), USPS_BATCH_SIZE):
+            fetched.update(self._request(missing[start:start + USPS_BATCH_SIZE]))
+
+        cacheable = {key: result for key, result in fetched.items() if not result.get('service_error')}
+        for key, result in cacheable.items():
+            self.memory.set(key, result, self.cache_seconds)
+        if cacheable and self.persistent:
+            self._store(cacheable)
+
+        results.update(fetched)
+        return [results[key] for key in keys]
+
+    def _request(self, batch):
+        """One Verify call for up to USPS_BATCH_SIZE normalized addresses"""
+        if not self.user_id:
+            return {key: _service_error('USPS API not configured') for key in batch}
+
+        xml_request = build_verify_request(self.user_id, batch)
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        try:
+            with self.session.get(self.url, params={'API': 'Verify', 'XML': xml_request},
+                                  timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                return self._parse_response(response.raw, batch)
+        except requests.exceptions.Timeout:
+            return {key: _service_error('USPS API request timed out') for key in batch}
+        except requests.exceptions.RequestException as e:
+            # Not str(e): the request URL carries the USERID
+            return {key: _service_error(f'USPS API request failed: {type(e).__name__}') for key in batch}
+        except ET.ParseError as e:
+            return {key: _service_error(f'Failed to parse USPS response: {str(e)}') for key in batch}
+
+    def _parse_response(self, stream, batch):
+        results = {key: _service_error('No address data in response') for key in batch}
+        try:
+            for address_id, result in iter_verify_response(stream):
+                try:
+                    results[batch[int(address_id)]] = result
+                except (ValueError, IndexError):
+                    continue
+        except USPSResponseError as e:
+            # A top-level <Error> (bad USERID, malformed request) applies to the whole batch
+            return {key: _service_error(str(e)) for key in batch}
+        return results
+
+    def _load(self, keys):
+        """Unexpired persistent entries for the keys (a failing cache never fails validation)"""
+        from extensions import db
+        from models import AddressCache
+
+        hashed = {cache_key(key): key for key in keys}
+        try:
+            with db.engine.connect() as connection:
+                rows = connection.execute(
+                    select(AddressCache.key, AddressCache.result)
+                    .where(AddressCache.key.in_(hashed), AddressCache.expires_at > datetime.utcnow())
+                ).all()
+        except SQLAlchemyError as e:
+            print(f"⚠️ Address cache read failed: {str(e)}")
+            return {}
+        return {hashed[row.key]: json.loads(row.result) for row in rows}
+
+    def _store(self, results):
+        """Replace the persistent entries for these results on a separate connection"""
+        from extensions import db
+        from models import AddressCache
+
+        now = datetime.utcnow()
+        rows = [{
+            'key': cache_key(key), 'result': json.dumps(result),
+            'expires_at': now + timedelta(seconds=self.cache_seconds), 'created_at': now
+        } for key, result in results.items()]
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(delete(AddressCache).where(AddressCache.key.in_([row['key'] for row in rows])))
+                connection.execute(insert(AddressCache), rows)
+        except SQLAlchemyError as e:
+            # Usually another worker storing the same address first
+            print(f"⚠️ Address cache write failed: {str(e)}")
+
+
+def get_client():
+    """The current app's shared USPSClient, created on first use"""
+    app = current_app._get_current_object()
+    client = app.extensions.get('usps_client')
+    if client is None:
+        client = USPSClient(
+            app.config.get('USPS_USER_ID', ''),
+            url=app.config.get('USPS_API_URL', USPS_API_URL),
+            timeout=app.config.get('USPS_TIMEOUT', 5),
+            pool_size=app.config.get('USPS_POOL_SIZE', 10),
+            cache_seconds=app.config.get('USPS_CACHE_SECONDS', 30 * 86400),
+            lru_size=app.config.get('USPS_LRU_SIZE', 10000)
+        )
+        app.extensions['usps_client'] = client
+    return client
+
 
 def validate_address(address, city, state, zip_code):
     """
     Validate and standardize address using USPS API
-    
+
     Args:
         address: Street address
         city: City name
         state: State abbreviation
         zip_code: ZIP code
-        
+
     Returns:
         dict: Standardized address or error
     """
-    try:
-        # USPS API credentials - will be configured in environment
-        user_id = current_app.config.get('USPS_USER_ID', '')
-        
-        if not user_id:
-            return {
-                'success': False,
-                'error': 'USPS API not configured'
-            }
-        
-        # Build XML request
-        xml_request = f"""
-        <AddressValidateRequest USERID="{user_id}">
-            <Revision>1</Revision>
-            <Address ID="0">
-                <Address1></Address1>
-                <Address2>{address}</Address2>
-                <City>{city}</City>
-                <State>{state}</State>
-                <Zip5>{zip_code}</Zip5>
-                <Zip4></Zip4>
-            </Address>
-        </AddressValidateRequest>
-        """
-        
-        # Make request to USPS API
-        response = requests.get(
-            'https://secure.shippingapis.com/ShippingAPI.dll',
-            params={
-                'API': 'Verify',
-                'XML': xml_request.strip()
-            },
-            timeout=10
-        )
-        
-        # Parse XML response
-        root = ET.fromstring(response.content)
-        
-        # Check for errors
-        error = root.find('.//Error')
-        if error is not None:
-            error_description = error.find('Description')
-            return {
-                'success': False,
-                'error': error_description.text if error_description is not None else 'Unknown error'
-            }
-        
-        # Extract standardized address
-        address_element = root.find('.//Address')
-        if address_element is not None:
-            standardized = {
-                'success': True,
-                'address': address_element.findtext('Address2', ''),
-                'city': address_element.findtext('City', ''),
-                'state': address_element.findtext('State', ''),
-                'zip5': address_element.findtext('Zip5', ''),
-                'zip4': address_element.findtext('Zip4', '')
-            }
-            
-            # Build full formatted address
-            full_address = standardized['address']
-            if standardized['city']:
-                full_address += f", {standardized['city']}"
-            if standardized['state']:
-                full_address += f", {standardized['state']}"
-            if standardized['zip5']:
-                zip_full = standardized['zip5']
-                if standardized['zip4']:
-                    zip_full += f"-{standardized['zip4']}"
-                full_address += f" {zip_full}"
-            
-            standardized['full_address'] = full_address
-            return standardized
-        
-        return {
-            'success': False,
-            'error': 'No address data in response'
-        }
-        
-    except requests.exceptions.Timeout:
-        return {
-            'success': False,
-            'error': 'USPS API request timed out'
-        }
-    except requests.exceptions.RequestException as e:
-        return {
-            'success': False,
-            'error': f'USPS API request failed: {str(e)}'
-        }
-    except ET.ParseError as e:
-        return {
-            'success': False,
-            'error': f'Failed to parse USPS response: {str(e)}'
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': f'Unexpected error: {str(e)}'
-        }
+    return get_client().validate(address, city, state, zip_code)
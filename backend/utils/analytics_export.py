@@ -0,0 +1,237 @@
+"""
+Columnar analytics export.
+Writes donations and transactions as year/month partitioned Parquet datasets
+and a realtor dimension table, so reporting can run on the files instead of
+the production database.
+
+Transactions and donations change after they are inserted (paid, overdue,
+confirmed, rejected), so the fact datasets are partitioned by the
+transaction's period and every partition holding a row changed since the last
+run is rewritten whole. Rewriting is idempotent: a run that fails after
+publishing is simply repeated.
+"""
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, tuple_, union
+from extensions import db
+from models import Realtor, Transaction, Donation, ExportWatermark
+
+CHUNK_SIZE = 50000
+
+FACT_DATASETS = ('donations', 'transactions')
+
+WATERMARK_KEY = 'analytics_export'
+
+# Changes committed while a run is in progress may carry an earlier updated_at
+# than its start; look back this far so the next run still picks them up
+CHANGE_OVERLAP = timedelta(minutes=10)
+
+
+def _arrow():
+    """Import pyarrow lazily so the API starts without it"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('pyarrow is required for analytics exports (pip install pyarrow)')
+    return pyarrow
+
+
+def _fact_tables(pa):
+    """Fact datasets: (source query, schema), both partitioned by the transaction's year and month"""
+    money = pa.decimal128(10, 2)
+    return {
+        'donations': (
+            select(
+                Donation.id, Donation.realtor_id, Donation.transaction_id, Donation.amount,
+                Donation.payment_method, Donation.payment_status, Donation.paid_at,
+                Transaction.year, Transaction.month
+            ).join(Transaction, Transaction.id == Donation.transaction_id)
+            .order_by(Transaction.year, Transaction.month, Donation.id),
+            pa.schema([
+                ('id', pa.int64()), ('realtor_id', pa.int64()), ('transaction_id', pa.int64()),
+                ('amount', money), ('payment_method', pa.string()), ('payment_status', pa.string()),
+                ('paid_at', pa.timestamp('us')), ('year', pa.int16()), ('month', pa.int8()),
+            ]),
+        ),
+        'transactions': (
+            select(
+                Transaction.id, Transaction.realtor_id, Transaction.closed_transactions_count,
+                Transaction.calculated_donation_amount, Transaction.status, Transaction.submitted_at,
+                Transaction.year, Transaction.month
+            ).order_by(Transaction.year, Transaction.month, Transaction.id),
+            pa.schema([
+                ('id', pa.int64()), ('realtor_id', pa.int64()), ('closed_transactions_count', pa.int32()),
+                ('calculated_donation_amount', money), ('status', pa.string()),
+                ('submitted_at', pa.timestamp('us')), ('year', pa.int16()), ('month', pa.int8()),
+            ]),
+        ),
+    }
+
+
+def _changed_periods(since):
+    """(year, month) of every transaction or donation inserted or updated at or after `since`"""
+    return {
+        (year, month)
+        for year, month in db.session.execute(union(
+            select(Transaction.year, Transaction.month).where(Transaction.updated_at >= since),
+            select(Transaction.year, Transaction.month)
+            .join(Donation, Donation.transaction_id == Transaction.id)
+            .where(Donation.updated_at >= since)
+        ))
+    }
+
+
+def _partition_path(base_dir, year, month):
+    return os.path.join(base_dir, f'year={year}', f'month={month}')
+
+
+def _live_periods(output_dir):
+    """(year, month) of every partition already published"""
+    periods = set()
+    for dataset in FACT_DATASETS:
+        dataset_dir = os.path.join(output_dir, dataset)
+        if not os.path.isdir(dataset_dir):
+            continue
+        for year_dir in os.listdir(dataset_dir):
+            for month_dir in os.listdir(os.path.join(dataset_dir, year_dir)):
+                periods.add((int(year_dir.split('=', 1)[1]), int(month_dir.split('=', 1)[1])))
+    return periods
+
+
+def _export_facts(pa, dataset, spec, staging_dir, periods=None):
+    """Write every row of the given periods (all periods when None) to a staging directory; returns rows written"""
+    query, schema = spec
+    if periods is not None:
+        query = query.where(tuple_(Transaction.year, Transaction.month).in_(sorted(periods)))
+
+    result = db.session.execute(query.execution_options(yield_per=CHUNK_SIZE))
+    stats = {'rows': 0}
+    names = [field.name for field in schema]
+
+    def batches():
+        for rows in result.partitions():
+            columns = {name: [row._mapping[name] for row in rows] for name in names}
+            stats['rows'] += len(rows)
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+    # Part names are fixed: each staged partition is complete and replaces the live one
+    pa.dataset.write_dataset(
+        batches(),
+        base_dir=os.path.join(staging_dir, dataset),
+        schema=schema,
+        format='parquet',
+        partitioning=pa.dataset.partitioning(pa.schema([('year', pa.int16()), ('month', pa.int8())]), flavor='hive'),
+        basename_template='part-{i}.parquet',
+        existing_data_behavior='overwrite_or_ignore'
+    )
+
+    return stats['rows']
+
+
+def _export_realtors(pa, output_dir):
+    """Write the realtor dimension as a full snapshot (no contact details or credentials)"""
+    rows = db.session.execute(select(
+        Realtor.id, Realtor.first_name, Realtor.last_name, Realtor.brokerage,
+        Realtor.donation_amount_per_transaction, Realtor.approval_status, Realtor.is_active,
+        Realtor.created_at, Realtor.approved_at
+    ).order_by(Realtor.id)).all()
+
+    schema = pa.schema([
+        ('id', pa.int64()), ('first_name', pa.string()), ('last_name', pa.string()), ('brokerage', pa.string()),
+        ('donation_amount_per_transaction', pa.decimal128(10, 2)), ('approval_status', pa.string()),
+        ('is_active', pa.bool_()), ('created_at', pa.timestamp('us')), ('approved_at', pa.timestamp('us')),
+    ])
+    table = pa.Table.from_pylist([dict(row._mapping) for row in rows], schema=schema)
+
+    realtors_dir = os.path.join(output_dir, 'realtors')
+    os.makedirs(realtors_dir, exist_ok=True)
+    tmp_path = os.path.join(realtors_dir, '.realtors.parquet.tmp')
+    pa.parquet.write_table(table, tmp_path)
+    os.replace(tmp_path, os.path.join(realtors_dir, 'realtors.parquet'))
+    return len(rows)
+
+
+def _publish(staging_dir, output_dir, dataset, periods):
+    """
+    Swap the staged partitions of a dataset into the live directory.
+
+    A period with no staged rows any more (its last row was deleted) has its
+    live partition removed.
+    """
+    replaced_dir = os.path.join(staging_dir, '_replaced', dataset)
+    for year, month in sorted(periods):
+        staged = _partition_path(os.path.join(staging_dir, dataset), year, month)
+        live = _partition_path(os.path.join(output_dir, dataset), year, month)
+        if os.path.isdir(live):
+            old = _partition_path(replaced_dir, year, month)
+            os.makedirs(os.path.dirname(old), exist_ok=True)
+            os.replace(live, old)
+        if os.path.isdir(staged):
+            os.makedirs(os.path.dirname(live), exist_ok=True)
+            os.replace(staged, live)
+
+
+def run_analytics_export(output_dir=None, full=False):
+    """
+    Rewrite the donation and transaction partitions changed since the last run, plus realtors.
+
+    Every partition is staged before any is published, and the watermark is
+    committed after publishing; a failed run rewrites the same partitions
+    again next time. Pass full=True to rewrite every partition, e.g. after
+    realtors (and with them their transactions) were deleted.
+
+    Returns:
+        dict: rows and partitions written per dataset
+    """
+    pa = _arrow()
+    output_dir = output_dir or current_app.config.get('ANALYTICS_EXPORT_DIR', 'analytics')
+    staging_dir = os.path.join(output_dir, '_staging', uuid.uuid4().hex)
+    summary = {}
+
+    try:
+        watermark = db.session.get(ExportWatermark, WATERMARK_KEY)
+        if not watermark:
+            watermark = ExportWatermark(dataset=WATERMARK_KEY, last_id=0, rows_exported=0)
+            db.session.add(watermark)
+            full = True
+
+        started_at = datetime.utcnow()
+        if full:
+            # Every period in the database, plus live partitions whose rows are all gone
+            periods = _live_periods(output_dir) | {
+                (year, month) for year, month in db.session.execute(select(Transaction.year, Transaction.month).distinct())
+            }
+        else:
+            periods = _changed_periods(watermark.exported_at - CHANGE_OVERLAP)
+
+        fact_tables = _fact_tables(pa)
+        for dataset in FACT_DATASETS:
+            rows = 0
+            if periods:
+                rows = _export_facts(pa, dataset, fact_tables[dataset], staging_dir, None if full else periods)
+            summary[dataset] = {'rows': rows, 'partitions': len(periods)}
+
+        for dataset in FACT_DATASETS:
+            _publish(staging_dir, output_dir, dataset, periods)
+
+        summary['realtors'] = {'rows': _export_realtors(pa, output_dir)}
+
+        watermark.rows_exported += sum(summary[dataset]['rows'] for dataset in FACT_DATASETS)
+        watermark.exported_at = started_at
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(staging_dir))
+        except OSError:
+            pass
+
+    return summary
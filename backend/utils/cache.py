@@ -0,0 +1,60 @@
+"""
+In-process TTL cache.
+Used for hot, public read endpoints; each gunicorn worker keeps its own copy.
+"""
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Cache of computed values that expire after a TTL.
+
+    Refreshes are single-flight: when an entry expires, one thread recomputes
+    it while other threads keep getting the stale value instead of piling onto
+    the database. Only when there is no value at all do callers wait.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> (value, expires_at)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get_or_compute(self, key, ttl, compute):
+        """Return the cached value for key, calling compute() if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        lock = self._lock_for(key)
+        if entry is not None:
+            # Someone else is already refreshing; serve the stale value
+            if not lock.acquire(blocking=False):
+                return entry[0]
+        else:
+            lock.acquire()
+
+        try:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+
+            value = compute()
+            self._entries[key] = (value, time.monotonic() + ttl)
+            return value
+        finally:
+            lock.release()
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+cache = TTLCache()
@@ -0,0 +1,114 @@
+"""
+Response compression.
+Compresses JSON, CSV and other text responses with brotli or gzip, whichever
+the client accepts (brotli only when the Brotli package is installed). Small
+bodies are left alone, and streamed responses such as the admin exports are
+compressed chunk by chunk as they are generated.
+"""
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used instead
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Endpoints that serve files which are already compressed (images, PDFs)
+SKIP_ENDPOINTS = ('serve_upload',)
+
+BROTLI_QUALITY = 5
+BROTLI_STREAM_QUALITY = 4
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encodings):
+    """Pick 'br' or 'gzip' from a parsed Accept-Encoding header, or None"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compressor(encoding, level, streaming=False):
+    """Return (compress, flush) callables for the encoding"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_STREAM_QUALITY if streaming else BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    return compressor.compress, compressor.flush
+
+
+def compress_body(data, encoding, level=6):
+    """Compress a complete response body"""
+    compress, flush = _compressor(encoding, level)
+    return compress(data) + flush()
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Compress an iterable of str/bytes chunks lazily"""
+    compress, flush = _compressor(encoding, level, streaming=True)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            compressed = compress(chunk)
+            if compressed:
+                yield compressed
+        yield flush()
+    finally:
+        # Release the wrapped generator (and its DB cursor) if the client disconnects
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_compression(app):
+    """Register the after_request hook that compresses eligible responses"""
+
+    @app.after_request
+    def compress_response(response):
+        min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        level = app.config.get('COMPRESSION_LEVEL', 6)
+
+        if (request.method == 'HEAD'
+                or request.endpoint in SKIP_ENDPOINTS
+                or response.direct_passthrough
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or not _is_compressible(response.mimetype)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_body(data, encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed bytes differ from the original, so a strong ETag no longer holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -0,0 +1,64 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+Lets read endpoints answer 304 Not Modified from a few cheap aggregate queries
+instead of loading and serializing the full response.
+"""
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from flask_jwt_extended import get_jwt_identity
+
+
+def compute_etag(*parts):
+    """Hash version signals into an opaque ETag value"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def conditional(version):
+    """
+    Decorate a JWT-protected GET view with conditional response handling.
+
+    Args:
+        version: Function taking the realtor id and returning (signals, last_modified).
+                 signals must change whenever the response body would; last_modified
+                 is a datetime or None.
+
+    The ETag covers the endpoint, the caller and the query string, so the same
+    signals can be shared by views with different filters.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            identity = get_jwt_identity()
+            try:
+                signals, last_modified = version(int(identity))
+            except Exception as e:
+                # Never fail the request over a version check; just serve the full body
+                print(f"Conditional version check failed for {request.endpoint}: {e}")
+                return view(*args, **kwargs)
+
+            etag = compute_etag(request.endpoint, identity, sorted(request.args.items(multi=True)), signals)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since and last_modified:
+                not_modified = last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+            else:
+                not_modified = False
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Authorization')
+            return response
+        return wrapper
+    return decorator
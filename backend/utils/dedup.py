@@ -0,0 +1,239 @@
+"""
+Duplicate grant application detection.
+Each application gets a few normalized fingerprints (name + birthday, email,
+phone, surname + address) stored in the indexed application_fingerprints
+table. A new submission is flagged with one indexed lookup of its own
+fingerprints; historical data is clustered by grouping rows that share a
+fingerprint (blocking), never by comparing applications pairwise.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import func, insert, select, update
+from extensions import db
+from models import GrantApplication, ApplicationFingerprint
+
+# Fingerprints shared by more applications than this are placeholders
+# (a shelter's phone number, 'none@none.com') and never count as evidence
+MAX_BLOCK_SIZE = 25
+
+CHUNK_SIZE = 5000
+
+_STREET_WORDS = {
+    'street': 'st', 'avenue': 'ave', 'boulevard': 'blvd', 'drive': 'dr', 'road': 'rd', 'lane': 'ln',
+    'court': 'ct', 'place': 'pl', 'terrace': 'ter', 'highway': 'hwy', 'parkway': 'pkwy', 'circle': 'cir',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w', 'apartment': 'apt', 'unit': 'apt', 'suite': 'ste',
+}
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def _ascii_lower(value):
+    """Lower-case and strip accents ('José' -> 'jose')"""
+    decomposed = unicodedata.normalize('NFKD', str(value or ''))
+    return decomposed.encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def normalize_name(value):
+    return re.sub(r'[^a-z]', '', _ascii_lower(value))
+
+
+def normalize_email(value):
+    """Case-folded, without +tags, and without dots for Gmail"""
+    local, _, domain = _ascii_lower(value).strip().partition('@')
+    if not domain:
+        return ''
+    local = local.split('+', 1)[0]
+    if domain in ('gmail.com', 'googlemail.com'):
+        local, domain = local.replace('.', ''), 'gmail.com'
+    return f'{local}@{domain}'
+
+
+def normalize_phone(value):
+    """Last ten digits (drops a leading country code)"""
+    digits = re.sub(r'\D', '', str(value or ''))
+    return digits[-10:] if len(digits) >= 10 else ''
+
+
+def normalize_street_address(value):
+    """Free-text address as lower-case tokens with common street words abbreviated"""
+    words = _NON_ALNUM.sub(' ', _ascii_lower(value).replace('#', ' apt ')).split()
+    return ' '.join(_STREET_WORDS.get(word, word) for word in words)
+
+
+def fingerprints(first_name, last_name, birthday, email, phone, address):
+    """
+    Fingerprints of one applicant.
+
+    Returns:
+        list: (kind, sha256 hex) pairs; kinds with missing inputs are left out
+    """
+    first, last = normalize_name(first_name), normalize_name(last_name)
+    values = {
+        'identity': f'{first}|{last}|{birthday.isoformat()}' if first and last and birthday else '',
+        'email': normalize_email(email),
+        'phone': normalize_phone(phone),
+        'household': f'{last}|{normalize_street_address(address)}' if last and address else '',
+    }
+    return [
+        (kind, hashlib.sha256(f'{kind}:{value}'.encode('utf-8')).hexdigest())
+        for kind, value in values.items() if value
+    ]
+
+
+def application_fingerprints(application):
+    """Fingerprints of a GrantApplication (or row with the same attribute names)"""
+    return fingerprints(
+        application.applicant_first_name, application.applicant_last_name, application.applicant_birthday,
+        application.applicant_email, application.applicant_phone, application.applicant_address
+    )
+
+
+def flag_duplicate(application):
+    """
+    Record the application's fingerprints and flag it if an earlier application shares one.
+
+    One indexed IN lookup, independent of how many applications exist. Call
+    after the application has been flushed (it needs an id); the caller commits.
+
+    Returns:
+        int: id of the earliest matching application, or None
+    """
+    prints = application_fingerprints(application)
+    if not prints:
+        return None
+
+    matches = db.session.execute(
+        select(ApplicationFingerprint.kind, func.min(ApplicationFingerprint.application_id), func.count())
+        .where(ApplicationFingerprint.fingerprint.in_([fingerprint for _, fingerprint in prints]),
+               ApplicationFingerprint.application_id != application.id)
+        .group_by(ApplicationFingerprint.kind, ApplicationFingerprint.fingerprint)
+    ).all()
+
+    db.session.execute(insert(ApplicationFingerprint), [
+        {'application_id': application.id, 'kind': kind, 'fingerprint': fingerprint}
+        for kind, fingerprint in prints
+    ])
+
+    evidence = [(kind, first_id) for kind, first_id, count in matches if count < MAX_BLOCK_SIZE]
+    if not evidence:
+        return None
+
+    application.duplicate_of_id = min(first_id for _, first_id in evidence)
+    application.duplicate_reasons = ','.join(sorted({kind for kind, _ in evidence}))
+    return application.duplicate_of_id
+
+
+def backfill_fingerprints():
+    """
+    Fingerprint applications that have none yet, in id-ordered chunks.
+
+    Returns:
+        int: Applications fingerprinted
+    """
+    fingerprinted = select(ApplicationFingerprint.application_id).distinct()
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(GrantApplication.id, GrantApplication.applicant_first_name, GrantApplication.applicant_last_name,
+                   GrantApplication.applicant_birthday, GrantApplication.applicant_email,
+                   GrantApplication.applicant_phone, GrantApplication.applicant_address)
+            .where(GrantApplication.id > last_id, GrantApplication.id.not_in(fingerprinted))
+            .order_by(GrantApplication.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return total
+
+        new_rows = [
+            {'application_id': row.id, 'kind': kind, 'fingerprint': fingerprint}
+            for row in rows for kind, fingerprint in application_fingerprints(row)
+        ]
+        if new_rows:
+            db.session.execute(insert(ApplicationFingerprint), new_rows)
+        db.session.commit()
+        last_id = rows[-1].id
+        total += len(rows)
+
+
+def cluster_duplicates():
+    """
+    Group every application into duplicate clusters and flag all but the earliest.
+
+    Fingerprints are read sorted, so each block (applications sharing one
+    fingerprint) is contiguous; blocks are merged with union-find. Work is
+    proportional to the number of fingerprints, not to pairs of applications.
+    Blocks larger than MAX_BLOCK_SIZE are skipped as placeholder values.
+
+    Returns:
+        dict: applications fingerprinted, clusters, flagged applications and skipped blocks
+    """
+    backfilled = backfill_fingerprints()
+
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node != root:
+            parent[node], node = root, parent.get(node, node)
+        return root
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            # The smaller id is always the root, so it ends up as the cluster's original
+            parent[max(a, b)] = min(a, b)
+
+    reasons = defaultdict(set)
+    skipped_blocks = 0
+
+    def close_block(kind, members):
+        nonlocal skipped_blocks
+        if len(members) < 2:
+            return
+        if len(members) > MAX_BLOCK_SIZE:
+            skipped_blocks += 1
+            return
+        for member in members:
+            union(members[0], member)
+            reasons[member].add(kind)
+
+    result = db.session.execute(
+        select(ApplicationFingerprint.fingerprint, ApplicationFingerprint.kind, ApplicationFingerprint.application_id)
+        .order_by(ApplicationFingerprint.fingerprint, ApplicationFingerprint.application_id)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    current, kind, members = None, None, []
+    for fingerprint, row_kind, application_id in result:
+        if fingerprint != current:
+            close_block(kind, members)
+            current, kind, members = fingerprint, row_kind, []
+        members.append(application_id)
+    close_block(kind, members)
+
+    # Clear earlier flags, then flag every non-root member of each cluster
+    db.session.execute(
+        update(GrantApplication).where(GrantApplication.duplicate_of_id.is_not(None))
+        .values(duplicate_of_id=None, duplicate_reasons=None)
+        .execution_options(synchronize_session=False)
+    )
+    updates = []
+    for application_id in reasons:
+        root = find(application_id)
+        if root != application_id:
+            updates.append({
+                'id': application_id, 'duplicate_of_id': root,
+                'duplicate_reasons': ','.join(sorted(reasons[application_id]))
+            })
+    for start in range(0, len(updates), CHUNK_SIZE):
+        db.session.execute(update(GrantApplication), updates[start:start + CHUNK_SIZE])
+    db.session.commit()
+
+    return {
+        'fingerprinted': backfilled,
+        'clusters': len({update_row['duplicate_of_id'] for update_row in updates}),
+        'flagged': len(updates),
+        'skipped_blocks': skipped_blocks,
+    }
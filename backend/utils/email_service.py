@@ -420,3 +420,88 @@ def send_admin_notification_new_realtor(realtor):
             success = False
     
     return success
+
+
+
+
+def send_monthly_transaction_reminder(realtor, month, year, report_url):
+    """
+    Send monthly reminder to realtor to report transactions and make payment.
+    """
+    subject = f"Time to Report Your {month} {year} Transactions"
+    
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background-color: #00305B; color: white; padding: 30px; text-align: center; }}
+            .content {{ padding: 30px; background-color: #f9f9f9; }}
+            .highlight-box {{
+                background-color: #fff;
+                border-left: 4px solid #FEBC42;
+                padding: 20px;
+                margin: 20px 0;
+            }}
+            .button {{ 
+                display: inline-block; 
+                padding: 15px 40px; 
+                background-color: #FEBC42; 
+                color: #00305B; 
+                text-decoration: none; 
+                border-radius: 5px;
+                font-weight: bold;
+                margin: 20px 0;
+                font-size: 16px;
+            }}
+            .footer {{ padding: 20px; text-align: center; color: #666; font-size: 12px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>Monthly Transaction Report</h1>
+            </div>
+            <div class="content">
+                <h2>Hi {realtor.first_name},</h2>
+                <p>It's time to report your closed transactions for <strong>{month} {year}</strong> and submit your monthly donation.</p>
+                
+                <div class="highlight-box">
+                    <h3>Your Pledge</h3>
+                    <p style="font-size: 18px; margin: 0;">
+                        <strong>${realtor.donation_amount_per_transaction:.2f}</strong> per closed transaction
+                    </p>
+                </div>
+                
+                <p><strong>What you need to do:</strong></p>
+                <ol>
+                    <li>Click the button below to access your transaction report form</li>
+                    <li>Enter the number of transactions you closed in {month}</li>
+                    <li>Review the calculated donation amount</li>
+                    <li>Submit your payment securely online</li>
+                </ol>
+                
+                <center>
+                    <a href="{report_url}" class="button">
+                        Report Transactions & Pay
+                    </a>
+                </center>
+                
+                <p style="margin-top: 30px;">Your contributions make homeownership dreams come true for deserving families in our community. Thank you for your continued support!</p>
+                
+                <p style="font-size: 12px; color: #666; margin-top: 30px;">
+                    Questions? Contact us at info@localsupportslocal.org
+                </p>
+            </div>
+            <div class="footer">
+                <p>&copy; 2025 Local Supports Local Foundation. All rights reserved.</p>
+                <p>You're receiving this email because you're a member of our realtor donation program.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    
+    return send_email(realtor.email, subject, html_content)
@@ -0,0 +1,287 @@
+"""
+Streaming CSV/XLSX exports for the admin dashboard.
+Rows are read with a server-side cursor (yield_per) and written out chunk by
+chunk, so memory stays flat no matter how large the table is.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+from sqlalchemy import select
+from extensions import db
+from models import Realtor, Transaction, Donation, GrantApplication
+
+YIELD_PER = 1000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _donation_columns():
+    return [
+        ('id', Donation.id),
+        ('paid_at', Donation.paid_at),
+        ('realtor_id', Donation.realtor_id),
+        ('realtor_first_name', Realtor.first_name),
+        ('realtor_last_name', Realtor.last_name),
+        ('realtor_email', Realtor.email),
+        ('brokerage', Realtor.brokerage),
+        ('transaction_id', Donation.transaction_id),
+        ('month', Transaction.month),
+        ('year', Transaction.year),
+        ('amount', Donation.amount),
+        ('payment_method', Donation.payment_method),
+        ('payment_reference', Donation.payment_reference),
+        ('payment_status', Donation.payment_status),
+    ]
+
+
+def _transaction_columns():
+    return [
+        ('id', Transaction.id),
+        ('realtor_id', Transaction.realtor_id),
+        ('realtor_first_name', Realtor.first_name),
+        ('realtor_last_name', Realtor.last_name),
+        ('realtor_email', Realtor.email),
+        ('brokerage', Realtor.brokerage),
+        ('month', Transaction.month),
+        ('year', Transaction.year),
+        ('closed_transactions_count', Transaction.closed_transactions_count),
+        ('calculated_donation_amount', Transaction.calculated_donation_amount),
+        ('status', Transaction.status),
+        ('submitted_at', Transaction.submitted_at),
+    ]
+
+
+def _application_columns():
+    return [
+        ('id', GrantApplication.id),
+        ('created_at', GrantApplication.created_at),
+        ('application_type', GrantApplication.application_type),
+        ('status', GrantApplication.status),
+        ('applicant_first_name', GrantApplication.applicant_first_name),
+        ('applicant_last_name', GrantApplication.applicant_last_name),
+        ('applicant_email', GrantApplication.applicant_email),
+        ('applicant_phone', GrantApplication.applicant_phone),
+        ('applicant_address', GrantApplication.applicant_address),
+        ('applicant_birthday', GrantApplication.applicant_birthday),
+        ('submitter_first_name', GrantApplication.submitter_first_name),
+        ('submitter_last_name', GrantApplication.submitter_last_name),
+        ('submitter_email', GrantApplication.submitter_email),
+        ('submitter_relationship', GrantApplication.submitter_relationship),
+        ('reviewed_at', GrantApplication.reviewed_at),
+    ]
+
+
+# dataset -> (columns, joins, date column for start/end, status column, ordering column)
+EXPORT_DATASETS = {
+    'donations': (
+        _donation_columns,
+        lambda q: q.join(Realtor, Realtor.id == Donation.realtor_id).join(Transaction, Transaction.id == Donation.transaction_id),
+        lambda: Donation.paid_at,
+        lambda: Donation.payment_status,
+        lambda: Donation.id,
+    ),
+    'transactions': (
+        _transaction_columns,
+        lambda q: q.join(Realtor, Realtor.id == Transaction.realtor_id),
+        lambda: Transaction.submitted_at,
+        lambda: Transaction.status,
+        lambda: Transaction.id,
+    ),
+    'applications': (
+        _application_columns,
+        lambda q: q,
+        lambda: GrantApplication.created_at,
+        lambda: GrantApplication.status,
+        lambda: GrantApplication.id,
+    ),
+}
+
+
+def parse_export_filters(args):
+    """
+    Read start/end (YYYY-MM-DD, inclusive) and status from request args.
+
+    Raises:
+        ValueError: if a date is malformed
+    """
+    filters = {'status': args.get('status') or None, 'start': None, 'end': None}
+    for key in ('start', 'end'):
+        value = args.get(key)
+        if value:
+            try:
+                filters[key] = datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError(f'Invalid {key} date. Use YYYY-MM-DD')
+    return filters
+
+
+def build_export_query(dataset, start=None, end=None, status=None):
+    """Build the SELECT for a dataset, returning (headers, statement)"""
+    columns, joins, date_column, status_column, id_column = EXPORT_DATASETS[dataset]
+    columns = columns()
+
+    statement = joins(select(*[column for _, column in columns]))
+
+    if start:
+        statement = statement.where(date_column() >= start)
+    if end:
+        statement = statement.where(date_column() < end + timedelta(days=1))
+    if status:
+        statement = statement.where(status_column() == status)
+
+    statement = statement.order_by(id_column()).execution_options(yield_per=YIELD_PER)
+    return [name for name, _ in columns], statement
+
+
+def _iter_row_chunks(statement):
+    """Yield lists of rows from a server-side cursor"""
+    result = db.session.execute(statement)
+    for partition in result.partitions():
+        yield partition
+
+
+def _format_csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(headers, statement):
+    """Generate CSV text, one chunk per fetched partition"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    for rows in _iter_row_chunks(statement):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_format_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+
+
+class _ZipStream:
+    """Write-only, unseekable file object that zipfile writes into and the generator drains"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+# Control characters are not allowed in XML 1.0
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    text = _XML_ILLEGAL.sub('', escape(str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(v) for v in values) + '</row>'
+
+
+def stream_xlsx(headers, statement, sheet_name='Export'):
+    """
+    Generate an XLSX workbook incrementally.
+
+    The worksheet is written as inline-string rows into a zip entry on an
+    unseekable stream (zipfile then uses data descriptors), so each fetched
+    partition is compressed and sent without building the workbook in memory.
+    """
+    stream = _ZipStream()
+
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(sheet_name=escape(sheet_name)))
+        workbook.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_XLSX_SHEET_START + _xlsx_row(headers)).encode('utf-8'))
+
+            for rows in _iter_row_chunks(statement):
+                sheet.write(''.join(_xlsx_row(row) for row in rows).encode('utf-8'))
+                chunk = stream.drain()
+                if chunk:
+                    yield chunk
+
+            sheet.write(_XLSX_SHEET_END.encode('utf-8'))
+
+    yield stream.drain()
+
+
+def stream_export(dataset, export_format, **filters):
+    """Return a generator producing the export file for a dataset"""
+    headers, statement = build_export_query(dataset, **filters)
+    if export_format == 'xlsx':
+        return stream_xlsx(headers, statement, sheet_name=dataset.title())
+    return stream_csv(headers, statement)
@@ -0,0 +1,156 @@
+"""
+Idempotency-Key support for POST endpoints.
+When a client repeats a request with the same Idempotency-Key header (a
+double-click, a retry after a dropped mobile connection), the original
+response is replayed instead of running the writes and emails again.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint():
+    """Hash of the method, path and body; a reused key must come with the same request"""
+    body = request.get_json(silent=True)
+    if body is not None:
+        payload = json.dumps(body, sort_keys=True, separators=(',', ':'))
+    else:
+        payload = request.get_data(as_text=True)
+    return hashlib.sha256(f'{request.method} {request.path}\n{payload}'.encode('utf-8')).hexdigest()
+
+
+def _caller():
+    """JWT identity when the request carries a valid token, else 'anonymous'"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() or 'anonymous'
+    except Exception:
+        return 'anonymous'
+
+
+def _claim(key, fingerprint):
+    """
+    Reserve the key for this request.
+
+    Runs on its own connection and commits immediately, so concurrent retries
+    on other workers see the reservation while the view is still running.
+
+    Returns:
+        Row of the existing entry, or None if this request now owns the key
+    """
+    now = datetime.utcnow()
+    values = {
+        'key': key,
+        'request_fingerprint': fingerprint,
+        'status': 'in_progress',
+        'response_status': None,
+        'response_body': None,
+        'response_mimetype': None,
+        'locked_until': now + timedelta(seconds=current_app.config.get('IDEMPOTENCY_LOCK_SECONDS', 60)),
+        'created_at': now,
+        'expires_at': now + timedelta(seconds=current_app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+    }
+
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(IdempotencyKey).values(**values))
+        return None
+    except IntegrityError:
+        pass
+
+    with db.engine.begin() as connection:
+        # Take over an expired entry, or the same request abandoned mid-flight (worker killed)
+        taken = connection.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(IdempotencyKey.status == 'in_progress', IdempotencyKey.locked_until <= now,
+                         IdempotencyKey.request_fingerprint == fingerprint)
+                )
+            )
+            .values(**values)
+        ).rowcount
+        if taken:
+            return None
+        return connection.execute(select(IdempotencyKey.__table__).where(IdempotencyKey.key == key)).first()
+
+
+def _complete(key, response):
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status='completed', response_status=response.status_code,
+                    response_body=response.get_data(as_text=True), response_mimetype=response.mimetype)
+        )
+
+
+def _release(key):
+    with db.engine.begin() as connection:
+        connection.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+
+
+def idempotent(view):
+    """
+    Make a POST view safe to retry with an Idempotency-Key header.
+
+    Without the header the view runs as usual. With it, the first request runs
+    the view and stores its response for IDEMPOTENCY_TTL_SECONDS; repeats with
+    the same key and body get that response back (marked Idempotent-Replayed),
+    a repeat while the first is still running gets 409, and reusing the key
+    for a different body gets 422. Server errors are not stored, so they can
+    be retried. Keys are scoped to the endpoint and the authenticated caller.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        client_key = request.headers.get(HEADER)
+        if not client_key:
+            return view(*args, **kwargs)
+
+        if len(client_key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        key = hashlib.sha256(f'{request.endpoint}|{_caller()}|{client_key}'.encode('utf-8')).hexdigest()
+        fingerprint = request_fingerprint()
+
+        existing = _claim(key, fingerprint)
+        if existing is not None:
+            if existing.request_fingerprint != fingerprint:
+                return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+
+            if existing.status == 'in_progress':
+                response = jsonify({'error': f'A request with this {HEADER} is still being processed'})
+                response.status_code = 409
+                response.headers['Retry-After'] = '1'
+                return response
+
+            response = current_app.response_class(existing.response_body, status=existing.response_status,
+                                                  mimetype=existing.response_mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            _release(key)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            _release(key)
+        else:
+            _complete(key, response)
+        return response
+    return wrapper
@@ -0,0 +1,58 @@
+"""
+Fast JSON provider.
+Encodes responses with orjson when it is installed and falls back to the
+standard library otherwise. Either way datetimes are written as ISO 8601 and
+Decimals as numbers, matching what the models' to_dict() methods produce, so
+views can hand over column values without converting them first.
+"""
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+
+def _default(o):
+    """Types neither encoder handles natively"""
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, date):
+        # Only reached on the stdlib path; orjson encodes dates itself
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's provider (install with app.json = FastJSONProvider(app))"""
+
+    default = staticmethod(_default)
+
+    def _options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
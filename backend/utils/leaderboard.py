@@ -0,0 +1,193 @@
+"""
+Realtor donation leaderboards.
+Keeps ranked standings for the month, quarter and year in memory so top-N and
+"my rank" lookups are O(log n) instead of sorting every realtor's donation
+total per request.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+from flask import current_app
+from sortedcontainers import SortedList
+from extensions import db
+from models import Donation
+from utils.periods import get_period_display
+
+PERIODS = ('month', 'quarter', 'year')
+
+MAX_BOARDS = 24
+
+
+def get_period_bounds(period, year, month):
+    """
+    Return (key, label, start, end) for the period containing year/month.
+    end is exclusive.
+    """
+    if period == 'year':
+        return f'{year}', f'{year}', datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+    if period == 'quarter':
+        quarter = (month - 1) // 3 + 1
+        first_month = (quarter - 1) * 3 + 1
+        start = datetime(year, first_month, 1)
+        end = datetime(year + 1, 1, 1) if quarter == 4 else datetime(year, first_month + 3, 1)
+        return f'{year}-Q{quarter}', f'Q{quarter} {year}', start, end
+
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return f'{year}-{month:02d}', get_period_display(month, year), start, end
+
+
+class Leaderboard:
+    """Ranked donation totals for one period"""
+
+    def __init__(self, period, key, label, start, end):
+        self.period = period
+        self.key = key
+        self.label = label
+        self.start = start
+        self.end = end
+        self.totals = {}  # realtor_id -> Decimal
+        self.standings = SortedList()  # (-total, realtor_id)
+        self.built_at = 0
+
+    def load(self, through_id):
+        """Rebuild from donations with id <= through_id (one GROUP BY)"""
+        rows = db.session.query(Donation.realtor_id, db.func.sum(Donation.amount))\
+            .filter(
+                Donation.payment_status == 'completed',
+                Donation.paid_at >= self.start,
+                Donation.paid_at < self.end,
+                Donation.id <= through_id
+            )\
+            .group_by(Donation.realtor_id)\
+            .all()
+
+        self.totals = {realtor_id: Decimal(total or 0) for realtor_id, total in rows}
+        self.standings = SortedList((-total, realtor_id) for realtor_id, total in self.totals.items())
+        self.built_at = time.monotonic()
+
+    def covers(self, paid_at):
+        return self.start <= paid_at < self.end
+
+    def add(self, realtor_id, amount):
+        """Add a donation to a realtor's total and move them in the standings"""
+        total = self.totals.get(realtor_id)
+        if total is not None:
+            self.standings.remove((-total, realtor_id))
+        total = (total or Decimal('0')) + Decimal(amount)
+        self.totals[realtor_id] = total
+        self.standings.add((-total, realtor_id))
+
+    def top(self, limit):
+        """Return [(rank, realtor_id, total)] for the first `limit` standings"""
+        leaders = []
+        for index, (negative_total, realtor_id) in enumerate(islice(self.standings, limit)):
+            # Realtors with equal totals share a rank
+            if leaders and leaders[-1][2] == -negative_total:
+                rank = leaders[-1][0]
+            else:
+                rank = index + 1
+            leaders.append((rank, realtor_id, -negative_total))
+        return leaders
+
+    def rank_of(self, realtor_id):
+        """Return (rank, total) for a realtor, or None if they have not donated this period"""
+        total = self.totals.get(realtor_id)
+        if total is None:
+            return None
+        # (-total,) sorts before every (-total, id), so this counts strictly larger totals
+        return self.standings.bisect_left((-total,)) + 1, total
+
+    def __len__(self):
+        return len(self.standings)
+
+
+class LeaderboardRegistry:
+    """
+    Leaderboards for the periods that have been requested, kept current
+    incrementally.
+
+    Every board reflects donations up to a shared id watermark. sync() reads only
+    donations past the watermark and adds them to the boards whose period they
+    fall in, so a payment recorded by another worker is picked up on the next
+    read. Boards are also rebuilt from scratch every LEADERBOARD_REBUILD_SECONDS
+    to account for deleted realtors/donations.
+    """
+
+    def __init__(self):
+        self._boards = OrderedDict()
+        self._last_id = None
+        self._lock = threading.RLock()
+
+    def _sync(self):
+        if self._last_id is None:
+            self._last_id = db.session.query(db.func.coalesce(db.func.max(Donation.id), 0)).scalar()
+            return
+
+        new_donations = db.session.query(
+            Donation.id, Donation.realtor_id, Donation.amount, Donation.paid_at, Donation.payment_status
+        ).filter(Donation.id > self._last_id).order_by(Donation.id).all()
+
+        for donation_id, realtor_id, amount, paid_at, status in new_donations:
+            if status == 'completed':
+                for board in self._boards.values():
+                    if board.covers(paid_at):
+                        board.add(realtor_id, amount)
+            self._last_id = donation_id
+
+    def sync(self):
+        """Apply donations recorded since the last sync (call after committing a payment)"""
+        with self._lock:
+            self._sync()
+
+    def _board(self, period, year, month):
+        key, label, start, end = get_period_bounds(period, year, month)
+        max_age = current_app.config.get('LEADERBOARD_REBUILD_SECONDS', 3600)
+
+        board = self._boards.get((period, key))
+        if board is None:
+            board = Leaderboard(period, key, label, start, end)
+            self._boards[(period, key)] = board
+            while len(self._boards) > MAX_BOARDS:
+                self._boards.popitem(last=False)
+        else:
+            self._boards.move_to_end((period, key))
+
+        if not board.built_at or time.monotonic() - board.built_at > max_age:
+            board.load(self._last_id)
+
+        return board
+
+    def standings(self, period, year, month, limit=10, realtor_id=None):
+        """
+        Read the leaderboard for the period containing year/month.
+
+        Returns:
+            dict: period info, participant count, top `limit` as
+                  [(rank, realtor_id, total)] and (rank, total) for realtor_id
+        """
+        with self._lock:
+            self._sync()
+            board = self._board(period, year, month)
+            return {
+                'period': period,
+                'key': board.key,
+                'label': board.label,
+                'start': board.start,
+                'end': board.end,
+                'participants': len(board),
+                'leaders': board.top(limit),
+                'me': board.rank_of(realtor_id) if realtor_id is not None else None
+            }
+
+    def reset(self):
+        """Drop every board (they are rebuilt on next read)"""
+        with self._lock:
+            self._boards.clear()
+
+
+leaderboards = LeaderboardRegistry()
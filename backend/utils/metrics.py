@@ -0,0 +1,193 @@
+"""
+Request and database instrumentation.
+Records per-endpoint latency histograms, request counts, DB time and query
+counts, and keeps samples of slow SQL statements. Exposed in Prometheus text
+format at /metrics and per response as a Server-Timing header.
+
+Metrics live in process memory, so under gunicorn each worker reports its own
+series (labelled with its pid).
+"""
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SLOW_QUERY_SAMPLES = 100
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+            self.latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))  # (endpoint, method) -> counts
+            self.latency_sum = defaultdict(float)
+            self.latency_count = defaultdict(int)
+            self.db_seconds = defaultdict(float)  # endpoint -> seconds
+            self.db_queries = defaultdict(int)  # endpoint -> queries
+            self.slow_query_count = defaultdict(int)  # endpoint -> slow queries
+            self.slow_samples = deque(maxlen=SLOW_QUERY_SAMPLES)
+
+    def observe_request(self, endpoint, method, status, seconds, db_seconds, queries):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            key = (endpoint, method)
+            buckets = self.latency_buckets[key]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[index] += 1
+            self.latency_sum[key] += seconds
+            self.latency_count[key] += 1
+            self.db_seconds[endpoint] += db_seconds
+            self.db_queries[endpoint] += queries
+
+    def observe_slow_query(self, endpoint, statement, seconds):
+        with self._lock:
+            self.slow_query_count[endpoint] += 1
+            self.slow_samples.append({
+                'endpoint': endpoint,
+                'statement': statement,
+                'duration_ms': round(seconds * 1000, 2),
+                'recorded_at': datetime.utcnow().isoformat()
+            })
+
+    def slow_queries(self):
+        """Most recent slow statements, newest first (SQL only, never parameters)"""
+        with self._lock:
+            return list(reversed(self.slow_samples))
+
+    def render_prometheus(self):
+        """Render every series in the Prometheus text exposition format"""
+        pid = os.getpid()
+        lines = []
+
+        def label(**labels):
+            labels['pid'] = pid
+            return ','.join(f'{k}="{str(v)}"' for k, v in labels.items())
+
+        with self._lock:
+            lines.append('# HELP http_requests_total Requests handled, by endpoint, method and status.')
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{label(endpoint=endpoint, method=method, status=status)}}} {count}')
+
+            lines.append('# HELP http_request_duration_seconds Request latency.')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for (endpoint, method), buckets in sorted(self.latency_buckets.items()):
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{label(endpoint=endpoint, method=method, le=bound)}}} {count}')
+                total = self.latency_count[(endpoint, method)]
+                lines.append(f'http_request_duration_seconds_bucket{{{label(endpoint=endpoint, method=method, le="+Inf")}}} {total}')
+                lines.append(f'http_request_duration_seconds_sum{{{label(endpoint=endpoint, method=method)}}} {self.latency_sum[(endpoint, method)]:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{label(endpoint=endpoint, method=method)}}} {total}')
+
+            lines.append('# HELP db_query_duration_seconds_total Time spent executing SQL, by endpoint.')
+            lines.append('# TYPE db_query_duration_seconds_total counter')
+            for endpoint, seconds in sorted(self.db_seconds.items()):
+                lines.append(f'db_query_duration_seconds_total{{{label(endpoint=endpoint)}}} {seconds:.6f}')
+
+            lines.append('# HELP db_queries_total SQL statements executed, by endpoint.')
+            lines.append('# TYPE db_queries_total counter')
+            for endpoint, count in sorted(self.db_queries.items()):
+                lines.append(f'db_queries_total{{{label(endpoint=endpoint)}}} {count}')
+
+            lines.append('# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS, by endpoint.')
+            lines.append('# TYPE db_slow_queries_total counter')
+            for endpoint, count in sorted(self.slow_query_count.items()):
+                lines.append(f'db_slow_queries_total{{{label(endpoint=endpoint)}}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+def _endpoint_name():
+    return request.endpoint or 'unmatched'
+
+
+_sql_events = {'registered': False, 'slow_seconds': 0.2}
+
+
+def _register_sql_events(app):
+    """Time every cursor execution; attribute it to the current request if there is one"""
+    _sql_events['slow_seconds'] = app.config.get('SLOW_QUERY_MS', 200) / 1000
+    if _sql_events['registered']:
+        return
+    _sql_events['registered'] = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        endpoint = 'background'
+
+        if has_request_context() and hasattr(g, 'metrics_db_seconds'):
+            g.metrics_db_seconds += elapsed
+            g.metrics_queries += 1
+            endpoint = _endpoint_name()
+
+        if elapsed >= _sql_events['slow_seconds']:
+            metrics.observe_slow_query(endpoint, statement, elapsed)
+            print(f"🐢 Slow query ({elapsed * 1000:.0f} ms) in {endpoint}: {' '.join(statement.split())[:300]}")
+
+
+def init_metrics(app):
+    """Hook request timing, SQL events, Server-Timing and the /metrics endpoint into the app"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    _register_sql_events(app)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_db_seconds = 0.0
+        g.metrics_queries = 0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_start', None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        db_seconds = g.get('metrics_db_seconds', 0.0)
+        queries = g.get('metrics_queries', 0)
+
+        if request.endpoint != 'metrics':
+            metrics.observe_request(_endpoint_name(), request.method, response.status_code,
+                                    elapsed, db_seconds, queries)
+
+        if app.config.get('SERVER_TIMING_ENABLED', False):
+            response.headers.add('Server-Timing', f'db;dur={db_seconds * 1000:.1f};desc="{queries} queries"')
+            response.headers.add('Server-Timing', f'app;dur={(elapsed - db_seconds) * 1000:.1f}')
+            response.headers.add('Server-Timing', f'total;dur={elapsed * 1000:.1f}')
+
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Prometheus scrape endpoint (Bearer METRICS_TOKEN; hidden without one unless METRICS_PUBLIC)"""
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            if not app.config.get('METRICS_PUBLIC', False):
+                return Response('Not Found\n', status=404, mimetype='text/plain')
+        elif request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+        return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,119 @@
+"""
+N+1 query detection for development and testing.
+Counts SELECT statements by shape within each request and logs (or raises)
+with the application stack trace when the same shape repeats too often,
+which is the signature of a lazy load inside a loop.
+"""
+import os
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_state = {'registered': False, 'mode': None, 'threshold': 5, 'root': ''}
+
+# Bound parameters: ? (SQLite), %(name)s and %s (psycopg2)
+_PARAMETER = re.compile(r'\?|%\(\w+\)s|%s')
+# Expanded IN lists: (?, ?, ?) -> (?)
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """Raised in 'raise' mode when a statement repeats past the threshold"""
+
+
+def statement_shape(statement):
+    """Normalize a SQL statement so executions that differ only in parameters compare equal"""
+    shape = _PARAMETER.sub('?', statement)
+    shape = _PARAMETER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _application_stack():
+    """Format the stack frames that belong to this app (not Flask/SQLAlchemy/this module)"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(_state['root'])
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('nplusone.py')
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+def _report(shape, count):
+    message = (f"Possible N+1 in {request.endpoint}: statement ran {count} times\n"
+               f"  {shape[:300]}\n{_application_stack()}")
+    if _state['mode'] == 'raise':
+        raise NPlusOneError(message)
+    print(f"⚠️ {message}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or not hasattr(g, 'nplusone_counts'):
+        return
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return
+
+    shape = statement_shape(statement)
+    g.nplusone_counts[shape] += 1
+    count = g.nplusone_counts[shape]
+
+    # Report once per shape per request
+    if count == _state['threshold']:
+        _report(shape, count)
+
+
+def init_nplusone(app):
+    """
+    Enable detection when NPLUSONE_MODE is 'log' or 'raise'.
+
+    NPLUSONE_THRESHOLD sets how many executions of one SELECT shape in a single
+    request count as an N+1.
+    """
+    mode = app.config.get('NPLUSONE_MODE')
+    if mode not in ('log', 'raise'):
+        return
+
+    _state['mode'] = mode
+    _state['threshold'] = app.config.get('NPLUSONE_THRESHOLD', 5)
+    _state['root'] = os.path.abspath(app.root_path)
+
+    if not _state['registered']:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        _state['registered'] = True
+
+    @app.before_request
+    def reset_query_shapes():
+        g.nplusone_counts = Counter()
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block executes more than `limit` SQL statements.
+
+    Usage:
+        with assert_max_queries(3):
+            client.get('/api/donations/history', headers=headers)
+
+    Raises:
+        AssertionError: listing every statement that ran
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+    if len(statements) > limit:
+        listing = '\n'.join(f'  {index + 1}. {_WHITESPACE.sub(" ", s)[:200]}' for index, s in enumerate(statements))
+        raise AssertionError(f'Expected at most {limit} queries, {len(statements)} ran:\n{listing}')
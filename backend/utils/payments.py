@@ -0,0 +1,180 @@
+"""
+Payment recording.
+Marks a transaction paid and inserts its donation without a check-then-insert
+window: the transaction is claimed with a conditional UPDATE (which row-locks
+it on PostgreSQL and takes the write lock on SQLite), and the donation insert
+is ON CONFLICT DO NOTHING against the unique transaction_id. Of any number of
+concurrent payments for one transaction exactly one succeeds.
+
+Payments the realtor reports themselves (bank transfer, check) are recorded
+with payment_status 'pending' and only count once an admin confirms the money
+arrived; card payments are confirmed by Stripe (see utils.stripe_payments).
+"""
+from datetime import datetime
+from sqlalchemy import select, update
+from extensions import db
+from models import Transaction, Donation, Notification
+from utils.periods import get_period_display
+from utils.upsert import dialect_insert
+
+PAYABLE_STATUSES = ('pending', 'overdue')
+
+
+class PaymentError(Exception):
+    """A payment that cannot be recorded; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def record_payment(transaction_id, realtor_id=None, payment_method='credit_card', payment_reference='',
+                   paid_at=None, confirmed=True):
+    """
+    Atomically mark a transaction paid, insert its donation and notify the realtor.
+
+    The caller commits (or rolls back on PaymentError).
+
+    Args:
+        transaction_id: Transaction being paid
+        realtor_id: Paying realtor; when given, the transaction must belong to them
+        payment_method: credit_card, bank_transfer, check, ...
+        payment_reference: Gateway/payment identifier
+        paid_at: When the payment happened (default now)
+        confirmed: False for self-reported payments; the donation stays
+            'pending' (and out of totals) until confirm_payment()
+
+    Returns:
+        Donation: the inserted donation
+
+    Raises:
+        PaymentError: 404 unknown transaction, 403 someone else's, 409 already paid
+    """
+    paid_at = paid_at or datetime.utcnow()
+    conditions = [Transaction.id == transaction_id, Transaction.status.in_(PAYABLE_STATUSES)]
+    if realtor_id is not None:
+        conditions.append(Transaction.realtor_id == realtor_id)
+
+    claimed = db.session.execute(
+        update(Transaction)
+        .where(*conditions)
+        .values(status='paid')
+        .returning(Transaction.realtor_id, Transaction.calculated_donation_amount, Transaction.month, Transaction.year)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if claimed is None:
+        # Nothing was claimed; work out why for the response
+        current = db.session.execute(
+            select(Transaction.realtor_id, Transaction.status).where(Transaction.id == transaction_id)
+        ).first()
+        if current is None:
+            raise PaymentError('Transaction not found', 404)
+        if realtor_id is not None and current.realtor_id != realtor_id:
+            raise PaymentError('Unauthorized', 403)
+        raise PaymentError('Transaction already paid', 409)
+
+    donation = db.session.scalars(
+        dialect_insert(Donation)
+        .values(
+            realtor_id=claimed.realtor_id,
+            transaction_id=transaction_id,
+            amount=claimed.calculated_donation_amount,
+            payment_method=payment_method,
+            payment_reference=payment_reference,
+            payment_status='completed' if confirmed else 'pending',
+            thank_you_image_generated=False,
+            social_media_shared=False,
+            paid_at=paid_at,
+            created_at=paid_at
+        )
+        .on_conflict_do_nothing(index_elements=['transaction_id'])
+        .returning(Donation)
+    ).first()
+
+    if donation is None:
+        # A donation row already existed although the transaction was not marked paid
+        raise PaymentError('Payment already recorded', 409)
+
+    period = get_period_display(claimed.month, claimed.year)
+    if confirmed:
+        db.session.add(_thank_you(claimed.realtor_id, donation.amount, period))
+    else:
+        db.session.add(Notification(
+            realtor_id=claimed.realtor_id,
+            type='general',
+            subject='Payment Received - Awaiting Confirmation',
+            message=f'Thank you! We have your ${donation.amount:.2f} {payment_method.replace("_", " ")} payment for {period} on record and will confirm it as soon as it arrives.',
+            action_url='/history'
+        ))
+    return donation
+
+
+def _thank_you(realtor_id, amount, period):
+    return Notification(
+        realtor_id=realtor_id,
+        type='thank_you',
+        subject='Thank You for Your Donation!',
+        message=f'Thank you for your ${amount:.2f} donation for {period}! Your contribution helps families achieve homeownership.',
+        action_url='/donations/share'
+    )
+
+
+def confirm_payment(donation_id):
+    """
+    Confirm a self-reported payment arrived: the donation becomes 'completed'.
+
+    The caller commits, then refreshes whatever caches donation totals.
+
+    Returns:
+        Donation: the confirmed donation
+
+    Raises:
+        PaymentError: 404 unknown donation, 409 not awaiting confirmation
+    """
+    donation = db.session.scalars(
+        update(Donation)
+        .where(Donation.id == donation_id, Donation.payment_status == 'pending')
+        .values(payment_status='completed')
+        .returning(Donation)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if donation is None:
+        if db.session.get(Donation, donation_id) is None:
+            raise PaymentError('Donation not found', 404)
+        raise PaymentError('Donation is not awaiting confirmation', 409)
+
+    transaction = db.session.get(Transaction, donation.transaction_id)
+    db.session.add(_thank_you(donation.realtor_id, donation.amount,
+                              get_period_display(transaction.month, transaction.year)))
+    return donation
+
+
+def reject_payment(donation_id, reason=''):
+    """
+    Reject a self-reported payment that never arrived.
+
+    The donation is deleted and the transaction is payable again. The caller commits.
+
+    Raises:
+        PaymentError: 404 unknown donation, 409 not awaiting confirmation
+    """
+    donation = db.session.get(Donation, donation_id)
+    if donation is None:
+        raise PaymentError('Donation not found', 404)
+    if donation.payment_status != 'pending':
+        raise PaymentError('Donation is not awaiting confirmation', 409)
+
+    transaction = db.session.get(Transaction, donation.transaction_id)
+    transaction.status = 'pending'
+    period = get_period_display(transaction.month, transaction.year)
+    db.session.delete(donation)
+    db.session.add(Notification(
+        realtor_id=transaction.realtor_id,
+        type='payment_request',
+        subject='Payment Not Received',
+        message=f'We could not confirm your payment for {period}{": " + reason if reason else ""}. Please submit your payment again.',
+        action_url='/donations/payment'
+    ))
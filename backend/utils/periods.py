@@ -0,0 +1,121 @@
+"""
+Reporting period calculations.
+Finds the months a realtor has not yet reported transactions for.
+"""
+from datetime import date, datetime
+from sqlalchemy import text
+from extensions import db
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def get_previous_period(now=None):
+    """Return (month, year) of the month before `now`"""
+    now = now or datetime.utcnow()
+    if now.month == 1:
+        return 12, now.year - 1
+    return now.month - 1, now.year
+
+
+def get_period_display(month, year):
+    """Get human-readable period"""
+    return f"{MONTH_NAMES[month - 1]} {year}"
+
+
+# A realtor owes a report for every full month after the month they joined.
+# Postgres expands that series with generate_series; SQLite uses a recursive CTE.
+# Both anti-join against transactions so the gaps come back in one statement.
+_POSTGRES_PENDING_SQL = """
+    SELECT r.id AS realtor_id,
+           CAST(EXTRACT(MONTH FROM p.period) AS INTEGER) AS month,
+           CAST(EXTRACT(YEAR FROM p.period) AS INTEGER) AS year
+    FROM realtors r
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('month', r.created_at) + interval '1 month',
+        CAST(:last_period AS timestamp),
+        interval '1 month'
+    ) AS p(period)
+    WHERE {realtor_filter}
+      AND NOT EXISTS (
+          SELECT 1 FROM transactions t
+          WHERE t.realtor_id = r.id
+            AND t.month = CAST(EXTRACT(MONTH FROM p.period) AS INTEGER)
+            AND t.year = CAST(EXTRACT(YEAR FROM p.period) AS INTEGER)
+      )
+    ORDER BY r.id, p.period
+"""
+
+_SQLITE_PENDING_SQL = """
+    WITH RECURSIVE periods(realtor_id, period) AS (
+        SELECT r.id, date(r.created_at, 'start of month', '+1 month')
+        FROM realtors r
+        WHERE {realtor_filter}
+          AND date(r.created_at, 'start of month', '+1 month') <= :last_period
+        UNION ALL
+        SELECT realtor_id, date(period, '+1 month')
+        FROM periods
+        WHERE period < :last_period
+    )
+    SELECT p.realtor_id,
+           CAST(strftime('%m', p.period) AS INTEGER) AS month,
+           CAST(strftime('%Y', p.period) AS INTEGER) AS year
+    FROM periods p
+    WHERE NOT EXISTS (
+        SELECT 1 FROM transactions t
+        WHERE t.realtor_id = p.realtor_id
+          AND t.month = CAST(strftime('%m', p.period) AS INTEGER)
+          AND t.year = CAST(strftime('%Y', p.period) AS INTEGER)
+    )
+    ORDER BY p.realtor_id, p.period
+"""
+
+
+def get_pending_periods(realtor_id=None, through=None):
+    """
+    Find every unreported month, for one realtor or for all of them.
+
+    Args:
+        realtor_id: Only look at this realtor. When omitted, all active
+            approved realtors are included.
+        through: (month, year) of the last period to check, defaults to
+            the previous month
+
+    Returns:
+        list: dicts with realtor_id, month, year and display, ordered by
+            realtor then period
+    """
+    month, year = through or get_previous_period()
+    params = {'last_period': date(year, month, 1).isoformat()}
+
+    if realtor_id is not None:
+        realtor_filter = 'r.id = :realtor_id'
+        params['realtor_id'] = realtor_id
+    else:
+        realtor_filter = "r.is_active = :is_active AND r.approval_status = 'approved'"
+        params['is_active'] = True
+
+    if db.engine.dialect.name == 'postgresql':
+        sql = _POSTGRES_PENDING_SQL
+    else:
+        sql = _SQLITE_PENDING_SQL
+
+    rows = db.session.execute(text(sql.format(realtor_filter=realtor_filter)), params)
+
+    return [
+        {
+            'realtor_id': row.realtor_id,
+            'month': row.month,
+            'year': row.year,
+            'display': get_period_display(row.month, row.year)
+        }
+        for row in rows
+    ]
+
+
+def group_periods_by_realtor(periods):
+    """Group get_pending_periods() output into {realtor_id: [period, ...]}"""
+    grouped = {}
+    for period in periods:
+        grouped.setdefault(period['realtor_id'], []).append(period)
+    return grouped
@@ -0,0 +1,224 @@
+"""
+Donation rollups.
+Materializes daily and monthly donation totals (overall, per brokerage and per
+signup cohort) into donation_rollups so range queries never scan donations.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, insert
+from extensions import db
+from models import Realtor, Transaction, Donation, DonationRollup, ExportWatermark
+
+WATERMARK_KEY = 'donation_rollups'
+
+GRAINS = ('day', 'month')
+DIMENSIONS = ('all', 'brokerage', 'cohort')
+
+# Payments committed while a refresh runs can carry an earlier updated_at than
+# its start; look back this far so the next refresh still recomputes their days
+CHANGE_OVERLAP = timedelta(minutes=10)
+
+
+def _as_date(value):
+    """func.date() returns a string on SQLite and a date on Postgres"""
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _cohort_expression():
+    """Signup month of the realtor as YYYY-MM"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(Realtor.created_at, 'YYYY-MM')
+    return func.strftime('%Y-%m', Realtor.created_at)
+
+
+def _empty_totals():
+    return {'donation_count': 0, 'donation_total': Decimal('0'), 'transaction_count': 0}
+
+
+def _add(totals, count, total, transactions):
+    totals['donation_count'] += count
+    totals['donation_total'] += Decimal(total or 0)
+    totals['transaction_count'] += transactions or 0
+
+
+def _rebuild_days(days):
+    """Recompute day rollups for the given dates from donations"""
+    first, last = min(days), max(days)
+    day = func.date(Donation.paid_at)
+    cohort = _cohort_expression()
+
+    rows = db.session.query(
+        day,
+        Realtor.brokerage,
+        cohort,
+        func.count(Donation.id),
+        func.sum(Donation.amount),
+        func.sum(Transaction.closed_transactions_count)
+    ).join(Realtor, Realtor.id == Donation.realtor_id)\
+     .join(Transaction, Transaction.id == Donation.transaction_id)\
+     .filter(
+        Donation.payment_status == 'completed',
+        Donation.paid_at >= datetime.combine(first, datetime.min.time()),
+        Donation.paid_at < datetime.combine(last + timedelta(days=1), datetime.min.time())
+    )\
+     .group_by(day, Realtor.brokerage, cohort)\
+     .all()
+
+    buckets = {}
+    for row_day, brokerage, row_cohort, count, total, transactions in rows:
+        row_day = _as_date(row_day)
+        if row_day not in days:
+            continue
+        for dimension, value in (('all', ''), ('brokerage', brokerage or ''), ('cohort', row_cohort or '')):
+            _add(buckets.setdefault((row_day, dimension, value), _empty_totals()), count, total, transactions)
+
+    DonationRollup.query.filter(
+        DonationRollup.grain == 'day',
+        DonationRollup.period_start.in_(list(days))
+    ).delete(synchronize_session=False)
+
+    _insert_rollups('day', buckets)
+
+
+def _rebuild_months(months):
+    """Recompute month rollups by summing their day rollups"""
+    first, last = min(months), max(months)
+
+    day_rows = DonationRollup.query.filter(
+        DonationRollup.grain == 'day',
+        DonationRollup.period_start >= first,
+        DonationRollup.period_start < _next_month(last)
+    ).all()
+
+    buckets = {}
+    for row in day_rows:
+        month = _month_start(row.period_start)
+        if month not in months:
+            continue
+        key = (month, row.dimension, row.dimension_value)
+        _add(buckets.setdefault(key, _empty_totals()), row.donation_count, row.donation_total, row.transaction_count)
+
+    DonationRollup.query.filter(
+        DonationRollup.grain == 'month',
+        DonationRollup.period_start.in_(list(months))
+    ).delete(synchronize_session=False)
+
+    _insert_rollups('month', buckets)
+
+
+def _insert_rollups(grain, buckets):
+    if not buckets:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(DonationRollup), [
+        {
+            'grain': grain,
+            'period_start': period_start,
+            'dimension': dimension,
+            'dimension_value': value,
+            'refreshed_at': now,
+            **totals
+        }
+        for (period_start, dimension, value), totals in buckets.items()
+    ])
+
+
+def refresh_rollups(full=False):
+    """
+    Bring the rollup tables up to date.
+
+    Only the days of donations inserted or updated since the last refresh
+    (and the months containing them) are recomputed, so late commits and
+    confirmed payments are picked up too. Pass full=True to rebuild
+    everything, e.g. after donations were deleted or brokerages renamed.
+
+    Returns:
+        Number of days recomputed
+    """
+    watermark = db.session.get(ExportWatermark, WATERMARK_KEY)
+    if not watermark:
+        watermark = ExportWatermark(dataset=WATERMARK_KEY, last_id=0, rows_exported=0)
+        db.session.add(watermark)
+        full = True
+
+    started_at = datetime.utcnow()
+    changed = db.session.query(func.date(Donation.paid_at), func.count(Donation.id))
+    if full:
+        DonationRollup.query.delete(synchronize_session=False)
+    else:
+        changed = changed.filter(Donation.updated_at >= watermark.exported_at - CHANGE_OVERLAP)
+    changed_rows = changed.group_by(func.date(Donation.paid_at)).all()
+
+    days = {_as_date(day) for day, _ in changed_rows}
+    if days:
+        _rebuild_days(days)
+        _rebuild_months({_month_start(day) for day in days})
+
+    watermark.rows_exported += sum(count for _, count in changed_rows)
+    watermark.exported_at = started_at
+    db.session.commit()
+
+    return len(days)
+
+
+def refresh_rollup_days(days):
+    """
+    Recompute the given days (and their months) right away, e.g. after an
+    admin confirms a payment, instead of waiting for the next refresh_rollups.
+    """
+    days = {_as_date(day) for day in days}
+    if days:
+        _rebuild_days(days)
+        _rebuild_months({_month_start(day) for day in days})
+    db.session.commit()
+    return len(days)
+
+
+def query_rollups(grain, dimension, start, end, value=None):
+    """
+    Read rollups for a date range.
+
+    Args:
+        grain: 'day' or 'month'
+        dimension: 'all', 'brokerage' or 'cohort'
+        start, end: dates (inclusive); month grain matches months starting in range
+        value: Optional single brokerage/cohort
+
+    Returns:
+        dict: rollup rows plus totals across the range
+    """
+    query = DonationRollup.query.filter(
+        DonationRollup.grain == grain,
+        DonationRollup.dimension == dimension,
+        DonationRollup.period_start >= (_month_start(start) if grain == 'month' else start),
+        DonationRollup.period_start <= end
+    )
+    if value is not None:
+        query = query.filter(DonationRollup.dimension_value == value)
+
+    rows = query.order_by(DonationRollup.period_start, DonationRollup.dimension_value).all()
+
+    totals = _empty_totals()
+    for row in rows:
+        _add(totals, row.donation_count, row.donation_total, row.transaction_count)
+
+    return {
+        'rollups': [row.to_dict() for row in rows],
+        'totals': {
+            'donation_count': totals['donation_count'],
+            'donation_total': float(totals['donation_total']),
+            'transaction_count': totals['transaction_count'],
+            'average_per_transaction': round(float(totals['donation_total']) / totals['transaction_count'], 2)
+            if totals['transaction_count'] else 0.0
+        }
+    }
@@ -0,0 +1,251 @@
+"""
+Scheduled background jobs.
+Sends monthly transaction reminders, marks unpaid transactions as overdue,
+refreshes donation rollups, standardizes new grant application addresses,
+applies received Stripe webhook events and purges expired cache rows.
+"""
+import atexit
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from flask import current_app
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Realtor, Transaction, Notification, JobLock, IdempotencyKey, AddressCache
+from utils.email_service import send_monthly_transaction_reminder
+from utils.periods import MONTH_NAMES, get_pending_periods, group_periods_by_realtor
+from utils.rollups import refresh_rollups
+from utils.address_revalidation import revalidate_addresses
+from utils.stripe_payments import process_stripe_events
+
+# Reminders name this many of the latest unreported months; older ones are counted
+REMINDER_LISTED_PERIODS = 3
+
+# Frontend view listing every unreported month
+PENDING_REPORTS_PATH = '/transactions/submit#pending'
+
+
+def acquire_job_lock(name, lease):
+    """
+    Try to take the lease for a scheduled job.
+
+    Every gunicorn worker runs its own scheduler, so all of them fire at the
+    same time. The lease is a single row per job: the first worker to insert it
+    (or to update an expired one) wins. The lease is deliberately not released
+    when the job finishes, so a slower worker firing a few seconds later cannot
+    run the job a second time.
+
+    Args:
+        name: Job name
+        lease: timedelta the lock is held for
+
+    Returns:
+        Boolean indicating whether this worker should run the job
+    """
+    now = datetime.utcnow()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    try:
+        db.session.add(JobLock(name=name, locked_by=owner, locked_until=now + lease, last_run_at=now))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+
+    result = db.session.execute(
+        update(JobLock)
+        .where(JobLock.name == name, JobLock.locked_until < now)
+        .values(locked_by=owner, locked_until=now + lease, last_run_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _reminder_message(periods):
+    """Name the latest unreported months (newest first) and count the rest"""
+    listed = [period['display'] for period in reversed(periods[-REMINDER_LISTED_PERIODS:])]
+    older = len(periods) - len(listed)
+    months = ', '.join(listed)
+    if older:
+        return (f"Please report your closed transactions for {months} … and {older} more "
+                f"month{'s' if older != 1 else ''}, then submit your monthly donation.")
+    return f"Please report your closed transactions for {months} and submit your monthly donation."
+
+
+def send_transaction_reminders():
+    """
+    Remind realtors who have unreported months.
+
+    All gaps come from one get_pending_periods() query. Realtors are then
+    processed in batches of REMINDER_BATCH_SIZE: one IN lookup loads the batch,
+    emails go out for the most recent missing month, and the batch's
+    notifications are inserted in one statement. Notifications name the
+    latest REMINDER_LISTED_PERIODS gaps and link to the full list.
+
+    Returns:
+        Number of realtors reminded
+    """
+    pending = group_periods_by_realtor(get_pending_periods())
+    batch_size = current_app.config.get('REMINDER_BATCH_SIZE', 100)
+    report_url = f"{current_app.config.get('FRONTEND_URL', '')}{PENDING_REPORTS_PATH}"
+
+    realtor_ids = list(pending.keys())
+    reminded = 0
+
+    for start in range(0, len(realtor_ids), batch_size):
+        batch = Realtor.query.filter(Realtor.id.in_(realtor_ids[start:start + batch_size])).all()
+
+        now = datetime.utcnow()
+        rows = []
+        for realtor in batch:
+            periods = pending[realtor.id]
+            latest = periods[-1]
+            email_sent = send_monthly_transaction_reminder(
+                realtor=realtor,
+                month=MONTH_NAMES[latest['month'] - 1],
+                year=latest['year'],
+                report_url=report_url
+            )
+            rows.append({
+                'realtor_id': realtor.id,
+                'type': 'transaction_reminder',
+                'subject': f"Time to Report Your {latest['display']} Transactions",
+                'message': _reminder_message(periods),
+                'action_url': PENDING_REPORTS_PATH,
+                'is_read': False,
+                'email_sent': email_sent,
+                'sent_at': now
+            })
+
+        if rows:
+            db.session.execute(insert(Notification), rows)
+            db.session.commit()
+            reminded += len(rows)
+
+    return reminded
+
+
+def mark_overdue_transactions():
+    """
+    Mark pending transactions older than PAYMENT_DUE_DAYS as overdue.
+
+    One UPDATE ... RETURNING flips every past-due row, and the returned rows
+    drive a single bulk insert of payment_overdue notifications.
+
+    Returns:
+        Number of transactions marked overdue
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config.get('PAYMENT_DUE_DAYS', 30))
+
+    result = db.session.execute(
+        update(Transaction)
+        .where(Transaction.status == 'pending', Transaction.submitted_at < cutoff)
+        .values(status='overdue')
+        .returning(
+            Transaction.realtor_id,
+            Transaction.month,
+            Transaction.year,
+            Transaction.calculated_donation_amount
+        )
+        .execution_options(synchronize_session=False)
+    )
+    overdue = result.all()
+
+    if overdue:
+        now = datetime.utcnow()
+        db.session.execute(insert(Notification), [
+            {
+                'realtor_id': realtor_id,
+                'type': 'payment_overdue',
+                'subject': 'Monthly Donation Overdue',
+                'message': f'Your ${amount:.2f} donation for {MONTH_NAMES[month - 1]} {year} is past due. Please submit your payment.',
+                'action_url': '/donations/payment',
+                'is_read': False,
+                'email_sent': False,
+                'sent_at': now
+            }
+            for realtor_id, month, year, amount in overdue
+        ])
+
+    db.session.commit()
+    return len(overdue)
+
+
+def purge_expired_rows():
+    """
+    Delete expired idempotency keys and cached address validations.
+
+    Returns:
+        Number of rows deleted
+    """
+    now = datetime.utcnow()
+    deleted = 0
+    for model in (IdempotencyKey, AddressCache):
+        deleted += db.session.execute(delete(model).where(model.expires_at <= now)).rowcount
+    db.session.commit()
+    return deleted
+
+
+JOBS = {
+    'monthly_reminders': ('REMINDER_CRON', send_transaction_reminders),
+    'mark_overdue': ('OVERDUE_CRON', mark_overdue_transactions),
+    'refresh_rollups': ('ROLLUP_CRON', refresh_rollups),
+    'revalidate_addresses': ('ADDRESS_REVALIDATION_CRON', revalidate_addresses),
+    'purge_expired': ('PURGE_CRON', purge_expired_rows),
+    'stripe_events': ('STRIPE_EVENTS_CRON', process_stripe_events),
+}
+
+
+def run_job(app, name, lease=None):
+    """Run a scheduled job inside an app context if this worker gets the lease"""
+    _, func = JOBS[name]
+    with app.app_context():
+        try:
+            lease = lease or timedelta(minutes=app.config.get('SCHEDULER_LOCK_MINUTES', 30))
+            if not acquire_job_lock(name, lease):
+                app.logger.info(f"Scheduled job {name} skipped: running on another worker")
+                return None
+
+            result = func()
+            app.logger.info(f"Scheduled job {name} finished: {result}")
+            return result
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Scheduled job {name} failed: {str(e)}")
+            return None
+        finally:
+            db.session.remove()
+
+
+def _lease_for(trigger, max_minutes):
+    """Lease shorter than the gap between runs, so the next run is never blocked"""
+    now = datetime.now(timezone.utc)
+    first = trigger.get_next_fire_time(None, now)
+    second = trigger.get_next_fire_time(first, first + timedelta(seconds=1))
+    return min(timedelta(minutes=max_minutes), (second - first) / 2)
+
+
+def init_scheduler(app):
+    """Start the background scheduler with the jobs configured on the app"""
+    scheduler = BackgroundScheduler(timezone='UTC', daemon=True)
+
+    for name, (config_key, _) in JOBS.items():
+        trigger = CronTrigger.from_crontab(app.config[config_key], timezone='UTC')
+        scheduler.add_job(
+            run_job,
+            trigger,
+            args=[app, name, _lease_for(trigger, app.config.get('SCHEDULER_LOCK_MINUTES', 30))],
+            id=name,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=3600
+        )
+
+    scheduler.start()
+    atexit.register(lambda: scheduler.shutdown(wait=False))
+    app.extensions['scheduler'] = scheduler
+    return scheduler
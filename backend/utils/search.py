@@ -0,0 +1,213 @@
+"""
+Full-text search over grant applications.
+Uses a weighted tsvector column with a GIN index on Postgres and an FTS5
+table kept in sync by triggers on SQLite.
+"""
+import base64
+import json
+from flask import current_app
+from sqlalchemy import bindparam, text
+from extensions import db
+
+FTS_TABLE = 'grant_applications_fts'
+
+# Names rank above contact details, which rank above the story
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE grant_applications ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig,
+            coalesce(applicant_first_name, '') || ' ' || coalesce(applicant_last_name, '') || ' ' ||
+            coalesce(submitter_first_name, '') || ' ' || coalesce(submitter_last_name, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig,
+            coalesce(applicant_email, '') || ' ' || coalesce(submitter_email, '') || ' ' ||
+            coalesce(applicant_address, '') || ' ' || coalesce(submitter_address, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(applicant_story, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_grant_applications_search_vector
+    ON grant_applications USING GIN (search_vector)
+    """,
+]
+
+_SQLITE_FTS_COLUMNS = {
+    'names': "coalesce({row}.applicant_first_name, '') || ' ' || coalesce({row}.applicant_last_name, '') || ' ' || "
+             "coalesce({row}.submitter_first_name, '') || ' ' || coalesce({row}.submitter_last_name, '')",
+    'emails': "coalesce({row}.applicant_email, '') || ' ' || coalesce({row}.submitter_email, '')",
+    'addresses': "coalesce({row}.applicant_address, '') || ' ' || coalesce({row}.submitter_address, '')",
+    'story': "coalesce({row}.applicant_story, '')",
+}
+
+_SEARCHABLE_COLUMNS = (
+    'applicant_first_name, applicant_last_name, applicant_email, applicant_address, applicant_story, '
+    'submitter_first_name, submitter_last_name, submitter_email, submitter_address'
+)
+
+
+def _sqlite_fts_values(row):
+    return ', '.join(expr.format(row=row) for expr in _SQLITE_FTS_COLUMNS.values())
+
+
+def _sqlite_ddl():
+    columns = ', '.join(_SQLITE_FTS_COLUMNS.keys())
+    insert_new = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {_sqlite_fts_values('new')});"
+    delete_old = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, tokenize = 'porter unicode61')",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON grant_applications BEGIN
+            {insert_new}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON grant_applications BEGIN
+            {delete_old}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_SEARCHABLE_COLUMNS} ON grant_applications BEGIN
+            {delete_old}
+            {insert_new}
+        END
+        """,
+        # Index any rows written before the triggers existed
+        f"""
+        INSERT INTO {FTS_TABLE}(rowid, {columns})
+        SELECT g.id, {_sqlite_fts_values('g')} FROM grant_applications g
+        WHERE NOT EXISTS (SELECT 1 FROM {FTS_TABLE} f WHERE f.rowid = g.id)
+        """,
+    ]
+
+
+def init_search_index():
+    """Create the search column/index (Postgres) or FTS table and triggers (SQLite)"""
+    dialect = db.engine.dialect.name
+    statements = _POSTGRES_DDL if dialect == 'postgresql' else _sqlite_ddl()
+
+    try:
+        with db.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    except Exception as e:
+        current_app.logger.warning(f"Grant application search index not available: {str(e)}")
+
+
+_RESULT_COLUMNS = (
+    'g.id, g.application_type, g.applicant_first_name, g.applicant_last_name, '
+    'g.applicant_email, g.status, g.created_at'
+)
+
+# ts_rank_cd returns real; widen it to the float8 the cursor round-trips through
+# JSON so "rank = :cursor_rank" still matches tied rows on the next page
+_POSTGRES_SEARCH_SQL = f"""
+    SELECT page.*, ts_headline('english', page.applicant_story, websearch_to_tsquery('english', :q),
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2') AS snippet
+    FROM (
+        SELECT * FROM (
+            SELECT {_RESULT_COLUMNS}, g.applicant_story,
+                   CAST(ts_rank_cd(g.search_vector, websearch_to_tsquery('english', :q)) AS float8) AS rank
+            FROM grant_applications g
+            WHERE g.search_vector @@ websearch_to_tsquery('english', :q) {{status_filter}}
+        ) ranked
+        WHERE {{cursor_filter}}
+        ORDER BY rank DESC, id DESC
+        LIMIT :limit
+    ) page
+    ORDER BY page.rank DESC, page.id DESC
+"""
+
+_SQLITE_SEARCH_SQL = f"""
+    SELECT * FROM (
+        SELECT {_RESULT_COLUMNS},
+               -bm25({FTS_TABLE}, 10.0, 5.0, 5.0, 1.0) AS rank,
+               snippet({FTS_TABLE}, -1, '<mark>', '</mark>', '...', 16) AS snippet
+        FROM {FTS_TABLE}
+        JOIN grant_applications g ON g.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :q {{status_filter}}
+    ) ranked
+    WHERE {{cursor_filter}}
+    ORDER BY rank DESC, id DESC
+    LIMIT :limit
+"""
+
+
+def _to_fts5_query(q):
+    """Quote each term so user input can't inject FTS5 syntax; last term matches as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in q.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def encode_cursor(rank, application_id):
+    """Encode a keyset pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps([rank, application_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a keyset pagination cursor, raising ValueError if it is malformed"""
+    try:
+        rank, application_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(rank), int(application_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def search_applications(q, statuses=None, limit=20, cursor=None):
+    """
+    Search grant applications by name, email, address and story.
+
+    Args:
+        q: Search text (web-search syntax on Postgres, plain terms on SQLite)
+        statuses: Optional list of statuses to filter on
+        limit: Page size
+        cursor: Cursor returned with the previous page
+
+    Returns:
+        dict: results (ranked, with highlighted snippet) and next_cursor
+    """
+    is_postgres = db.engine.dialect.name == 'postgresql'
+    params = {'q': q if is_postgres else _to_fts5_query(q), 'limit': limit}
+    bind_params = []
+
+    status_filter = ''
+    if statuses:
+        status_filter = 'AND g.status IN :statuses'
+        params['statuses'] = list(statuses)
+        bind_params.append(bindparam('statuses', expanding=True))
+
+    cursor_filter = '1 = 1'
+    if cursor:
+        params['cursor_rank'], params['cursor_id'] = decode_cursor(cursor)
+        cursor_filter = '(rank < :cursor_rank OR (rank = :cursor_rank AND id < :cursor_id))'
+
+    sql = _POSTGRES_SEARCH_SQL if is_postgres else _SQLITE_SEARCH_SQL
+    statement = text(sql.format(status_filter=status_filter, cursor_filter=cursor_filter))\
+        .bindparams(*bind_params)\
+        .columns(created_at=db.DateTime)
+
+    rows = db.session.execute(statement, params).mappings().all()
+
+    results = [
+        {
+            'id': row['id'],
+            'application_type': row['application_type'],
+            'applicant': {
+                'first_name': row['applicant_first_name'],
+                'last_name': row['applicant_last_name'],
+                'email': row['applicant_email']
+            },
+            'status': row['status'],
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+            'rank': float(row['rank']),
+            'snippet': row['snippet']
+        }
+        for row in rows
+    ]
+
+    next_cursor = None
+    if len(results) == limit:
+        next_cursor = encode_cursor(results[-1]['rank'], results[-1]['id'])
+
+    return {'results': results, 'next_cursor': next_cursor}
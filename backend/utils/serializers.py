@@ -0,0 +1,54 @@
+"""
+Column-level serializers for large listings.
+Produce the same payload as the models' to_dict() straight from selected
+columns, without loading ORM objects or converting each value by hand; the
+JSON provider encodes the Decimal and datetime values.
+"""
+from sqlalchemy import select
+from extensions import db
+from models import Realtor, Transaction, Donation
+
+
+def _transaction_columns():
+    return [
+        Transaction.id,
+        Transaction.realtor_id,
+        Transaction.month,
+        Transaction.year,
+        Transaction.closed_transactions_count,
+        Transaction.calculated_donation_amount,
+        Transaction.status,
+        Transaction.submitted_at,
+        Donation.id.isnot(None).label('has_donation'),
+    ]
+
+
+def serialize_transactions(*criteria, with_realtor=False):
+    """
+    Transactions as Transaction.to_dict() dicts, newest period first.
+
+    Args:
+        criteria: Filter expressions (e.g. Transaction.realtor_id == 5)
+        with_realtor: Add realtor_name and realtor_email (admin listings)
+
+    Returns:
+        list: one dict per transaction, read in a single query
+    """
+    columns = _transaction_columns()
+    if with_realtor:
+        columns += [Realtor.first_name, Realtor.last_name, Realtor.email]
+
+    statement = select(*columns).outerjoin(Donation, Donation.transaction_id == Transaction.id)
+    if with_realtor:
+        statement = statement.join(Realtor, Realtor.id == Transaction.realtor_id)
+
+    statement = statement.where(*criteria).order_by(Transaction.year.desc(), Transaction.month.desc())
+
+    rows = []
+    for row in db.session.execute(statement):
+        data = row._asdict()
+        if with_realtor:
+            data['realtor_name'] = f"{data.pop('first_name')} {data.pop('last_name')}"
+            data['realtor_email'] = data.pop('email')
+        rows.append(data)
+    return rows
@@ -0,0 +1,366 @@
+"""
+Card payments through Stripe.
+A realtor's browser pays a PaymentIntent created here for the transaction's
+donation amount. Stripe reports the outcome to the webhook, which only checks
+the signature and stores the event in the stripe_events inbox (a redelivered
+event id is dropped by the primary key), so it answers in milliseconds even
+during Stripe's retry bursts. The event worker applies stored events in
+order; a succeeded payment goes through record_payment, which is race-free,
+so an event applied twice still records one donation.
+"""
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from sqlalchemy import select
+from extensions import db
+from models import Transaction, Donation, Notification, StripeEvent
+from utils.leaderboard import leaderboards
+from utils.payments import PAYABLE_STATUSES, PaymentError, record_payment
+from utils.periods import get_period_display
+from utils.upsert import dialect_insert
+
+STRIPE_API_URL = 'https://api.stripe.com'
+
+# Signed webhooks older than this (seconds) are rejected as replays; Stripe's default
+SIGNATURE_TOLERANCE = 300
+
+MAX_ATTEMPTS = 5
+
+
+class StripeError(Exception):
+    """Stripe refused a request or could not be reached"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class SignatureError(Exception):
+    """A webhook's Stripe-Signature header is missing, stale or does not match"""
+
+
+class EventError(Exception):
+    """An event that can never be applied (retrying will not help)"""
+
+
+def to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal('1')))
+
+
+def _form_fields(params, prefix=''):
+    """Flatten nested params into Stripe's form encoding (metadata[transaction_id]=...)"""
+    fields = []
+    for key, value in params.items():
+        name = f'{prefix}[{key}]' if prefix else key
+        if isinstance(value, dict):
+            fields.extend(_form_fields(value, name))
+        elif value is not None:
+            fields.append((name, str(value)))
+    return fields
+
+
+class StripeClient:
+    """
+    Minimal Stripe API client on a pooled requests.Session.
+    One instance is shared per app (see get_client).
+    """
+
+    def __init__(self, secret_key, url=STRIPE_API_URL, timeout=10, pool_size=10):
+        self.secret_key = secret_key
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.auth = (secret_key or '', '')
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _post(self, path, params, idempotency_key=None):
+        if not self.secret_key:
+            raise StripeError('Stripe is not configured')
+
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else {}
+        try:
+            response = self.session.post(f'{self.url}{path}', data=_form_fields(params), headers=headers,
+                                         timeout=self.timeout)
+        except requests.exceptions.Timeout:
+            raise StripeError('Stripe request timed out')
+        except requests.exceptions.RequestException as e:
+            raise StripeError(f'Stripe request failed: {type(e).__name__}')
+
+        try:
+            body = response.json()
+        except ValueError:
+            raise StripeError(f'Unexpected Stripe response (HTTP {response.status_code})', response.status_code)
+        if response.status_code >= 400:
+            error = body.get('error') or {}
+            raise StripeError(error.get('message') or f'Stripe error (HTTP {response.status_code})',
+                              response.status_code)
+        return body
+
+    def create_payment_intent(self, amount, currency, metadata=None, description=None, idempotency_key=None):
+        """
+        Create a PaymentIntent.
+
+        Args:
+            amount: Amount in the currency's smallest unit (cents)
+            currency: ISO currency code
+            metadata: dict stored on the intent and echoed back in its events
+            idempotency_key: Stripe Idempotency-Key; a repeat returns the same intent
+
+        Returns:
+            dict: the PaymentIntent (id, client_secret, amount, currency, status, ...)
+        """
+        return self._post('/v1/payment_intents', {
+            'amount': amount,
+            'currency': currency,
+            'description': description,
+            'automatic_payment_methods': {'enabled': 'true'},
+            'metadata': metadata or {},
+        }, idempotency_key=idempotency_key)
+
+
+def get_client():
+    """The current app's shared StripeClient, created on first use"""
+    app = current_app._get_current_object()
+    client = app.extensions.get('stripe_client')
+    if client is None:
+        client = StripeClient(
+            app.config.get('STRIPE_SECRET_KEY'),
+            url=app.config.get('STRIPE_API_URL', STRIPE_API_URL),
+            timeout=app.config.get('STRIPE_TIMEOUT', 10)
+        )
+        app.extensions['stripe_client'] = client
+    return client
+
+
+def create_payment_intent(transaction_id, realtor_id):
+    """
+    Create (or fetch again) the PaymentIntent paying one of a realtor's transactions.
+
+    Stripe's idempotency key is derived from the transaction and amount, so
+    asking twice returns the same intent instead of opening a second charge.
+
+    Returns:
+        dict: id, client_secret, amount (dollars) and currency
+
+    Raises:
+        PaymentError: 404 unknown transaction, 403 someone else's, 409 already paid
+        StripeError: Stripe refused the request or was unreachable
+    """
+    transaction = db.session.execute(
+        select(Transaction.realtor_id, Transaction.status, Transaction.calculated_donation_amount,
+               Transaction.month, Transaction.year)
+        .where(Transaction.id == transaction_id)
+    ).first()
+    if transaction is None:
+        raise PaymentError('Transaction not found', 404)
+    if transaction.realtor_id != realtor_id:
+        raise PaymentError('Unauthorized', 403)
+    if transaction.status not in PAYABLE_STATUSES:
+        raise PaymentError('Transaction already paid', 409)
+
+    amount = to_cents(transaction.calculated_donation_amount)
+    intent = get_client().create_payment_intent(
+        amount,
+        current_app.config.get('STRIPE_CURRENCY', 'usd'),
+        metadata={'transaction_id': transaction_id, 'realtor_id': realtor_id},
+        description=f'Local Supports Local donation for {get_period_display(transaction.month, transaction.year)}',
+        idempotency_key=f'transaction-{transaction_id}-{amount}'
+    )
+    return {
+        'id': intent['id'],
+        'client_secret': intent.get('client_secret'),
+        'amount': amount / 100,
+        'currency': intent.get('currency'),
+    }
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """Stripe-Signature header value for a payload (used by the local Stripe stub)"""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    signature = hmac.new(secret.encode('utf-8'), f'{timestamp}.'.encode('utf-8') + payload, hashlib.sha256)
+    return f't={timestamp},v1={signature.hexdigest()}'
+
+
+def verify_signature(payload, header, secret, tolerance=SIGNATURE_TOLERANCE, now=None):
+    """
+    Check a webhook's Stripe-Signature header.
+
+    The header holds a timestamp and one or more v1 HMAC-SHA256 signatures
+    (several while a signing secret is being rolled) of "<timestamp>.<payload>".
+
+    Raises:
+        SignatureError: missing or malformed header, no matching signature, or
+            a timestamp outside the tolerance
+    """
+    items = [item.split('=', 1) for item in (header or '').split(',') if '=' in item]
+    timestamps = [value for key, value in items if key.strip() == 't']
+    signatures = [value.strip() for key, value in items if key.strip() == 'v1']
+    if not timestamps or not signatures:
+        raise SignatureError('Missing Stripe-Signature')
+
+    try:
+        timestamp = int(timestamps[0])
+    except ValueError:
+        raise SignatureError('Malformed Stripe-Signature timestamp')
+
+    expected = hmac.new(secret.encode('utf-8'), f'{timestamp}.'.encode('utf-8') + payload,
+                        hashlib.sha256).hexdigest()
+    if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+        raise SignatureError('Signature does not match')
+
+    if abs((now if now is not None else time.time()) - timestamp) > tolerance:
+        raise SignatureError('Signature timestamp outside the tolerance')
+
+
+def enqueue_event(event, payload):
+    """
+    Store a verified webhook event in the inbox unless its id was seen before.
+
+    Args:
+        event: Parsed event (needs id and type)
+        payload: Raw request body, stored as received
+
+    Returns:
+        bool: True if the event is new
+    """
+    result = db.session.execute(
+        dialect_insert(StripeEvent.__table__)
+        .values(id=event['id'], type=event['type'], payload=payload.decode('utf-8'), status='pending',
+                attempts=0, received_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['id'])
+    )
+    return result.rowcount == 1
+
+
+def _intent_transaction(intent):
+    try:
+        return int(intent['metadata']['transaction_id']), int(intent['metadata']['realtor_id'])
+    except (KeyError, TypeError, ValueError):
+        raise EventError('PaymentIntent has no transaction_id/realtor_id metadata')
+
+
+def _payment_succeeded(event):
+    intent = event['data']['object']
+    transaction_id, realtor_id = _intent_transaction(intent)
+
+    expected = db.session.scalar(
+        select(Transaction.calculated_donation_amount).where(Transaction.id == transaction_id)
+    )
+    if expected is not None and intent.get('amount_received', intent.get('amount')) != to_cents(expected):
+        raise EventError(f"Amount {intent.get('amount_received')} does not match transaction "
+                         f"{transaction_id} ({to_cents(expected)} cents)")
+
+    try:
+        record_payment(transaction_id, realtor_id=realtor_id, payment_method='credit_card',
+                       payment_reference=intent['id'], paid_at=datetime.utcfromtimestamp(event['created']))
+    except PaymentError as e:
+        if e.status_code == 409:
+            reference = db.session.scalar(
+                select(Donation.payment_reference).where(Donation.transaction_id == transaction_id)
+            )
+            if reference == intent['id']:
+                return 'processed'  # already applied (event delivered under two ids, or applied twice)
+            raise EventError(f'Transaction {transaction_id} was already paid by {reference or "another payment"}; '
+                             f'{intent["id"]} needs a refund')
+        raise EventError(f'Transaction {transaction_id}: {e.message}')
+    return 'processed'
+
+
+def _payment_failed(event):
+    intent = event['data']['object']
+    transaction_id, realtor_id = _intent_transaction(intent)
+    reason = (intent.get('last_payment_error') or {}).get('message') or 'the card was declined'
+
+    period = db.session.execute(
+        select(Transaction.month, Transaction.year).where(Transaction.id == transaction_id)
+    ).first()
+    if period is None:
+        raise EventError(f'Transaction {transaction_id} not found')
+
+    db.session.add(Notification(
+        realtor_id=realtor_id,
+        type='payment_request',
+        subject='Your Donation Payment Did Not Go Through',
+        message=f'Your card payment for {get_period_display(period.month, period.year)} could not be completed: {reason.rstrip(".")}. Please try again.',
+        action_url='/donations/payment'
+    ))
+    return 'processed'
+
+
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': _payment_succeeded,
+    'payment_intent.payment_failed': _payment_failed,
+}
+
+
+def process_stripe_events(limit=None):
+    """
+    Apply pending inbox events, oldest first.
+
+    Each event's effects and its status change commit together. Events whose
+    handler raises EventError are marked failed for an admin to look at;
+    other errors leave them pending for the next run until MAX_ATTEMPTS.
+
+    Args:
+        limit: Events per run (default STRIPE_EVENT_BATCH_SIZE)
+
+    Returns:
+        dict: counts of events by resulting status
+    """
+    limit = limit or current_app.config.get('STRIPE_EVENT_BATCH_SIZE', 500)
+    event_ids = db.session.scalars(
+        select(StripeEvent.id).where(StripeEvent.status == 'pending')
+        .order_by(StripeEvent.received_at, StripeEvent.id).limit(limit)
+    ).all()
+
+    stats = {}
+    paid = False
+    for event_id in event_ids:
+        event = db.session.get(StripeEvent, event_id)
+        if event is None or event.status != 'pending':
+            continue
+
+        handler = EVENT_HANDLERS.get(event.type)
+        try:
+            status = handler(json.loads(event.payload)) if handler else 'ignored'
+            event.last_error = None
+            paid = paid or (status == 'processed' and event.type == 'payment_intent.succeeded')
+        except EventError as e:
+            db.session.rollback()
+            event = db.session.get(StripeEvent, event_id)
+            status, event.last_error = 'failed', str(e)
+            print(f"⚠️ Stripe event {event_id} failed: {e}")
+        except Exception as e:
+            db.session.rollback()
+            event = db.session.get(StripeEvent, event_id)
+            status = 'failed' if event.attempts + 1 >= MAX_ATTEMPTS else 'pending'
+            event.last_error = f'{type(e).__name__}: {e}'
+            print(f"⚠️ Stripe event {event_id} attempt {event.attempts + 1} failed: {e}")
+
+        event.attempts += 1
+        event.status = status
+        if status != 'pending':
+            event.processed_at = datetime.utcnow()
+        db.session.commit()
+        stats[status] = stats.get(status, 0) + 1
+
+    if paid:
+        # Public totals and leaderboards changed
+        from routes.impact import invalidate_impact
+        invalidate_impact()
+        try:
+            leaderboards.sync()
+        except Exception as e:
+            print(f"Leaderboard sync failed: {e}")
+
+    return stats
@@ -0,0 +1,136 @@
+"""
+Monthly transaction submission.
+Transactions are written with INSERT ... ON CONFLICT DO NOTHING against the
+unique (realtor_id, month, year) constraint instead of checking for an
+existing row first: one round trip, no race between concurrent submits, and
+RETURNING tells which periods were created and which were already reported.
+Any number of periods (and realtors) go in one statement.
+"""
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import insert
+from extensions import db
+from models import Transaction, Notification
+from utils.periods import get_period_display, get_previous_period
+from utils.upsert import dialect_insert
+
+FIRST_YEAR = 2020
+
+_RETURNED_COLUMNS = (
+    Transaction.id,
+    Transaction.realtor_id,
+    Transaction.month,
+    Transaction.year,
+    Transaction.closed_transactions_count,
+    Transaction.calculated_donation_amount,
+    Transaction.status,
+    Transaction.submitted_at,
+)
+
+
+def parse_submission(data, now=None):
+    """
+    Validate one period's submission.
+
+    Args:
+        data: dict with closed_transactions_count and optional month and year
+            (both default to the previous month)
+
+    Returns:
+        tuple: (month, year, closed_transactions_count)
+
+    Raises:
+        ValueError: with a message suitable for a 400 response
+    """
+    now = now or datetime.utcnow()
+    if 'closed_transactions_count' not in data:
+        raise ValueError('closed_transactions_count is required')
+
+    month = data.get('month')
+    year = data.get('year')
+    if not month or not year:
+        month, year = get_previous_period(now)
+
+    try:
+        month, year = int(month), int(year)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid month or year')
+
+    if not (1 <= month <= 12):
+        raise ValueError('Month must be between 1 and 12')
+
+    if year < FIRST_YEAR or year > now.year:
+        raise ValueError('Invalid year')
+
+    try:
+        closed_count = int(data['closed_transactions_count'])
+    except (ValueError, TypeError):
+        raise ValueError('Invalid transaction count')
+    if closed_count < 0:
+        raise ValueError('Transaction count must be non-negative')
+
+    return month, year, closed_count
+
+
+def transaction_row(realtor_id, month, year, closed_count, amount_per_transaction):
+    """Insert values for one period; nothing is owed (and it is 'paid') when the amount is zero"""
+    amount = closed_count * Decimal(amount_per_transaction or 0)
+    return {
+        'realtor_id': realtor_id,
+        'month': month,
+        'year': year,
+        'closed_transactions_count': closed_count,
+        'calculated_donation_amount': amount,
+        'status': 'pending' if amount > 0 else 'paid',
+    }
+
+
+def submit_transactions(rows):
+    """
+    Insert transactions, skipping periods that were already submitted.
+
+    Payment-request notifications for the created transactions that owe a
+    donation are inserted in the same flush. The caller commits.
+
+    Args:
+        rows: transaction_row() dicts, any number of realtors and periods
+
+    Returns:
+        tuple: (created, existing) - created transactions as Transaction.to_dict()
+            dicts, and the (realtor_id, month, year) keys that were already there
+    """
+    if not rows:
+        return [], []
+
+    submitted_at = datetime.utcnow()
+    statement = (
+        dialect_insert(Transaction.__table__)
+        .on_conflict_do_nothing(index_elements=['realtor_id', 'month', 'year'])
+        .returning(*_RETURNED_COLUMNS)
+    )
+    created = [
+        dict(row._asdict(), has_donation=False)
+        for row in db.session.execute(statement, [dict(row, submitted_at=submitted_at) for row in rows])
+    ]
+
+    created_keys = {(row['realtor_id'], row['month'], row['year']) for row in created}
+    existing = [
+        (row['realtor_id'], row['month'], row['year']) for row in rows
+        if (row['realtor_id'], row['month'], row['year']) not in created_keys
+    ]
+
+    notifications = [
+        {
+            'realtor_id': row['realtor_id'],
+            'type': 'payment_request',
+            'subject': 'Payment Requested for Monthly Donation',
+            'message': f"Thank you for submitting your transactions! Your donation amount for {get_period_display(row['month'], row['year'])} is ${row['calculated_donation_amount']:.2f}. Please submit your payment.",
+            'action_url': '/donations/payment',
+        }
+        for row in created if row['status'] == 'pending'
+    ]
+    if notifications:
+        db.session.execute(insert(Notification.__table__), notifications)
+
+    created.sort(key=lambda row: (row['realtor_id'], row['year'], row['month']))
+    return created, existing
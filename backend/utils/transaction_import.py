@@ -0,0 +1,165 @@
+"""
+Bulk import of monthly transactions from a brokerage CSV.
+The file (email, month, year, count) is read as a stream in chunks. Each
+chunk resolves its realtors with one IN query, inserts its transactions with
+the same ON CONFLICT statement as regular submissions (payment-request
+notifications included) and is committed on its own, so memory stays flat
+however long the file is: nothing is kept between chunks except the counts
+and the first MAX_REPORTED_ERRORS errors. A month repeated within a chunk is
+reported as a duplicate row; one repeated in a later chunk was committed with
+the earlier chunk and comes back from ON CONFLICT as already submitted. Rows
+that cannot be imported are reported by row number instead of failing the
+whole file.
+"""
+import csv
+from itertools import islice
+from sqlalchemy import func, select
+from extensions import db
+from models import Realtor
+from utils.submissions import parse_submission, submit_transactions, transaction_row
+
+CHUNK_SIZE = 5000
+
+# The report lists at most this many failed rows; the counts always cover all of them
+MAX_REPORTED_ERRORS = 1000
+
+COLUMN_ALIASES = {
+    'email': 'email',
+    'realtor_email': 'email',
+    'month': 'month',
+    'year': 'year',
+    'count': 'count',
+    'closed_transactions_count': 'count',
+    'closings': 'count',
+}
+REQUIRED_COLUMNS = ('email', 'month', 'year', 'count')
+
+
+def _header_map(fieldnames):
+    """Map each required column to its header in the file"""
+    columns = {}
+    for name in fieldnames or []:
+        canonical = COLUMN_ALIASES.get(name.strip().lower().replace(' ', '_'))
+        if canonical and canonical not in columns:
+            columns[canonical] = name
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    return columns
+
+
+class TransactionImport:
+    """Running totals and error report for one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.already_submitted = 0
+        self.failed = 0
+        self.errors = []
+
+    def _report(self, chunk_errors):
+        """Count a chunk's failed rows and keep the first ones, in file order"""
+        self.failed += len(chunk_errors)
+        for row_number, email, message in sorted(chunk_errors)[:MAX_REPORTED_ERRORS - len(self.errors)]:
+            self.errors.append({'row': row_number, 'email': email, 'error': message})
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'already_submitted': self.already_submitted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def import_chunk(self, records):
+        """Validate, resolve and insert one chunk of (row number, email, month, year, count) records"""
+        errors, parsed = [], []
+        for row_number, email, month, year, count in records:
+            self.rows += 1
+            if not email:
+                errors.append((row_number, email, 'email is required'))
+                continue
+            if not month or not year:
+                errors.append((row_number, email, 'month and year are required'))
+                continue
+            try:
+                period = parse_submission({'month': month, 'year': year, 'closed_transactions_count': count})
+            except ValueError as e:
+                errors.append((row_number, email, str(e)))
+                continue
+            parsed.append((row_number, email, email.lower(), period))
+
+        # Emails match case-insensitively; spreadsheets rarely keep the case realtors registered with
+        realtors = {
+            realtor.key: realtor
+            for realtor in db.session.execute(
+                select(func.lower(Realtor.email).label('key'), Realtor.id, Realtor.donation_amount_per_transaction,
+                       Realtor.approval_status)
+                .where(func.lower(Realtor.email).in_({key for _, _, key, _ in parsed}))
+            )
+        }
+
+        # (realtor_id, month, year) -> (row number, email) of its first row in this chunk
+        rows, row_numbers = [], {}
+        for row_number, email, key, (month, year, count) in parsed:
+            realtor = realtors.get(key)
+            if realtor is None:
+                errors.append((row_number, email, 'No realtor with this email'))
+                continue
+            if realtor.approval_status != 'approved':
+                errors.append((row_number, email, 'Realtor is not approved'))
+                continue
+
+            period_key = (realtor.id, month, year)
+            if period_key in row_numbers:
+                errors.append((row_number, email, f'Duplicate of row {row_numbers[period_key][0]}'))
+                continue
+            row_numbers[period_key] = (row_number, email)
+            rows.append(transaction_row(realtor.id, month, year, count, realtor.donation_amount_per_transaction))
+
+        created, existing = submit_transactions(rows)
+        db.session.commit()
+
+        self.created += len(created)
+        self.already_submitted += len(existing)
+        for realtor_id, month, year in existing:
+            row_number, email = row_numbers[(realtor_id, month, year)]
+            errors.append((row_number, email, f'Transactions for {month}/{year} already submitted'))
+        self._report(errors)
+
+
+def import_transactions(lines, chunk_size=CHUNK_SIZE):
+    """
+    Import transactions from CSV text.
+
+    Args:
+        lines: Iterable of CSV lines (a text file or stream), with a header row
+            naming email, month, year and count columns
+        chunk_size: Rows validated and inserted per statement and commit
+
+    Returns:
+        dict: rows read, created, already_submitted and failed counts, plus
+            errors ({'row', 'email', 'error'}; the header is row 1)
+
+    Raises:
+        ValueError: when the header is missing required columns
+    """
+    reader = csv.DictReader(lines)
+    columns = _header_map(reader.fieldnames)
+    result = TransactionImport()
+
+    records = (
+        (row_number, (record.get(columns['email']) or '').strip(), (record.get(columns['month']) or '').strip(),
+         (record.get(columns['year']) or '').strip(), (record.get(columns['count']) or '').strip())
+        for row_number, record in enumerate(reader, start=2)
+    )
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        result.import_chunk(chunk)
+
+    return result.to_dict()
@@ -0,0 +1,15 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT.
+PostgreSQL and SQLite share the on_conflict_do_nothing/do_update API, but each
+has its own insert construct.
+"""
+from extensions import db
+
+
+def dialect_insert(model):
+    """INSERT construct for the bound database that supports on_conflict_* clauses"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
@@ -9,6 +9,7 @@ const AdminDashboard = () => {
   const navigate = useNavigate();
   const [stats, setStats] = useState(null);
   const [pendingRealtors, setPendingRealtors] = useState([]);
+  const [pendingPayments, setPendingPayments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [actionLoading, setActionLoading] = useState(false);
@@ -24,12 +25,14 @@ const AdminDashboard = () => {
   const fetchData = async () => {
     try {
       setLoading(true);
-      const [statsRes, realtorsRes] = await Promise.all([
+      const [statsRes, realtorsRes, paymentsRes] = await Promise.all([
         api.get('/api/admin/stats'),
-        api.get('/api/admin/realtors/pending')
+        api.get('/api/admin/realtors/pending'),
+        api.get('/api/admin/donations', { params: { status: 'pending' } })
       ]);
       setStats(statsRes.data);
       setPendingRealtors(realtorsRes.data.realtors);
+      setPendingPayments(paymentsRes.data.donations);
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load admin data');
     } finally {
@@ -68,6 +71,35 @@ const AdminDashboard = () => {
     }
   };
 
+  const confirmPayment = async (donationId) => {
+    if (!window.confirm('Confirm this payment was received?')) return;
+    
+    try {
+      setActionLoading(true);
+      await api.post(`/api/admin/donations/${donationId}/confirm`);
+      await fetchData();
+    } catch (err) {
+      alert(err.response?.data?.error || 'Failed to confirm payment');
+    } finally {
+      setActionLoading(false);
+    }
+  };
+
+  const rejectPayment = async (donationId) => {
+    const reason = prompt('Enter reason the payment was not accepted (optional):');
+    if (reason === null) return;
+    
+    try {
+      setActionLoading(true);
+      await api.post(`/api/admin/donations/${donationId}/reject`, { reason });
+      await fetchData();
+    } catch (err) {
+      alert(err.response?.data?.error || 'Failed to reject payment');
+    } finally {
+      setActionLoading(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       year: 'numeric',
@@ -158,6 +190,79 @@ const AdminDashboard = () => {
         </Link>
       </div>
 
+      {/* Self-reported payments (bank transfer, check) awaiting confirmation */}
+      {pendingPayments.length > 0 && (
+        <div className="bg-white rounded-lg shadow-md overflow-hidden mb-8">
+          <div className="px-6 py-4 bg-gray-50 border-b border-gray-200">
+            <h2 className="text-xl font-semibold text-primary">Payments Awaiting Confirmation</h2>
+          </div>
+          <div className="overflow-x-auto">
+            <table className="min-w-full divide-y divide-gray-200">
+              <thead className="bg-gray-50">
+                <tr>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Realtor
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Amount
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Method
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Reference
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Reported
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Actions
+                  </th>
+                </tr>
+              </thead>
+              <tbody className="bg-white divide-y divide-gray-200">
+                {pendingPayments.map(donation => (
+                  <tr key={donation.id} className="hover:bg-gray-50">
+                    <td className="px-6 py-4 whitespace-nowrap">
+                      <div className="text-sm font-medium text-gray-900">{donation.realtor_name}</div>
+                      <div className="text-sm text-gray-500">{donation.realtor_email}</div>
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900 font-medium">
+                      ${Number(donation.amount).toFixed(2)}
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
+                      {donation.payment_method?.replace('_', ' ')}
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
+                      {donation.payment_reference}
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
+                      {formatDate(donation.paid_at)}
+                    </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm font-medium space-x-2">
+                      <button
+                        onClick={() => confirmPayment(donation.id)}
+                        disabled={actionLoading}
+                        className="text-green-600 hover:text-green-900 disabled:opacity-50"
+                      >
+                        Confirm
+                      </button>
+                      <button
+                        onClick={() => rejectPayment(donation.id)}
+                        disabled={actionLoading}
+                        className="text-red-600 hover:text-red-900 disabled:opacity-50"
+                      >
+                        Reject
+                      </button>
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
+
       {/* Pending Realtor Approvals */}
       {pendingRealtors.length > 0 && (
         <div className="bg-white rounded-lg shadow-md overflow-hidden">
@@ -1,12 +1,24 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { donationAPI } from '../services/api';
+import { loadStripe } from '../services/stripe';
+
+// Card payments are recorded when Stripe's webhook is applied (about once a minute)
+const STATUS_POLL_MS = 2000;
+const STATUS_POLL_ATTEMPTS = 60;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 const MakePayment = () => {
   const navigate = useNavigate();
   const [pending, setPending] = useState([]);
   const [selectedTransaction, setSelectedTransaction] = useState(null);
-  const [paymentMethod, setPaymentMethod] = useState('credit_card');
+  const [paymentMethod, setPaymentMethod] = useState('bank_transfer');
+  const [paymentReference, setPaymentReference] = useState('');
+  const [cardPayments, setCardPayments] = useState(null);
+  const [stripe, setStripe] = useState(null);
+  const cardContainer = useRef(null);
+  const cardElement = useRef(null);
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
@@ -14,8 +26,36 @@ const MakePayment = () => {
 
   useEffect(() => {
     fetchPendingDonations();
+    fetchPaymentConfig();
   }, []);
 
+  // Mount Stripe's card field whenever the card option is shown
+  useEffect(() => {
+    if (!stripe || paymentMethod !== 'credit_card' || !cardContainer.current) return;
+    const card = stripe.elements().create('card');
+    card.mount(cardContainer.current);
+    cardElement.current = card;
+    return () => {
+      card.destroy();
+      cardElement.current = null;
+    };
+  }, [stripe, paymentMethod, selectedTransaction]);
+
+  const fetchPaymentConfig = async () => {
+    try {
+      const response = await donationAPI.getPaymentConfig();
+      if (response.data.card_payments) {
+        setCardPayments(true);
+        setPaymentMethod('credit_card');
+        setStripe(await loadStripe(response.data.publishable_key));
+      }
+    } catch (error) {
+      console.error('Error loading card payments:', error);
+      setCardPayments(false);
+      setPaymentMethod('bank_transfer');
+    }
+  };
+
   const fetchPendingDonations = async () => {
     try {
       const response = await donationAPI.getPending();
@@ -44,24 +84,54 @@ const MakePayment = () => {
     setSubmitting(true);
 
     try {
-      await donationAPI.submitPayment({
-        transaction_id: selectedTransaction.id,
-        payment_method: paymentMethod,
-        payment_reference: `Payment-${Date.now()}`
-      });
-
-      setSuccess('Payment submitted successfully! Thank you for your contribution.');
-      
-      setTimeout(() => {
-        navigate('/donations/share');
-      }, 2000);
+      if (paymentMethod === 'credit_card') {
+        await payByCard();
+      } else {
+        await donationAPI.submitPayment({
+          transaction_id: selectedTransaction.id,
+          payment_method: paymentMethod,
+          payment_reference: paymentReference
+        });
+
+        setSuccess('Payment recorded! It will be confirmed as soon as we receive it.');
+        
+        setTimeout(() => {
+          navigate('/history');
+        }, 2000);
+      }
     } catch (error) {
-      setError(error.response?.data?.error || 'Error processing payment');
+      setError(error.response?.data?.error || error.message || 'Error processing payment');
     } finally {
       setSubmitting(false);
     }
   };
 
+  const payByCard = async () => {
+    const response = await donationAPI.createPaymentIntent(selectedTransaction.id);
+    const result = await stripe.confirmCardPayment(response.data.payment_intent.client_secret, {
+      payment_method: { card: cardElement.current }
+    });
+    if (result.error) {
+      setError(result.error.message);
+      return;
+    }
+
+    // The charge went through; wait for the donation to be recorded from Stripe's webhook
+    setSuccess('Card payment accepted! Recording your donation...');
+    for (let attempt = 0; attempt < STATUS_POLL_ATTEMPTS; attempt++) {
+      await sleep(STATUS_POLL_MS);
+      const status = await donationAPI.getPaymentStatus(selectedTransaction.id);
+      if (status.data.paid) {
+        setSuccess('Payment received! Thank you for your contribution.');
+        setTimeout(() => {
+          navigate('/donations/share');
+        }, 2000);
+        return;
+      }
+    }
+    setSuccess('Your card payment went through. It will appear in your history within a few minutes.');
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-screen">
@@ -166,17 +236,19 @@ const MakePayment = () => {
             <h2 className="text-xl font-semibold text-primary mb-4">Payment Method</h2>
             
             <div className="mb-6">
-              <label className="block mb-3">
-                <input
-                  type="radio"
-                  name="payment_method"
-                  value="credit_card"
-                  checked={paymentMethod === 'credit_card'}
-                  onChange={(e) => setPaymentMethod(e.target.value)}
-                  className="mr-3"
-                />
-                Credit/Debit Card
-              </label>
+              {cardPayments && (
+                <label className="block mb-3">
+                  <input
+                    type="radio"
+                    name="payment_method"
+                    value="credit_card"
+                    checked={paymentMethod === 'credit_card'}
+                    onChange={(e) => setPaymentMethod(e.target.value)}
+                    className="mr-3"
+                  />
+                  Credit/Debit Card
+                </label>
+              )}
               <label className="block mb-3">
                 <input
                   type="radio"
@@ -201,17 +273,33 @@ const MakePayment = () => {
               </label>
             </div>
 
-            <div className="alert alert-info mb-6">
-              <p className="font-semibold mb-2">Payment Integration Coming Soon</p>
-              <p className="text-sm">
-                Full payment processing with Stripe will be integrated in the production version. 
-                For now, clicking "Submit Payment" will record your donation commitment.
-              </p>
-            </div>
+            {paymentMethod === 'credit_card' ? (
+              <div className="mb-6">
+                <div ref={cardContainer} className="border border-gray-300 rounded-lg p-4"></div>
+                <p className="text-sm text-gray-600 mt-2">Your card is charged securely by Stripe.</p>
+              </div>
+            ) : (
+              <div className="mb-6">
+                <label className="block text-sm font-medium text-gray-700 mb-2">
+                  {paymentMethod === 'check' ? 'Check Number' : 'Transfer Confirmation Number'}
+                </label>
+                <input
+                  type="text"
+                  value={paymentReference}
+                  onChange={(e) => setPaymentReference(e.target.value)}
+                  className="input"
+                />
+                <div className="alert alert-info mt-4">
+                  <p className="text-sm">
+                    Your donation will show as pending until we receive your payment and confirm it.
+                  </p>
+                </div>
+              </div>
+            )}
 
             <button
               type="submit"
-              disabled={submitting}
+              disabled={submitting || (paymentMethod === 'credit_card' && !stripe)}
               className="w-full btn btn-primary py-3 text-lg"
             >
               {submitting ? 'Processing...' : `Submit Payment - $${parseFloat(selectedTransaction.calculated_donation_amount).toFixed(2)}`}
@@ -1,15 +1,19 @@
-import React, { useState, useEffect } from 'react';
-import { useNavigate } from 'react-router-dom';
+import React, { useState, useEffect, useRef } from 'react';
+import { useLocation, useNavigate } from 'react-router-dom';
 import { transactionAPI } from '../services/api';
 
 const SubmitTransactions = () => {
   const navigate = useNavigate();
+  const location = useLocation();
+  const pendingRef = useRef(null);
   const [formData, setFormData] = useState({
     closed_transactions_count: '',
     month: '',
     year: ''
   });
   const [currentMonth, setCurrentMonth] = useState(null);
+  const [pendingPeriods, setPendingPeriods] = useState([]);
+  const [pickedPeriod, setPickedPeriod] = useState(false);
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
@@ -17,8 +21,37 @@ const SubmitTransactions = () => {
 
   useEffect(() => {
     checkCurrentMonth();
+    fetchPendingPeriods();
   }, []);
 
+  // Reminder notifications link to #pending
+  useEffect(() => {
+    if (!loading && location.hash === '#pending' && pendingRef.current) {
+      pendingRef.current.scrollIntoView({ behavior: 'smooth' });
+    }
+  }, [loading, location.hash, pendingPeriods]);
+
+  const fetchPendingPeriods = async () => {
+    try {
+      const response = await transactionAPI.getPending();
+      // Newest first
+      setPendingPeriods([...response.data.pending].reverse());
+    } catch (error) {
+      console.error('Error loading unreported months:', error);
+    }
+  };
+
+  const selectPeriod = (period) => {
+    setFormData({
+      ...formData,
+      month: period.month,
+      year: period.year
+    });
+    setPickedPeriod(true);
+    setError('');
+    setSuccess('');
+  };
+
   const checkCurrentMonth = async () => {
     try {
       const response = await transactionAPI.getCurrentMonth();
@@ -93,6 +126,9 @@ const SubmitTransactions = () => {
     );
   }
 
+  // The default period is already reported unless an older unreported month was picked
+  const locked = currentMonth?.submitted && !pickedPeriod;
+
   const months = [
     'January', 'February', 'March', 'April', 'May', 'June',
     'July', 'August', 'September', 'October', 'November', 'December'
@@ -114,6 +150,31 @@ const SubmitTransactions = () => {
         </div>
       )}
 
+      {pendingPeriods.length > 0 && (
+        <div id="pending" ref={pendingRef} className="card mb-6">
+          <h2 className="text-xl font-semibold text-primary mb-2">Months Still to Report</h2>
+          <p className="text-sm text-gray-600 mb-4">
+            Select a month to report it below.
+          </p>
+          <div className="flex flex-wrap gap-2">
+            {pendingPeriods.map((period) => (
+              <button
+                key={`${period.year}-${period.month}`}
+                type="button"
+                onClick={() => selectPeriod(period)}
+                className={`px-3 py-1 rounded-full border text-sm transition-colors ${
+                  String(formData.month) === String(period.month) && String(formData.year) === String(period.year)
+                    ? 'border-secondary bg-secondary bg-opacity-10 text-primary'
+                    : 'border-gray-300 text-gray-600 hover:border-gray-400'
+                }`}
+              >
+                {period.display}
+              </button>
+            ))}
+          </div>
+        </div>
+      )}
+
       <form className="card" onSubmit={handleSubmit}>
         {error && (
           <div className="alert alert-error mb-4">
@@ -141,7 +202,7 @@ const SubmitTransactions = () => {
             placeholder="Enter number of closed deals"
             value={formData.closed_transactions_count}
             onChange={handleChange}
-            disabled={currentMonth?.submitted}
+            disabled={locked}
           />
           <p className="text-sm text-gray-600 mt-2">
             Enter the total number of transactions you closed during this period.
@@ -160,7 +221,7 @@ const SubmitTransactions = () => {
               className="input"
               value={formData.month}
               onChange={handleChange}
-              disabled={currentMonth?.submitted}
+              disabled={locked}
             >
               <option value="">Select Month</option>
               {months.map((month, index) => (
@@ -182,7 +243,7 @@ const SubmitTransactions = () => {
               className="input"
               value={formData.year}
               onChange={handleChange}
-              disabled={currentMonth?.submitted}
+              disabled={locked}
             >
               <option value="">Select Year</option>
               {Array.from({ length: 5 }, (_, i) => new Date().getFullYear() - i).map(year => (
@@ -201,7 +262,7 @@ const SubmitTransactions = () => {
           </p>
         </div>
 
-        {!currentMonth?.submitted && (
+        {!locked && (
           <button
             type="submit"
             disabled={submitting}
@@ -211,7 +272,7 @@ const SubmitTransactions = () => {
           </button>
         )}
 
-        {currentMonth?.submitted && (
+        {locked && (
           <button
             type="button"
             onClick={() => navigate('/dashboard')}
@@ -91,6 +91,9 @@ export const transactionAPI = {
 // Donation API
 export const donationAPI = {
   submitPayment: (data) => api.post('/api/donations/payment', data),
+  getPaymentConfig: () => api.get('/api/donations/payment-config'),
+  createPaymentIntent: (transactionId) => api.post('/api/donations/payment-intent', { transaction_id: transactionId }),
+  getPaymentStatus: (transactionId) => api.get(`/api/donations/payment-status/${transactionId}`),
   getStats: () => api.get('/api/donations/stats'),
   getHistory: () => api.get('/api/donations/history'),
   getPending: () => api.get('/api/donations/pending'),
@@ -0,0 +1,23 @@
+// Loads Stripe.js from Stripe's CDN (it must not be bundled) once per page
+let stripePromise = null;
+
+export const loadStripe = (publishableKey) => {
+  if (!stripePromise) {
+    stripePromise = new Promise((resolve, reject) => {
+      if (window.Stripe) {
+        resolve(window.Stripe(publishableKey));
+        return;
+      }
+      const script = document.createElement('script');
+      script.src = 'https://js.stripe.com/v3/';
+      script.async = true;
+      script.onload = () => resolve(window.Stripe(publishableKey));
+      script.onerror = () => {
+        stripePromise = null;
+        reject(new Error('Could not load Stripe.js'));
+      };
+      document.head.appendChild(script);
+    });
+  }
+  return stripePromise;
+};